@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""classify failed requests, retry them with exponential backoff and adapt the concurrency per host"""
+
+import random
+import socket
+import threading
+import time
+import typing
+import urllib.parse
+from src import constants as const
+
+# kinds of failures; the host is pushing back on the first four, so these are retried after a backoff
+TIMEOUT = "timeout"
+THROTTLED = "throttled"
+SERVER_ERROR = "server error"
+BLOCKED = "blocked"
+MISSING_SELECTOR = "missing selector"
+OTHER = "other"
+RETRYABLE = {TIMEOUT, THROTTLED, SERVER_ERROR, BLOCKED}
+
+
+def classify(error: BaseException) -> str:
+    """kind of a failure, based on the exception raised by the http backend, selenium or the extraction"""
+    status = getattr(error, "status", None)
+    if status == 429:
+        return THROTTLED
+    if status in (401, 403) or type(error).__name__ == "BlockedPage":
+        return BLOCKED
+    if isinstance(status, int) and status >= 500:
+        return SERVER_ERROR
+    name = type(error).__name__
+    if isinstance(error, (TimeoutError, socket.timeout)) or "Timeout" in name:
+        return TIMEOUT
+    if name in ("NoSuchElementException", "IncompletePage", "StaleElementReferenceException"):
+        return MISSING_SELECTOR
+    # e.g., urllib3 wraps timeouts in a MaxRetryError with the timeout as its reason
+    cause = error.__cause__ or error.__context__ or getattr(error, "reason", None)
+    return classify(cause) if isinstance(cause, BaseException) and cause is not error else OTHER
+
+
+class HostController:
+    """ AIMD concurrency limit for one host: the number of requests in flight grows by one per limit successful
+    requests, i.e., by about one per round trip, and is halved when the host pushes back or responses get slower than
+    slow_latency; after pushback, no request is started until the backoff has passed
+    """
+
+    def __init__(self, initial: float, minimum: float, maximum: float, slow_latency: float) -> None:
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.slow_latency = slow_latency
+        self.in_flight = 0
+        self.backoff_until = 0.
+        self.decreased = 0.
+        self.successes = 0
+        self.failures = 0
+        self.condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self.condition:
+            while True:
+                wait = self.backoff_until - time.monotonic()
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                self.condition.wait(wait if wait > 0 else None)
+
+    def release(self, latency: float, kind: typing.Optional[str], backoff: float = 0.) -> None:
+        """ record the outcome of a request
+
+        :param kind: kind of failure, None for success
+        :param backoff: seconds without new requests to the host
+        """
+        with self.condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if kind is None:
+                self.successes += 1
+            else:
+                self.failures += 1
+            if kind in RETRYABLE or (kind is None and latency > self.slow_latency):
+                # decrease at most once per round trip, requests already in flight suffered from the same congestion
+                if now - self.decreased > latency:
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self.decreased = now
+                if backoff:
+                    self.backoff_until = max(self.backoff_until, now + backoff)
+            elif kind is None:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+
+class AdaptiveController:
+    """ run requests with a per-host concurrency limit that adapts to latency and errors, and retry requests the host
+    pushed back on with exponential backoff and jitter
+    """
+
+    def __init__(self, retries: int = const.RETRIES, base_delay: float = const.BACKOFF_BASE,
+                 max_delay: float = const.BACKOFF_MAX, initial: float = const.CONCURRENCY[0],
+                 minimum: float = const.CONCURRENCY[1], maximum: float = const.CONCURRENCY[2],
+                 slow_latency: float = const.SLOW_LATENCY) -> None:
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.settings = (initial, minimum, maximum, slow_latency)
+        self.hosts: dict = {}
+        self.lock = threading.Lock()
+
+    def host(self, url: str) -> HostController:
+        host = urllib.parse.urlsplit(url).netloc
+        with self.lock:
+            if host not in self.hosts:
+                self.hosts[host] = HostController(*self.settings)
+            return self.hosts[host]
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after:
+            return min(self.max_delay, retry_after)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, url: str, func: typing.Callable[[str], typing.Any], logger=None) -> typing.Any:
+        """ call func with the url within the host's concurrency limit, retrying retryable failures
+
+        :raise: the last exception once the retries are used up, or right away for other failures
+        """
+        host = self.host(url)
+        for attempt in range(self.retries + 1):
+            host.acquire()
+            start = time.monotonic()
+            try:
+                result = func(url)
+            except Exception as e:
+                kind = classify(e)
+                delay = self.backoff(attempt, e) if kind in RETRYABLE else 0.
+                host.release(time.monotonic() - start, kind, delay)
+                if kind not in RETRYABLE or attempt == self.retries:
+                    raise
+                if logger:
+                    logger.info(f"{kind} for {url} - retrying in {delay:.1f} s, limit for host is {host.limit:.1f}")
+                continue
+            host.release(time.monotonic() - start, None)
+            return result
+
+    def report(self) -> dict:
+        """current limit, successes and failures per host"""
+        with self.lock:
+            return {h: (round(c.limit, 1), c.successes, c.failures) for h, c in self.hosts.items()}
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""pool of headless browser sessions for scraping product pages in parallel"""
+
+import concurrent.futures
+import queue
+import typing
+from src import http_backend
+
+
+def scrape_pooled(bot, links: list, workers: int) -> list:
+    """ scrape product pages with several browser sessions, each worker owns a separate bot instance and draws links
+    from a shared queue
+
+    :param bot: bot whose class and settings are used for spawning the workers
+    :param links: product links to be scraped
+    :param workers: number of browser sessions
+    :return: scraped data in the order of the links, None for links that were skipped
+    """
+    tasks: queue.Queue = queue.Queue()
+    for task in enumerate(links):
+        tasks.put(task)
+    results: list = [None] * len(links)
+
+    def work() -> None:
+        worker_bot = bot.spawn_worker()
+        try:
+            while True:
+                try:
+                    c, pl = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                results[c] = worker_bot.scrape_product(pl)
+        finally:
+            worker_bot.quit()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(work) for _ in range(min(workers, len(links)))]
+        for future in futures:
+            try:
+                future.result()
+            except Exception:
+                bot.logger.exception("browser worker failed")
+    return results
+
+
+def scrape_streamed(bot, keyword: str, maxpages: typing.Optional[int], workers: int, queue_size: int = 100,
+                    listing_threads: int = 4) -> tuple:
+    """ collect product links and scrape them at the same time: the search pages feed a bounded queue that the browser
+    workers drain, so detail pages are scraped while later search pages are still being fetched
+
+    :param bot: bot whose browser session loads the search pages and whose settings are used for the workers
+    :param maxpages: maximum number of search pages, all pages in the pagination if None
+    :param workers: number of browser sessions scraping product pages
+    :param queue_size: maximum number of links waiting to be scraped, the search pages wait for the workers beyond
+    :return: product links in the order they were found, scraped data in the same order with None for skipped links
+    """
+    tasks: queue.Queue = queue.Queue(maxsize=queue_size)
+    links: list = []
+    results: dict = {}
+
+    def produce() -> None:
+        try:
+            for page, page_links, html in listing_pages(bot, keyword, maxpages, listing_threads):
+                new = [pl for pl in dict.fromkeys(page_links) if pl not in results]
+                for pl in new:
+                    results[pl] = None
+                links.extend(new)
+                if bot.journal:
+                    bot.journal.record_links(new)
+                if bot.fingerprints:
+                    bot.snippets.update(bot.parse_search_snippets(html, bot.search_url(keyword, page)))
+                    new, carried = bot.fingerprints.partition(new, bot.snippets)
+                    bot.carry_forward(carried)
+                    results.update(carried)
+                for pl in new:
+                    tasks.put(pl)
+        except Exception:
+            bot.logger.exception(f"collecting search pages for {keyword} failed")
+        finally:
+            for _ in range(workers):
+                tasks.put(None)
+
+    def consume() -> None:
+        try:
+            worker_bot = bot.spawn_worker()
+        except Exception:
+            bot.logger.exception("browser worker failed")
+            worker_bot = None
+        try:
+            while True:
+                pl = tasks.get()
+                if pl is None:
+                    break
+                # links are still taken from the queue if the worker failed, so the search pages are not blocked
+                if worker_bot:
+                    results[pl] = worker_bot.scrape_product(pl)
+        finally:
+            if worker_bot:
+                worker_bot.quit()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers + 1) as executor:
+        futures = [executor.submit(produce)] + [executor.submit(consume) for _ in range(workers)]
+        for future in futures:
+            future.result()
+    return links, [results[pl] for pl in links]
+
+
+def listing_pages(bot, keyword: str, maxpages: typing.Optional[int], threads: int = 4) -> typing.Iterator[tuple]:
+    """ yield the page number, product links and html per search page; the number of pages is read from the pagination of the first page,
+    and the remaining pages are fetched concurrently via http, falling back to the bot's browser for pages without
+    links in their html; without pagination, pages are loaded one after the other until one has no links
+    """
+    links, html = bot.listing_page(keyword, 1)
+    yield 1, links, html
+    count = bot.page_count(html)
+    if count is None:
+        page = 2
+        while links and (maxpages is None or page <= maxpages):
+            try:
+                links, html = bot.listing_page(keyword, page)
+            except Exception as e:
+                bot.logger.info(f"no data available for page {page} when searching for {keyword} - stopping: {e}")
+                return
+            yield page, links, html
+            page += 1
+        return
+    last = count if maxpages is None else min(count, maxpages)
+    fetcher = bot.fetcher or http_backend.HttpFetcher(bot.logger, cache=bot.cache, controller=bot.controller)
+
+    def fetch(page: int) -> tuple:
+        url = bot.search_url(keyword, page)
+        if not (bot.cache and bot.cache.contains(url)):
+            bot.limiter.acquire(url)
+        html = fetcher.fetch(url)
+        return bot.parse_search_html(html, url), html
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = {executor.submit(fetch, page): page for page in range(2, last + 1)}
+        for future in concurrent.futures.as_completed(futures):
+            page = futures[future]
+            try:
+                links, html = future.result()
+            except Exception as e:
+                bot.logger.info(f"fetching search page {page} via http failed: {e}")
+                links = []
+            if not links:
+                try:
+                    links, html = bot.listing_page(keyword, page)
+                except Exception as e:
+                    bot.logger.info(f"no data available for page {page} when searching for {keyword}: {e}")
+                    continue
+            yield page, links, html
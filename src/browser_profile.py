@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""chrome options for the bots, including a lean profile that skips resources the extractors never look at"""
+
+from selenium.webdriver.chrome.options import Options
+from src import constants as const
+
+
+def chrome_options(headless: bool = const.HEADLESS, lean: bool = const.LEAN_BROWSER) -> Options:
+    """ options for a bot's browser session; the lean profile returns from get() once the dom is ready rather than
+    after all subresources have loaded, and does not load images
+    """
+    options = Options()
+    prefs: dict = {}
+    if headless:
+        options.headless = True
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument(f'user-agent={const.USER_AGENT}')
+        prefs["profile.default_content_setting_values.notifications"] = 2
+    if lean:
+        options.page_load_strategy = "eager"
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        prefs["profile.managed_default_content_settings.images"] = 2
+    if prefs:
+        options.add_experimental_option("prefs", prefs)
+    return options
+
+
+def block_urls(driver, patterns: list = None) -> None:
+    """block requests matching the patterns, e.g., fonts, media and analytics domains, for a running session"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": const.BLOCKED_URLS if patterns is None else patterns})
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+typed columnar copies of the preprocessed data dumps as Arrow IPC files, which the analysis tools memory-map instead of
+parsing the json; strings are dictionary-encoded, lists are kept as list columns
+"""
+
+import json
+import os
+import typing
+import pyarrow as pa
+
+SUFFIX = ".arrow"
+
+
+def columnar_path(pp_file: str) -> str:
+    """path of the columnar copy of a json dump, e.g., ../data/conrad_data_dump.arrow"""
+    return os.path.splitext(pp_file)[0] + SUFFIX
+
+
+def column_array(values: list) -> pa.Array:
+    """arrow array of a column, values of mixed types are stored as strings, lists and dicts as their json"""
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([v if v is None or isinstance(v, str) else
+                         json.dumps(v) if isinstance(v, (list, dict)) else str(v) for v in values], type=pa.string())
+
+
+def unify(chunks: list) -> pa.ChunkedArray:
+    """ one chunked array of the chunks of a column, given as (length, array); the array is None for batches without
+    the attribute; chunks of different types become float if all of them are numeric and strings otherwise
+    """
+    types = {c.type for _, c in chunks if c is not None and c.type != pa.null()}
+    if len(types) > 1:
+        if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in types):
+            chunks = [(n, c if c is None else c.cast(pa.float64())) for n, c in chunks]
+        else:
+            chunks = [(n, c if c is None else column_array([v if v is None or isinstance(v, str) else json.dumps(v)
+                                                            for v in c.to_pylist()])) for n, c in chunks]
+        types = {c.type for _, c in chunks if c is not None and c.type != pa.null()}
+    target = types.pop() if types else pa.null()
+    return pa.chunked_array([pa.nulls(n, target) if c is None else c.cast(target) for n, c in chunks], type=target)
+
+
+class ColumnarWriter:
+    """ collect records in batches of arrow columns and write them as one table when closed; the columns take a
+    fraction of the memory of the records
+    """
+
+    def __init__(self, path: str, batch_size: int = 10000) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.batch: list = []
+        self.batches: list = []
+        self.attributes: dict = {}
+        self.count = 0
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.close()
+
+    def write(self, record: dict) -> None:
+        self.batch.append(record)
+        self.attributes.update(dict.fromkeys(record))
+        if len(self.batch) == self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.batch:
+            self.batches.append((len(self.batch), {a: column_array([r.get(a) for r in self.batch])
+                                                   for a in dict.fromkeys(a for r in self.batch for a in r)}))
+            self.count += len(self.batch)
+            self.batch = []
+
+    def table(self) -> pa.Table:
+        """the records written so far as a table, strings dictionary-encoded with one dictionary per column"""
+        self.flush()
+        table = {}
+        for attribute in self.attributes:
+            column = unify([(n, columns.get(attribute)) for n, columns in self.batches])
+            table[attribute] = column.dictionary_encode() if pa.types.is_string(column.type) else column
+        return pa.table(table).unify_dictionaries()
+
+    def close(self) -> None:
+        table = self.table()
+        with pa.OSFile(self.path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def read_table(path: str) -> pa.Table:
+    """memory-map a columnar dump, columns are only read from disk as they are accessed"""
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def records_table(records: typing.Iterable[dict]) -> pa.Table:
+    """table of records in memory, with the same types as a columnar dump of them"""
+    writer = ColumnarWriter(os.devnull)
+    for record in records:
+        writer.write(record)
+    return writer.table()
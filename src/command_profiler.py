@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""record the latency of every webdriver command sent by the bots"""
+
+import collections
+import functools
+import threading
+import time
+import typing
+
+FIND_COMMANDS = {"findElement", "findElements", "findChildElement", "findChildElements"}
+
+
+class CommandProfiler:
+    """ wraps the execute method of webdriver sessions, so every command is timed, including the ones sent by web
+    elements; element lookups taking at least the implicit wait are flagged, as they most likely waited for an element
+    that is absent
+
+    :param ceiling_ratio: share of the implicit wait after which a lookup counts as having hit the ceiling
+    """
+
+    def __init__(self, ceiling_ratio: float = .95) -> None:
+        self.ceiling_ratio = ceiling_ratio
+        self.records: list = []
+        self.implicit_waits: dict = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+
+    def attach(self, driver) -> None:
+        execute = driver.execute
+
+        @functools.wraps(execute)
+        def timed_execute(driver_command: str, params: dict = None) -> typing.Any:
+            start = time.perf_counter()
+            error = None
+            try:
+                return execute(driver_command, params)
+            except Exception as e:
+                error = type(e).__name__
+                raise
+            finally:
+                self.record(id(driver), driver_command, params or {}, time.perf_counter() - start, error)
+
+        driver.execute = timed_execute
+
+    def record(self, session: int, command: str, params: dict, seconds: float, error: typing.Optional[str]) -> None:
+        with self.lock:
+            if command == "setTimeouts" and "implicit" in params and not error:
+                self.implicit_waits[session] = params["implicit"] / 1000
+            implicit_wait = self.implicit_waits.get(session, 0.)
+            hit_ceiling = command in FIND_COMMANDS and implicit_wait > 0 and \
+                seconds >= self.ceiling_ratio * implicit_wait
+            self.records.append({
+                "command": command,
+                "selector": f"{params['using']}={params['value']}" if command in FIND_COMMANDS else None,
+                "seconds": seconds,
+                "error": error,
+                "ceiling": hit_ceiling,
+            })
+
+    def summary(self) -> list:
+        """ aggregate the records per command and selector
+
+        :return: list of dicts sorted by total time, descending
+        """
+        with self.lock:
+            records = list(self.records)
+        groups: dict = collections.defaultdict(list)
+        for r in records:
+            groups[(r["command"], r["selector"])].append(r)
+        rows = [{
+            "command": command,
+            "selector": selector,
+            "calls": len(rs),
+            "total": sum(r["seconds"] for r in rs),
+            "max": max(r["seconds"] for r in rs),
+            "errors": sum(1 for r in rs if r["error"]),
+            "ceiling_hits": sum(1 for r in rs if r["ceiling"]),
+        } for (command, selector), rs in groups.items()]
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+    def report(self, top: int = 25) -> str:
+        rows = self.summary()
+        wall = time.time() - self.started
+        total = sum(row["total"] for row in rows)
+        hits = [row for row in rows if row["ceiling_hits"]]
+        lines = [f"{sum(row['calls'] for row in rows)} webdriver commands, {total:.1f} s in commands, "
+                 f"{wall:.1f} s wall clock"]
+        if hits:
+            lines.append(f"{sum(row['ceiling_hits'] for row in hits)} lookups hit the implicit wait, "
+                         f"{sum(row['total'] for row in hits):.1f} s spent on them:")
+            lines.extend(f"  {row['ceiling_hits']}x {row['selector']}" for row in hits)
+        lines.append(f"{'calls':>7} {'total s':>9} {'max s':>8} {'errors':>6} {'ceiling':>7}  command / selector")
+        for row in rows[:top]:
+            lines.append(f"{row['calls']:>7} {row['total']:>9.2f} {row['max']:>8.2f} {row['errors']:>6} "
+                         f"{row['ceiling_hits']:>7}  {row['command']} {row['selector'] or ''}".rstrip())
+        return "\n".join(lines)
+
+    def save_report(self, path: str) -> None:
+        with open(path, "w") as f:
+            f.write(self.report() + "\n")
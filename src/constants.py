@@ -4,3 +4,79 @@
 # setup
 CHROME_DRIVER_PATH = r"/home/felix/Documents/tmp"
 HEADLESS = True
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/60.0.3112.50 Safari/537.36"
+
+# origins of the vendor sites, e.g., pointed at a local replay server by tools/replay_archive.py
+BASE_URLS = {
+    "conrad": "https://www.conrad.de",
+    "infinity": "https://www.infinity-semiconductor.com",
+    "rscomponents": "https://de.rs-online.com",
+}
+
+# politeness per host: requests per second, burst, random jitter in seconds
+HOST_LIMITS = {
+    "www.conrad.de": (0.5, 2, 1.),
+    "www.infinity-semiconductor.com": (0.5, 2, 1.),
+    "de.rs-online.com": (0.5, 2, 1.),
+}
+DEFAULT_HOST_LIMIT = (0.5, 1, 1.)
+
+# page cache: directory, time to live per host in seconds, maximum size in bytes
+CACHE_DIR = "../data/cache"
+CACHE_TTLS = {
+    "www.conrad.de": 7*24*3600,
+    "www.infinity-semiconductor.com": 7*24*3600,
+    "de.rs-online.com": 3*24*3600,
+}
+DEFAULT_CACHE_TTL = 24*3600
+CACHE_MAX_BYTES = 2*1024**3
+
+# scraped data: compression of the json lines output, None, "gzip" or "zstd"
+OUTPUT_COMPRESSION = None
+
+# read product data from the json payload embedded in pages of Next.js apps rather than from their dom, the paths of
+# rscomp_scraper.NEXT_DATA_SPEC are checked against tests/fixtures/rscomponents_product.html
+PREFER_EMBEDDED_JSON = True
+
+# lean browser profile: eager page loads, no images, and requests matching these patterns are blocked
+LEAN_BROWSER = False
+BLOCKED_URLS = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.ogg", "*.mp3", "*.wav",
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*facebook.net*", "*facebook.com/tr*", "*hotjar.com*", "*criteo.com*", "*criteo.net*", "*bing.com/bat*",
+    "*adform.net*", "*trustarc.com*", "*cookielaw.org*", "*usercentrics.eu*", "*dynatrace.com*", "*newrelic.com*",
+    "*nr-data.net*", "*optimizely.com*", "*mouseflow.com*", "*clarity.ms*", "*tiktok.com*", "*linkedin.com/px*",
+]
+
+# delta scraping: fingerprints of search result tiles, product pages are scraped again after max age seconds
+FINGERPRINT_DB = "../data/fingerprints.sqlite"
+FINGERPRINT_MAX_AGE = 14*24*3600
+
+# distributed crawling: queue database shared by the coordinator and the workers, on a file system with working
+# byte-range locks, see work_queue.WorkQueue; the coordinator gives up once the queue made no progress for
+# QUEUE_STALL_TIMEOUT seconds
+QUEUE_DB = "../data/queue.sqlite"
+QUEUE_STALL_TIMEOUT = 1800.
+
+# product data of all runs, indexed by vendor, product url, part number and time of scraping; records are written in
+# batches of this size
+CATALOG_DB = "../data/catalog.sqlite"
+CATALOG_BATCH = 500
+
+# attributes of the scraped records holding the part number per vendor, the first one a record has identifies the
+# product in the catalog and across vendors in the reference alignment
+PART_NUMBER_KEYS = {
+    "conrad": ["Typ", "Modell"],
+    "infinity": ["PART NUMBER"],
+    "rscomponents": ["code"],
+}
+
+# retries of pages the host pushed back on, with exponential backoff between base and max seconds; concurrency per host
+# as (initial, minimum, maximum) requests in flight, it is halved when responses take longer than slow latency seconds
+RETRIES = 3
+BACKOFF_BASE = 2.
+BACKOFF_MAX = 120.
+CONCURRENCY = (2., 1., 16.)
+SLOW_LATENCY = 10.
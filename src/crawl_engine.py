@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""asyncio crawl scheduler with per-host token-bucket rate limiting"""
+
+import asyncio
+import concurrent.futures
+import functools
+import random
+import threading
+import time
+import typing
+import urllib.parse
+from src import constants as const
+from src import http_backend
+
+
+class TokenBucket:
+    """ token bucket that refills with rate tokens per second up to burst tokens; a random jitter in seconds is added
+    to every delay handed out
+    """
+
+    def __init__(self, rate: float, burst: int = 1, jitter: float = 0.) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.jitter = jitter
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """take a token and return the delay in seconds before it may be used"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.
+        return delay + random.uniform(0, self.jitter)
+
+    def acquire(self) -> None:
+        time.sleep(self.reserve())
+
+    async def acquire_async(self) -> None:
+        await asyncio.sleep(self.reserve())
+
+
+class HostLimiter:
+    """one token bucket per host, shared by all bots and threads using the limiter"""
+
+    def __init__(self, limits: dict = None, default: tuple = const.DEFAULT_HOST_LIMIT) -> None:
+        self.limits = const.HOST_LIMITS if limits is None else limits
+        self.default = default
+        self.buckets: dict = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urllib.parse.urlsplit(url).netloc
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(*self.limits.get(host, self.default))
+            return self.buckets[host]
+
+    def acquire(self, url: str) -> None:
+        self.bucket(url).acquire()
+
+    async def acquire_async(self, url: str) -> None:
+        await self.bucket(url).acquire_async()
+
+
+class CrawlScheduler:
+    """ run blocking fetch jobs concurrently, limited by the token bucket of each job's host, the overall number of
+    requests in flight and the number of requests in flight per host
+    """
+
+    def __init__(self, limiter: HostLimiter, logger, max_in_flight: int = 32, max_per_host: int = 4) -> None:
+        self.limiter = limiter
+        self.logger = logger
+        self.max_in_flight = max_in_flight
+        self.max_per_host = max_per_host
+
+    def crawl(self, jobs: list) -> list:
+        """ run jobs
+
+        :param jobs: list of tuples [url, func], func is called with the url
+        :return: results in the order of the jobs, None for failed jobs
+        """
+        return asyncio.run(self._crawl(jobs))
+
+    async def _crawl(self, jobs: list) -> list:
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        per_host: dict = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+
+            async def run(url: str, func: typing.Callable) -> typing.Any:
+                host = urllib.parse.urlsplit(url).netloc
+                host_slots = per_host.setdefault(host, asyncio.Semaphore(self.max_per_host))
+                async with in_flight, host_slots:
+                    await self.limiter.acquire_async(url)
+                    return await asyncio.get_running_loop().run_in_executor(executor, func, url)
+
+            results = await asyncio.gather(*(run(url, func) for url, func in jobs), return_exceptions=True)
+        for (url, _), result in zip(jobs, results):
+            if isinstance(result, Exception):
+                self.logger.info(f"crawling {url} failed: {result}")
+        return [None if isinstance(r, Exception) else r for r in results]
+
+
+def crawl_products(bots: list, limiter: HostLimiter, links: list = None, max_in_flight: int = 32,
+                   max_per_host: int = 4) -> None:
+    """ scrape the product links of several bots at once via http; pages that need a browser are loaded by the
+    respective bot afterwards
+
+    :param bots: bots with product links, results are added to their product data
+    :param links: links to be scraped per bot, defaults to the bots' product links
+    """
+    links = links or [bot.product_links for bot in bots]
+    jobs: list = []
+    for bot, bot_links in zip(bots, links):
+        if bot.cache and bot.cache.offline:
+            continue
+        fetcher = bot.fetcher or http_backend.HttpFetcher(bot.logger, cache=bot.cache, controller=bot.controller)
+        # cached pages are served by the bots without waiting for a token
+        jobs.extend((bot, pl, functools.partial(fetcher.fetch_and_parse, parser=bot.parse_product_html))
+                    for pl in bot_links if not (bot.cache and bot.cache.contains(pl)))
+    scheduler = CrawlScheduler(limiter, bots[0].logger, max_in_flight, max_per_host)
+    results = scheduler.crawl([(pl, func) for _, pl, func in jobs])
+    fetched = {(bot, pl): data for (bot, pl, _), data in zip(jobs, results) if data}
+    for bot, bot_links in zip(bots, links):
+        for pl in bot_links:
+            data = fetched.get((bot, pl))
+            if data:
+                bot.logger.info(f"scraped {pl}")
+                bot.record_scraped(pl, data)
+            else:
+                data = bot.scrape_product(pl)
+            if data:
+                bot.product_data.append(data)
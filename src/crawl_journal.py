@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""append-only journal for resuming interrupted crawls"""
+
+import json
+import os
+import threading
+
+
+class CrawlJournal:
+    """ journal with one json event per line: the links discovered on the search pages, and the data or failure for
+    each product page scraped
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self.lock:
+            open(self.path, "w").close()
+
+    def _append(self, event: dict) -> None:
+        with self.lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(event) + "\n")
+
+    def record_links(self, links: list) -> None:
+        self._append({"event": "links", "links": links})
+
+    def record_done(self, url: str, data: dict) -> None:
+        self._append({"event": "done", "url": url, "data": data})
+
+    def record_failed(self, url: str) -> None:
+        self._append({"event": "failed", "url": url})
+
+    def load(self) -> tuple:
+        """ replay the journal
+
+        :return: links discovered, dict with the data of completed urls, set of failed urls
+        """
+        links: list = []
+        done: dict = {}
+        failed: set = set()
+        if not os.path.exists(self.path):
+            return links, done, failed
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    # last line may be incomplete after a crash
+                    continue
+                if event["event"] == "links":
+                    links.extend(event["links"])
+                elif event["event"] == "done":
+                    done[event["url"]] = event["data"]
+                    failed.discard(event["url"])
+                elif event["event"] == "failed" and event["url"] not in done:
+                    failed.add(event["url"])
+        return list(dict.fromkeys(links)), done, failed
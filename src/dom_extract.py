@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""extract product data with a single injected script per page instead of one webdriver command per element"""
+
+import typing
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.wait import WebDriverWait
+
+# spec: {"fields": {key: [selectors]}, "required": [keys], "rows": {"selector", "key", "value", "mode"}, "text"}
+# selectors are css, or xpath if prefixed with "xpath:"; selectors of a field are tried in order and the last one
+# matching wins; row mode "grouped" maps the first key element to the values (one value or a list of values), mode
+# "pairs" zips all key elements with all value elements
+EXTRACT_SCRIPT = """
+const spec = arguments[0];
+const text = el => spec.text === "textContent" ? el.textContent : el.innerText.trim();
+const all = (root, sel) => {
+    if (!sel.startsWith("xpath:")) {
+        return Array.from(root.querySelectorAll(sel));
+    }
+    const snapshot = document.evaluate(sel.slice(6), root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    return Array.from({length: snapshot.snapshotLength}, (_, i) => snapshot.snapshotItem(i));
+};
+const data = {};
+const missing = [];
+for (const [key, selectors] of Object.entries(spec.fields)) {
+    data[key] = null;
+    for (const sel of selectors) {
+        const found = all(document, sel);
+        if (found.length) {
+            data[key] = text(found[0]);
+        }
+    }
+    if (data[key] === null && (spec.required || []).includes(key)) {
+        missing.push(key);
+    }
+}
+if (spec.rows) {
+    const rows = all(document, spec.rows.selector);
+    if (!rows.length) {
+        missing.push("rows");
+    }
+    for (const row of rows) {
+        const keys = all(row, spec.rows.key).map(text);
+        const values = all(row, spec.rows.value).map(text);
+        if (spec.rows.mode === "pairs") {
+            keys.slice(0, values.length).forEach((k, i) => { data[k] = values[i]; });
+        } else if (keys.length && values.length) {
+            data[keys[0]] = values.length === 1 ? values[0] : values;
+        }
+    }
+}
+return {data: data, missing: missing};
+"""
+
+
+class IncompletePage(Exception):
+    pass
+
+
+def extract(driver, spec: dict, timeout: float = 10.) -> dict:
+    """ run the extraction script until all required elements are present, each attempt is a single round trip
+
+    :param driver: webdriver showing the product page
+    :param spec: declarative extraction spec of the vendor, see EXTRACT_SCRIPT
+    :param timeout: seconds to wait for required elements
+    :return: fields and spec table entries of the page
+    """
+    last: dict = {}
+
+    def attempt(d) -> typing.Optional[dict]:
+        last.update(d.execute_script(EXTRACT_SCRIPT, spec))
+        return None if last["missing"] else last["data"]
+
+    try:
+        return WebDriverWait(driver, timeout).until(attempt)
+    except TimeoutException as e:
+        raise IncompletePage(f"missing {last.get('missing')} on {driver.current_url}") from e
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""fast html parsing with lxml for pages of which only a few elements are needed"""
+
+import re
+import typing
+import lxml.html
+
+
+def parse(html: str) -> lxml.html.HtmlElement:
+    """parse a page with libxml2, which is much faster and leaner than building a BeautifulSoup tree"""
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # unicode strings with an xml encoding declaration are rejected
+        return lxml.html.document_fromstring(html.encode("utf-8"))
+
+
+def subtrees(html: str, tag: str, attribute: str, value: str) -> typing.Iterator[tuple]:
+    """ offset and parsed element of each element with the tag and attribute value, e.g., a single table of a large
+    page; the elements are cut out of the html at their start tag and matching end tag, and only they are parsed
+    """
+    start_tag = re.compile(rf"""<{tag}(?:\s[^>]*?)?\s{attribute}\s*=\s*["']{re.escape(value)}["']""", re.I)
+    tags = re.compile(rf"<(/?){tag}\b[^>]*>", re.I)
+    found = start_tag.search(html)
+    while found:
+        depth = 0
+        end = len(html)
+        for t in tags.finditer(html, found.start()):
+            depth += -1 if t.group(1) else 1
+            if depth == 0:
+                end = t.end()
+                break
+        yield found.start(), lxml.html.fragment_fromstring(html[found.start():end])
+        found = start_tag.search(html, end)
+
+
+def first(root: lxml.html.HtmlElement, xpath: str) -> typing.Optional[lxml.html.HtmlElement]:
+    found = root.xpath(xpath)
+    return found[0] if found else None
+
+
+def text_of(element: lxml.html.HtmlElement) -> str:
+    """whitespace-normalized text of an element, like http_backend.text_of"""
+    return " ".join(element.text_content().split())
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""persistent fingerprints of search result tiles for only re-scraping new or changed products"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import typing
+from src import constants as const
+
+
+class FingerprintIndex:
+    """ per product url, the hash of its search result tile, the time its product page was scraped last and the record
+    scraped; a product page is due if its tile changed or its record is older than max_age seconds
+    """
+
+    def __init__(self, path: str = const.FINGERPRINT_DB, max_age: float = const.FINGERPRINT_MAX_AGE) -> None:
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS products (url TEXT PRIMARY KEY, fingerprint TEXT, scraped REAL, "
+                        "record TEXT)")
+        self.db.commit()
+
+    def partition(self, links: list, snippets: dict) -> tuple:
+        """ split product links into the ones to be scraped and the ones whose last record can be carried forward
+
+        :param snippets: text of the search result tile per link, links without a tile are always scraped
+        :return: links to be scraped, records carried forward per link
+        """
+        due: list = []
+        carried: dict = {}
+        now = time.time()
+        with self.lock:
+            for pl in links:
+                row = self.db.execute("SELECT fingerprint, scraped, record FROM products WHERE url = ?",
+                                      (pl,)).fetchone()
+                if row and pl in snippets and row[0] == fingerprint(snippets[pl]) and now - row[1] <= self.max_age:
+                    carried[pl] = json.loads(row[2])
+                else:
+                    due.append(pl)
+        return due, carried
+
+    def record(self, url: str, snippet: typing.Optional[str], data: dict) -> None:
+        """store the record just scraped for a product page along with the fingerprint of its tile"""
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?)",
+                            (url, fingerprint(snippet) if snippet is not None else None, time.time(), json.dumps(data)))
+            self.db.commit()
+
+
+def fingerprint(snippet: str) -> str:
+    return hashlib.sha256(" ".join(snippet.split()).encode("utf-8")).hexdigest()
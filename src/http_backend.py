@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""lightweight backend for fetching and parsing server-rendered pages without starting a browser"""
+
+import logging
+import re
+import typing
+import urllib.parse
+import urllib3
+from bs4 import BeautifulSoup
+from src import constants as const
+from src import page_cache
+
+
+class FetchError(Exception):
+    def __init__(self, url: str, status: int, retry_after: typing.Optional[float] = None) -> None:
+        super().__init__(f"fetching {url} failed with status {status}")
+        self.url = url
+        self.status = status
+        self.retry_after = retry_after
+
+
+class BlockedPage(Exception):
+    """the server answered with a captcha or bot challenge instead of the page"""
+
+    def __init__(self, url: str) -> None:
+        super().__init__(f"fetching {url} returned a challenge page")
+        self.url = url
+
+
+BLOCKED_TITLE = re.compile(r"<title[^>]*>[^<]*(captcha|robot|access denied|attention required|just a moment)",
+                           re.I)
+
+
+class HttpFetcher:
+    """ pooled keep-alive http client, connections are reused across requests to the same host; pages are served from
+    and stored in the page cache if one is given
+    """
+
+    def __init__(self, logger: logging.Logger, maxsize: int = 10, timeout: float = 30., retries: int = 2,
+                 cache: page_cache.PageCache = None, controller=None) -> None:
+        """:param controller: adaptive_control.AdaptiveController for retries and the concurrency per host"""
+        self.logger = logger
+        self.cache = cache
+        self.controller = controller
+        headers = {
+            "User-Agent": const.USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "de-DE,de;q=0.9,en;q=0.8",
+        }
+        # urllib3 only retries connection errors, responses with Retry-After are raised as FetchError so that the
+        # controller backs off for the host
+        self.pool = urllib3.PoolManager(num_pools=10, maxsize=maxsize, headers=headers,
+                                        timeout=urllib3.Timeout(total=timeout),
+                                        retries=urllib3.Retry(retries, respect_retry_after_header=False))
+
+    def fetch(self, url: str) -> str:
+        if self.cache:
+            body = self.cache.lookup(url)
+            if body is not None:
+                return body
+        body = self.controller.call(url, self.download, self.logger) if self.controller else self.download(url)
+        if self.cache:
+            self.cache.put(url, body)
+        return body
+
+    def download(self, url: str) -> str:
+        response = self.pool.request("GET", url)
+        if response.status >= 400:
+            raise FetchError(url, response.status, get_retry_after(response.headers.get("Retry-After", "")))
+        body = response.data.decode(get_charset(response.headers.get("Content-Type", "")), errors="replace")
+        if BLOCKED_TITLE.search(body[:20000]):
+            raise BlockedPage(url)
+        return body
+
+    def fetch_and_parse(self, url: str, parser: typing.Callable[[str, str], typing.Optional[dict]]) -> typing.Optional[dict]:
+        """fetch a page and extract its data, None if the page has to be loaded in a browser instead"""
+        try:
+            data = parser(self.fetch(url), url)
+        except (FetchError, BlockedPage, urllib3.exceptions.HTTPError) as e:
+            self.logger.info(f"{e} - falling back to chrome")
+            return None
+        if not data:
+            self.logger.info(f"required selector missing for {url} - falling back to chrome")
+        return data
+
+
+def get_charset(content_type: str) -> str:
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.strip().partition("=")
+        if key.lower() == "charset" and value:
+            return value.strip('"')
+    return "utf-8"
+
+
+def get_retry_after(value: str) -> typing.Optional[float]:
+    """seconds from a Retry-After header, dates are not supported"""
+    try:
+        return max(0., float(value))
+    except ValueError:
+        return None
+
+
+def make_soup(html: str) -> BeautifulSoup:
+    return BeautifulSoup(html, "html.parser")
+
+
+def links_of(elements: list, url: str) -> list:
+    """absolute targets of the links given, relative to the url of the page they were found on"""
+    return [urllib.parse.urljoin(url, e["href"]) for e in elements if e.get("href")]
+
+
+def tile_snippets(html: str, url: str, tile_selector: str, link_selector: str) -> dict:
+    """text of each search result tile, keyed by the absolute target of the product link in the tile"""
+    snippets: dict = {}
+    for tile in make_soup(html).select(tile_selector):
+        link = tile.select_one(link_selector)
+        if link and link.get("href"):
+            snippets[urllib.parse.urljoin(url, link["href"])] = text_of(tile)
+    return snippets
+
+
+def text_of(element) -> str:
+    """whitespace-normalized text of an element, similar to the text selenium reports for it"""
+    return " ".join(element.get_text(" ").split())
+
+
+def max_page_number(html: str, pattern: str) -> typing.Optional[int]:
+    """ highest page number among the links of a search page, e.g., in its pagination
+
+    :param pattern: regular expression for links to search pages, with the page number as first group
+    """
+    numbers = [int(m.group(1)) for a in make_soup(html).find_all("a", href=True) for m in [re.search(pattern, a["href"])]
+               if m]
+    return max(numbers) if numbers else None
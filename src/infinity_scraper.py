@@ -1,102 +1,81 @@
 #!/usr/bin/env python3
 """scraper for infinity-semiconductor.com"""
 
-import os
 import datetime
-import json
 import logging
-import random
-import time
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+import typing
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from src import constants as const
+from src import http_backend
+from src import vendor_bot
 
+PRODUCT_SPEC = {
+    "fields": {
+        "name": ['div[id="product-details"] div h1'],
+        "price": ['xpath:/html/body/div[4]/div/div[3]/form/div[2]/div[2]/dl[1]/dd'],
+    },
+    "required": ["name"],
+    "rows": {"selector": 'xpath://*[@id="product-details"]/div/div[4]/table/tbody/tr', "key": "th", "value": "td",
+             "mode": "pairs"},
+}
 
-class InfinityBot(webdriver.Chrome):
-    def __init__(self, logger: logging.Logger, wait: int = 60, headless: bool = const.HEADLESS, maximize: bool = False,
-                 driver_path: str = const.CHROME_DRIVER_PATH, teardown: bool = True) -> None:
-        self.logger = logger
-        self.maximize = maximize
-        self.teardown = teardown
-        self.optimized: list = []
-        self.product_links: list = []
-        self.product_data: list = []
-        os.environ['PATH'] += ":" + driver_path
-        options = Options()
-        if headless:
-            options.headless = True
-            options.add_argument("--window-size=1920,1080")
-            user_agent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) " \
-                         "Chrome/60.0.3112.50 Safari/537.36"
-            options.add_argument(f'user-agent={user_agent}')
-            options.add_experimental_option("prefs", {"profile.default_content_setting_values.notifications": 2})
-        super().__init__(options=options)
-        self.implicitly_wait(wait)
-        if self.maximize:
-            self.maximize_window()
 
-    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
-        if self.teardown:
-            self.quit()
+class InfinityBot(vendor_bot.VendorBot):
+    vendor = "infinity"
+    product_spec = PRODUCT_SPEC
 
-    def land_search_page(self, keyword: str, page: int) -> None:
+    def search_url(self, keyword: str, page: int) -> str:
         if page == 1:
-            self.get('https://www.infinity-semiconductor.com/Integrated-Circuits(ICs)/'+keyword+'.aspx')
-        elif page > 1:
-            self.get('https://www.infinity-semiconductor.com/Integrated-Circuits(ICs)/'+keyword+'_page'+str(page)+'.aspx')
+            return self.base_url+'/Integrated-Circuits(ICs)/'+keyword+'.aspx'
+        return self.base_url+'/Integrated-Circuits(ICs)/'+keyword+'_page'+str(page)+'.aspx'
 
-    def get_product_pages(self, keyword: str, maxpages: int = None) -> None:
-        for c in range(1, maxpages+1):
-            self.land_search_page(keyword, c)
-            product_list = self.find_element(By.CSS_SELECTOR, 'div[class="products-list grid"]')
-            product_pages = product_list.find_elements(By.TAG_NAME, 'dl')
-            for p in product_pages:
-                self.product_links.append(p.find_elements(By.XPATH, './/dd/a')[0].get_attribute('href'))
-        self.product_links = list(dict.fromkeys(self.product_links))
+    def listing_links(self) -> list:
+        product_list = self.find_element(By.CSS_SELECTOR, 'div[class="products-list grid"]')
+        product_pages = product_list.find_elements(By.TAG_NAME, 'dl')
+        return [p.find_elements(By.XPATH, './/dd/a')[0].get_attribute('href') for p in product_pages]
 
-    def get_product_data(self) -> None:
-        for pl in self.product_links:
-            # add some randomness to the bot
-            time.sleep(random.randint(0, 4))
-            data: dict = {}
-            try:
-                self.get(pl)
-                data["name"] = self.find_element(By.CSS_SELECTOR, 'div[id="product-details"]').find_element(By.XPATH, './/div/h1').text
-                print(data["name"])
-                data["url"] = pl
-                data["price"] = None
-                try:
-                    data["price"] = self.find_element(By.XPATH, '/html/body/div[4]/div/div[3]/form/div[2]/div[2]/dl[1]/dd').text
-                except NoSuchElementException:
-                    pass
-                wait = WebDriverWait(self, 10)
-                rows = wait.until(EC.presence_of_all_elements_located((By.XPATH, '//*[@id="product-details"]/div/div[4]/table/tbody/tr')))
-                for row in rows:
-                    attributes = row.find_elements(By.XPATH, './/th')
-                    values = row.find_elements(By.XPATH, './/td')
-                    for a, v in zip(attributes, values):
-                        data[a.text] = v.text
-                self.product_data.append(data)
-                self.logger.info(f"scraped {pl}")
-                print(f"scraped {pl}")
-            except Exception:
-                self.logger.info(f"skipped {pl}")
-                print(f"skipped {pl}")
-                pass
+    @staticmethod
+    def page_count(html: str) -> typing.Optional[int]:
+        """number of search result pages according to the pagination of a search page"""
+        return http_backend.max_page_number(html, r"_page(\d+)\.aspx")
 
-    def save_data(self) -> None:
-        filename = "../data/" + datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S") + "-infinity.json"
-        with open(filename, "w") as f:
-            json.dump(self.product_data, f, indent=4)
+    @staticmethod
+    def parse_search_html(html: str, url: str) -> list:
+        soup = http_backend.make_soup(html)
+        return http_backend.links_of([dl.select_one('dd a') for dl in soup.select('div[class="products-list grid"] dl')
+                                      if dl.select_one('dd a')], url)
 
-    def util_func(self, search_term: str, pages: int) -> None:
-        self.get_product_pages(search_term, pages)
-        self.get_product_data()
-        self.save_data()
+    @staticmethod
+    def parse_search_snippets(html: str, url: str) -> dict:
+        return http_backend.tile_snippets(html, url, 'div[class="products-list grid"] dl', 'dd a')
+
+    def load_product(self, pl: str) -> dict:
+        data = super().load_product(pl)
+        print(data["name"])
+        return data
+
+    @staticmethod
+    def parse_product_html(html: str, pl: str) -> typing.Optional[dict]:
+        """extract product data from server-rendered html, None if a required element is missing"""
+        soup = http_backend.make_soup(html)
+        data: dict = {}
+        name = soup.select_one('div[id="product-details"] div > h1')
+        if not name:
+            return None
+        data["name"] = http_backend.text_of(name)
+        data["url"] = pl
+        data["price"] = None
+        price = soup.select_one('body > div:nth-of-type(4) > div > div:nth-of-type(3) > form > div:nth-of-type(2) > '
+                                'div:nth-of-type(2) > dl:nth-of-type(1) > dd')
+        if price:
+            data["price"] = http_backend.text_of(price)
+        # browsers insert the tbody, so it may be missing from the raw html
+        rows = soup.select('div[id="product-details"] > div > div:nth-of-type(4) > table tr')
+        if not rows:
+            return None
+        for row in rows:
+            for a, v in zip(row.find_all('th'), row.find_all('td')):
+                data[http_backend.text_of(a)] = http_backend.text_of(v)
+        return data
 
 
 if __name__ == "__main__":
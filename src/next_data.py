@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""extract product data from the json payload embedded in pages of Next.js apps instead of their rendered dom"""
+
+import json
+import re
+import typing
+
+PAYLOAD_PATTERN = re.compile(r'<script[^>]*\bid="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+
+# returns the payload of a page loaded in chrome without traversing the dom
+PAYLOAD_SCRIPT = "return window.__NEXT_DATA__ || null;"
+
+
+def payload_of(html: str) -> typing.Optional[dict]:
+    """json payload embedded in the html of a page, None if the page has none"""
+    match = PAYLOAD_PATTERN.search(html)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return None
+
+
+def resolve(obj: typing.Any, path: str) -> typing.Any:
+    """value at a dotted path such as "priceBreaks.0.price", None if the path does not exist"""
+    for key in path.split("."):
+        if isinstance(obj, dict):
+            obj = obj.get(key)
+        elif isinstance(obj, list) and key.isdigit() and int(key) < len(obj):
+            obj = obj[int(key)]
+        else:
+            return None
+    return obj
+
+
+def value_at(obj: typing.Any, path: str, container: bool = False) -> typing.Any:
+    """ scalar at a path from the root of the payload, None if the path is missing or holds another type
+
+    :param container: look for a list at the path rather than a scalar
+    """
+    value = resolve(obj, path)
+    if value is None or isinstance(value, dict) or isinstance(value, list) != container:
+        return None
+    return value
+
+
+def extract(payload: typing.Optional[dict], spec: dict) -> typing.Optional[dict]:
+    """ map a payload to a product record like the ones scraped from the dom
+
+    :param spec: {"fields": {key: [paths]}, "required": [keys], "attributes": {"list": [paths], "key", "value"}}, the
+        paths start at the root of the payload, so each field is read from the product object only; the first path
+        found per field wins
+    :return: record without url, None if a required field is missing
+    """
+    if not payload:
+        return None
+    data: dict = {}
+    for key, paths in spec["fields"].items():
+        for path in paths:
+            value = value_at(payload, path)
+            if value is not None:
+                data[key] = str(value)
+                break
+    if any(key not in data for key in spec.get("required", [])):
+        return None
+    attributes = spec.get("attributes")
+    if attributes:
+        entries = next((e for e in (value_at(payload, path, container=True) for path in attributes["list"]) if e), None)
+        if not entries:
+            return None
+        for entry in entries:
+            key, value = resolve(entry, attributes["key"]), resolve(entry, attributes["value"])
+            if key is not None and value is not None:
+                data[str(key)] = ", ".join(map(str, value)) if isinstance(value, list) else str(value)
+    return data
@@ -7,9 +7,15 @@ import itertools
 import json
 import logging
 import os
+import re
 import typing
 import ontor
 import owlready2
+from src import constants as const
+from src import product_catalog
+from src import quantities
+from src import rdf_stream
+from src import record_stream
 
 CONRAD_DICT = {
     "product_name": ["name", "string"],
@@ -85,128 +91,136 @@ MC_SPEEDS = {
 
 ADD_ARTIFICIAL_SC = True
 
+# write the ontologies as N-Triples to ../data/*.nt one product at a time instead of building them in owlready2 and
+# saving them to ../data/*.owl, for catalogs that do not fit into memory
+STREAM_ONTOLOGIES = False
+
+# also write the preprocessed data as memory-mappable columnar files ../data/*_data_dump.arrow for the analysis tools,
+# requires pyarrow
+COLUMNAR_DUMPS = False
+
+# suffixes for the packaging of the same part, e.g., tape and reel or lead-free, of casefolded identifiers
+PACKAGING_SUFFIX = re.compile(r"(?:[-/#](?:tr|reel|rl|tape|tray|tube|ct|nd|ct-nd|dkr-nd|pbf|trpbf))+$")
+
+# python types of the data property ranges used in the vocab dicts, as in ontor
+DP_RANGE_TYPES = {"float": float, "integer": int, "string": str, "boolean": bool}
+
+# how to parse the values of the vocab keys, see quantities.normalize
+CONRAD_RULES = {
+    "price": {"dimension": "currency", "decimal": ","},
+    "clock_rate": {"dimension": "frequency", "dtype": "int", "bare": True},
+    "number_ios": {"dtype": "int"},
+    "operating_temp_max": {"dimension": "temperature", "dtype": "int", "bare": True},
+    "operating_temp_min": {"dimension": "temperature", "dtype": "int", "bare": True},
+    "voltage_max": {"dimension": "voltage", "bare": True},
+    "voltage_min": {"dimension": "voltage", "bare": True},
+    "core_size_bit": {"dimension": "bits", "dtype": "int", "bare": True},
+    "program_memory_size_kb": {"dimension": "memory"},
+}
+
+INFINITY_RULES = {
+    "price": {"dimension": "currency"},
+    "number_ios": {"dtype": "int"},
+    "quantity_available": {"dimension": "pieces", "dtype": "int", "bare": True},
+    "core_size_bit": {"dimension": "bits", "dtype": "int", "bare": True},
+    "clock_rate": {"dimension": "frequency"},
+    "program_memory_size_kb": {"dimension": "memory"},
+    "operating_temp": {"source": "OPERATING TEMPERATURE", "range": ["operating_temp_min", "operating_temp_max"],
+                       "dimension": "temperature", "dtype": "int", "bare": True},
+    "voltage": {"source": "VOLTAGE - SUPPLY (VCC/VDD)", "range": ["voltage_min", "voltage_max"],
+                "dimension": "voltage"},
+    "peripherals": {"split": ", "},
+    "connectivity": {"split": ", "},
+}
 
-def preprocess_conrad_data(data: list, logger: logging.Logger, pp_file: typing.Optional[str] = None) -> None:
+
+def preprocess_conrad_data(data: typing.Iterable[dict], logger: logging.Logger,
+                           pp_file: typing.Optional[str] = None, columnar: bool = False) -> typing.Iterator[dict]:
+    """ preprocess records in batches of columns, they are also written to pp_file if given and, with columnar, to
+    its columnar copy
+    """
     # TODO: also add attributes scraped for single-board computers, e.g., "Modell"
-    for elem in data:
-        # reduce to values if entry is of type [value, unit]
-        for k in CONRAD_DICT:
-            if CONRAD_DICT[k][0] in elem:
-                if len(CONRAD_DICT[k]) == 2 and isinstance(elem[CONRAD_DICT[k][0]], list):
-                    elem[CONRAD_DICT[k][0]] = elem[CONRAD_DICT[k][0]][0]
-        # properly format
-        elem["price"] = float(elem["price"].split()[0].replace(",", "."))
-        for k in "clock_rate", "number_ios", "operating_temp_max", "operating_temp_min":
-            try:
-                elem[CONRAD_DICT[k][0]] = int(elem[CONRAD_DICT[k][0]])
-            except KeyError:
-                logger.info(f"no {k} available for {elem}")
-        for k in "voltage_max", "voltage_min":
-            try:
-                elem[CONRAD_DICT[k][0]] = float(elem[CONRAD_DICT[k][0]])
-            except KeyError:
-                logger.info(f"no {k} available for {elem}")
-        try:
-            elem[CONRAD_DICT["core_size_bit"][0]] = int(elem[CONRAD_DICT["core_size_bit"][0]].split("-Bit")[0])
-        except KeyError:
-            logger.info(f"no core_size_bit available for {elem}")
-        try:
-            if "KB" in elem[CONRAD_DICT["program_memory_size_kb"][0]]:
-                elem[CONRAD_DICT["program_memory_size_kb"][0]] = float(elem[CONRAD_DICT["program_memory_size_kb"][0]].split(" KB")[0])
-            elif "B" in elem[CONRAD_DICT["program_memory_size_kb"][0]]:
-                elem[CONRAD_DICT["program_memory_size_kb"][0]] = float(elem[CONRAD_DICT["program_memory_size_kb"][0]].split(" B")[0])/1000
-            else:
-                logger.info(f"unexpected memory unit in {elem[CONRAD_DICT['program_memory_size_kb'][0]]} for {elem[CONRAD_DICT['product_name'][0]]}")
-        except KeyError:
-            logger.info(f"no program_memory_size_kb available for {elem}")
-    if pp_file:
-        with open(pp_file, "w") as ppf:
-            json.dump(data, ppf, indent=4)
-
-
-def preprocess_infinity_data(data: list, logger: logging.Logger, pp_file: typing.Optional[str] = None) -> None:
+    return dump_while_streaming(quantities.normalize_stream(data, CONRAD_DICT, CONRAD_RULES, logger), pp_file,
+                                columnar)
+
+
+def preprocess_infinity_data(data: typing.Iterable[dict], logger: logging.Logger,
+                             pp_file: typing.Optional[str] = None, columnar: bool = False) -> typing.Iterator[dict]:
+    """ preprocess records in batches of columns, they are also written to pp_file if given and, with columnar, to
+    its columnar copy
+    """
     # TODO: do not treat ram info as string? - same for conrad data
-    for elem in data:
-        try:
-            elem["price"] = float(elem["price"][1:])
-        except TypeError:
-            logger.info(f"issue with the price for {elem[INFINITY_DICT['product_name'][0]]}")
-            elem.pop("price")
-        try:
-            elem[INFINITY_DICT["number_ios"][0]] = int(elem[INFINITY_DICT["number_ios"][0]])
-        except KeyError:
-            logger.info(f"no number_ios available for {elem[INFINITY_DICT['product_name'][0]]}")
-        elem[INFINITY_DICT["quantity_available"][0]] = int(elem[INFINITY_DICT["quantity_available"][0]].split(" pcs")[0])
-        try:
-            elem[INFINITY_DICT["core_size_bit"][0]] = int(elem[INFINITY_DICT["core_size_bit"][0]].split("-Bit")[0])
-        except KeyError:
-            logger.info(f"no core_size_bit available for {elem[INFINITY_DICT['product_name'][0]]}")
-        except ValueError:
-            logger.info(f"unexpected value in {elem[INFINITY_DICT['core_size_bit'][0]]} for {elem[INFINITY_DICT['product_name'][0]]}")
-            elem.pop(INFINITY_DICT['core_size_bit'][0])
-        try:
-            if "MHz" in elem[INFINITY_DICT["clock_rate"][0]]:
-                elem[INFINITY_DICT["clock_rate"][0]] = float(elem[INFINITY_DICT["clock_rate"][0]].split("MHz")[0])
-            else:
-                logger.info(f"unexpected unit in {elem[INFINITY_DICT['clock_rate'][0]]} for {elem[INFINITY_DICT['product_name'][0]]}")
-                elem.pop(INFINITY_DICT['clock_rate'][0])
-        except KeyError:
-            logger.info(f"no clock_rate available for {elem[INFINITY_DICT['product_name'][0]]}")
-        try:
-            if "KB " in elem[INFINITY_DICT["program_memory_size_kb"][0]]:
-                elem[INFINITY_DICT["program_memory_size_kb"][0]] = float(elem[INFINITY_DICT["program_memory_size_kb"][0]].split("KB")[0])
-            elif "MB " in elem[INFINITY_DICT["program_memory_size_kb"][0]]:
-                elem[INFINITY_DICT["program_memory_size_kb"][0]] = float(elem[INFINITY_DICT["program_memory_size_kb"][0]].split("MB")[0])*1000
-            else:
-                logger.info(f"unexpected unit in {elem[INFINITY_DICT['program_memory_size_kb'][0]]} for {elem[INFINITY_DICT['product_name'][0]]}")
-                elem.pop(INFINITY_DICT['program_memory_size_kb'][0])
-        except KeyError:
-            logger.info(f"no program_memory_size_kb available for {elem[INFINITY_DICT['product_name'][0]]}")
-        # split up temperature values
-        try:
-            if " ~ " not in elem["OPERATING TEMPERATURE"]:
-                logger.info(f"no operating_temp available for {elem[INFINITY_DICT['product_name'][0]]}")
-                continue
-            elem[INFINITY_DICT["operating_temp_max"][0]] = int(elem["OPERATING TEMPERATURE"].split(" ~ ")[1].split("°")[0])
-            elem[INFINITY_DICT["operating_temp_min"][0]] = int(elem["OPERATING TEMPERATURE"].split(" ~ ")[0].split("°")[0])
-        except KeyError:
-            logger.info(f"no operating_temp available for {elem[INFINITY_DICT['product_name'][0]]}")
-        # split up voltage values
-        try:
-            elem[INFINITY_DICT["voltage_max"][0]] = float(elem["VOLTAGE - SUPPLY (VCC/VDD)"].split(" ~ ")[1].split(" V")[0])
-            elem[INFINITY_DICT["voltage_min"][0]] = float(elem["VOLTAGE - SUPPLY (VCC/VDD)"].split(" ~ ")[0].split(" V")[0])
-        except IndexError:
-            logger.info(f"issue with voltage for {elem[INFINITY_DICT['product_name'][0]]}")
-        except KeyError:
-            logger.info(f"no voltage available for {elem[INFINITY_DICT['product_name'][0]]}")
-        # handle lists
-        for k1, k2 in ("peripherals", "PERIPHERALS"), ("connectivity", "CONNECTIVITY"):
-            try:
-                elem[INFINITY_DICT[k1][0]] = elem[k2].split(", ")
-            except KeyError:
-                logger.info(f"no {k1} available for {elem[INFINITY_DICT['product_name'][0]]}")
-    if pp_file:
-        with open(pp_file, "w") as ppf:
-            json.dump(data, ppf, indent=4)
+    return dump_while_streaming(quantities.normalize_stream(data, INFINITY_DICT, INFINITY_RULES, logger), pp_file,
+                                columnar)
 
 
-def create_conrad_onto(scraped_data: list, logger: logging.Logger) -> None:
+def dump_while_streaming(records: typing.Iterable[dict], pp_file: typing.Optional[str],
+                         columnar: bool = False) -> typing.Iterator[dict]:
+    """ pass records through, writing each to a json list in pp_file as it goes by; the file is only complete once
+    all records have been consumed, as is the columnar copy, which is written at the end
+    """
+    if not pp_file:
+        yield from records
+        return
+    writer = None
+    if columnar:
+        from src import columnar_dump
+        writer = columnar_dump.ColumnarWriter(columnar_dump.columnar_path(pp_file))
+    with open(pp_file, "w") as ppf:
+        ppf.write("[")
+        for c, record in enumerate(records):
+            ppf.write(("," if c else "") + "\n" + json.dumps(record))
+            if writer:
+                writer.write(record)
+            yield record
+        ppf.write("\n]\n")
+    if writer:
+        writer.close()
+
+
+def create_conrad_onto(scraped_data: typing.Iterable[dict], logger: logging.Logger) -> None:
+    pp_data = dump_identifiers("conrad", preprocess_conrad_data(scraped_data, logger, "../data/conrad_data_dump.json",
+                                                                   COLUMNAR_DUMPS))
+    if STREAM_ONTOLOGIES:
+        stream_onto("conrad", pp_data, logger, CONRAD_DICT)
+        return
     conrad = ontor.OntoEditor("http://example.org/conrad.owl", "../data/conrad.owl")
     # TODO: add single-core attributes too
     create_taxo(conrad)
     dps = dp_distinction(CONRAD_DICT, "microcontroller")
     conrad.add_dps(dps)
-    preprocess_conrad_data(scraped_data, logger, "../data/conrad_data_dump.json")
-    populate_with_scraped_data("conrad", conrad, scraped_data, logger, CONRAD_DICT)
+    populate_with_scraped_data("conrad", conrad, pp_data, logger, CONRAD_DICT)
 
 
-def create_infinity_onto(scraped_data: list, logger: logging.Logger) -> None:
+def create_infinity_onto(scraped_data: typing.Iterable[dict], logger: logging.Logger) -> None:
+    pp_data = dump_identifiers("infinity",
+                               preprocess_infinity_data(scraped_data, logger, "../data/infinity_data_dump.json",
+                                                        COLUMNAR_DUMPS))
+    if STREAM_ONTOLOGIES:
+        stream_onto("infinity", pp_data, logger, INFINITY_DICT)
+        return
     infinity = ontor.OntoEditor("http://example.org/infinity.owl", "../data/infinity.owl")
     create_taxo(infinity)
     dps = dp_distinction(INFINITY_DICT, "microcontroller")
     infinity.add_dps(dps)
-    preprocess_infinity_data(scraped_data, logger, "../data/infinity_data_dump.json")
-    populate_with_scraped_data("infinity", infinity, scraped_data, logger, INFINITY_DICT)
+    populate_with_scraped_data("infinity", infinity, pp_data, logger, INFINITY_DICT)
+
+
+def stream_onto(prefix: str, pp_data: typing.Iterable[dict], logger: logging.Logger, pd_dict: dict,
+                directory: str = "../data/") -> str:
+    """ write the tbox and then one product at a time to an N-Triples file with the IRIs of the owlready2 ontology, so
+    the memory needed does not grow with the catalog
+
+    :return: path of the file written
+    """
+    path = os.path.join(directory, f"{prefix}.nt")
+    with rdf_stream.NTriplesWriter(path, f"http://example.org/{prefix}.owl", logger) as writer:
+        writer.write_taxo(MC_CLASSES if ADD_ARTIFICIAL_SC else [MC_CLASSES[0]])
+        writer.write_dps(dp_distinction(pd_dict, "microcontroller"))
+        for c, prod in enumerate(pp_data):
+            writer.write_instances(instance_tuples(prefix, c, prod, logger, pd_dict))
+    logger.info(f"streamed {writer.count} {prefix} products to {path}")
+    return path
 
 
 def dp_distinction(vocab: dict, cname: str) -> list:
@@ -224,23 +238,86 @@ def create_taxo(oe: ontor.OntoEditor) -> None:
         oe.add_taxo([MC_CLASSES[0]])
 
 
-def populate_with_scraped_data(prefix: str, pd_ontor: ontor.OntoEditor, scraped_data: list, logger: logging.Logger, pd_dict: dict) -> None:
-    for c, prod in enumerate(scraped_data):
-        instance_name = prefix + "_" + "0"*(4-len(str(c))) + str(c)
-        if ADD_ARTIFICIAL_SC:
-            parent_name = get_parent_for_speed(prod, pd_dict["clock_rate"][0])
+def populate_with_scraped_data(prefix: str, pd_ontor: ontor.OntoEditor, scraped_data: typing.Iterable[dict], logger: logging.Logger, pd_dict: dict) -> None:
+    """add an individual per product with its data property assertions, the whole catalog is loaded in one batch"""
+    ins_data = (instance_tuples(prefix, c, prod, logger, pd_dict) for c, prod in enumerate(scraped_data))
+    count = bulk_add_instances(pd_ontor, itertools.chain.from_iterable(ins_data), logger)
+    logger.info(f"added {count} {prefix} products to {pd_ontor.path}")
+
+
+def instance_tuples(prefix: str, c: int, prod: dict, logger: logging.Logger, pd_dict: dict) -> list:
+    """ontor instance tuples [instance, class, property, value, range type] for the c-th product"""
+    name = instance_name(prefix, c)
+    if ADD_ARTIFICIAL_SC:
+        parent_name = get_parent_for_speed(prod, pd_dict["clock_rate"][0])
+    else:
+        parent_name = "microcontroller"
+    prod_ins_data = [[name, parent_name, None, None, None]]
+    for key in pd_dict:
+        if not pd_dict[key][0] in prod:
+            logger.info(f"{key} not available for product number {name}")
+        elif isinstance(prod[pd_dict[key][0]], list):
+            for v in prod[pd_dict[key][0]]:
+                prod_ins_data.append([name, parent_name, key, v, pd_dict[key][1]])
+        else:
+            prod_ins_data.append([name, parent_name, key, prod[pd_dict[key][0]], pd_dict[key][1]])
+    return prod_ins_data
+
+
+def instance_name(prefix: str, c: int) -> str:
+    return prefix + "_" + "0"*(4-len(str(c))) + str(c)
+
+
+def bulk_add_instances(pd_ontor: ontor.OntoEditor, ins_data: typing.Iterable[list], logger: logging.Logger) -> int:
+    """ like ontor's add_instances, but the triples are inserted into the owlready2 quadstore directly, with one
+    executemany per table and a single commit, rather than by creating python objects per individual and assertion;
+    the ontology is saved once at the end; assertions of individuals that already exist are replaced
+
+    :param ins_data: tuples of the form [instance, class, property, value, range type]
+    :return: number of individuals added
+    """
+    onto = pd_ontor.onto
+    world = pd_ontor.onto_world
+    c = onto.graph.c
+    entities: dict = {}
+    individuals: dict = {}
+    objs: list = []
+    datas: list = []
+    for inst in ins_data:
+        if not (inst[0] and inst[1]):
+            logger.warning(f"unexpected instance info: {inst}")
+            continue
+        for name in inst[1], inst[2]:
+            if name and name not in entities:
+                entities[name] = onto[name]
+        if inst[0] not in individuals:
+            s = individuals[inst[0]] = world._abbreviate(onto.base_iri + inst[0])
+            objs.append((c, s, owlready2.rdf_type, owlready2.owl_named_individual))
+            objs.append((c, s, owlready2.rdf_type, entities[inst[1]].storid))
+        if not any(inst[2:]):
+            continue
+        if not (inst[2] and inst[3]):
+            # as in ontor, assertions with a falsy value, e.g., a price of 0, are skipped
+            logger.warning(f"unexpected triple: {inst}")
+            continue
+        pred = entities[inst[2]]
+        if owlready2.DataProperty in pred.is_a:
+            try:
+                value = DP_RANGE_TYPES[inst[4]](inst[3]) if inst[4] else inst[3]
+                datas.append((c, individuals[inst[0]], pred.storid, *owlready2.to_literal(value)))
+            except (KeyError, TypeError, ValueError):
+                logger.warning(f"unexpected data property value: {inst}")
         else:
-            parent_name = "microcontroller"
-        prod_ins_data = [[instance_name, parent_name, None, None, None]]
-        for key in pd_dict:
-            if not pd_dict[key][0] in prod:
-                logger.info(f"{key} not available for product number {instance_name}")
-            elif isinstance(prod[pd_dict[key][0]], list):
-                for v in prod[pd_dict[key][0]]:
-                    prod_ins_data.append([instance_name, parent_name, key, v, pd_dict[key][1]])
-            else:
-                prod_ins_data.append([instance_name, parent_name, key, prod[pd_dict[key][0]], pd_dict[key][1]])
-        pd_ontor.add_instances(prod_ins_data)
+            objs.append((c, individuals[inst[0]], pred.storid, onto[inst[3]].storid))
+    subjects = [(c, s) for s in individuals.values()]
+    world.graph.db.executemany("DELETE FROM objs WHERE c = ? AND s = ?", subjects)
+    world.graph.db.executemany("DELETE FROM datas WHERE c = ? AND s = ?", subjects)
+    world.graph.db.executemany("INSERT OR IGNORE INTO objs VALUES (?, ?, ?, ?)", objs)
+    world.graph.db.executemany("INSERT OR IGNORE INTO datas VALUES (?, ?, ?, ?, ?)", datas)
+    world.graph.commit()
+    world.graph.analyze()
+    onto.save(file=pd_ontor.path)
+    return len(individuals)
 
 
 def get_parent_for_speed(data: dict, speed_key: str) -> str:
@@ -259,67 +336,93 @@ def save_reference_alignment_as_csv(alignment_file: str) -> None:
             writer.writerow(line)
 
 
-def create_reference_alignment(conrad_iri: str = "http://example.org/conrad.owl",
-                               infinity_iri: str = "http://example.org/infinity.owl") -> list:
-    """ create reference alignment based on infinity part number and conrad typ
+def create_reference_alignment(ids_conrad: str = "../data/conrad_ids.csv",
+                               ids_infinity: str = "../data/infinity_ids.csv") -> list:
+    """ create reference alignment based on infinity part number and conrad typ, joining the identifier to IRI maps
+    written while populating the ontologies
 
     :return: nested list with expected correspondences [elem1, elem2, relationship]
     """
-    matches = find_matches("../data/conrad_data_dump.json", "../data/infinity_data_dump.json")
-    correspondences: list = []
-    owlready2.onto_path.append("../data/")
-    conrad_onto = owlready2.get_ontology(conrad_iri).load()
-    infinity_onto = owlready2.get_ontology(infinity_iri).load()
-    for m in matches:
-        conrad_iri = conrad_onto.search_one(prod_type=m[0][1])
-        infinity_iri = infinity_onto.search_one(part_number=m[1][1])
-        correspondences.append([conrad_iri.iri, infinity_iri.iri, "equivalence"])
-    return correspondences
-
-
-def find_matches(pp_file_conrad: str, pp_file_infinity: str) -> list:
-    """ find matches between products, relevant keys are Typ (Modell for raspis) and PART NUMBER for conrad and
-    infinity, respectively
+    return [[iri_c, iri_i, "equivalence"] for iri_c, iri_i in join_identifiers(load_identifiers(ids_conrad),
+                                                                                load_identifiers(ids_infinity))]
+
+
+def normalize_identifier(identifier: str) -> str:
+    """casefolded identifier without whitespace and packaging suffixes, e.g., attiny85-20pu for ATtiny85-20PU -TR"""
+    return PACKAGING_SUFFIX.sub("", "".join(str(identifier).split()).casefold())
+
+
+def product_identifier(prefix: str, prod: dict) -> typing.Optional[str]:
+    """first identifier attribute of the vendor the product has"""
+    return next((prod[k] for k in const.PART_NUMBER_KEYS[prefix] if k in prod), None)
+
+
+def dump_identifiers(prefix: str, records: typing.Iterable[dict], directory: str = "../data/") -> typing.Iterator[dict]:
+    """ pass preprocessed records through on their way to the population, writing the identifier and the IRI of the
+    individual each record becomes to {prefix}_ids.csv
     """
-    matches: list = []
-    ids_conrad: list = []
-    for entry in load_pp_dump(pp_file_conrad):
-        if "Typ" in entry:
-            ids_conrad.append((entry["name"], entry["Typ"]))
-        elif "Modell" in entry:
-            ids_conrad.append((entry["name"], entry["Modell"]))
-        else:
-            print(f"conrad: no identifier for {entry}")
-    ids_infinity: list = []
-    for entry in load_pp_dump(pp_file_infinity):
-        if "PART NUMBER" in entry:
-            ids_infinity.append((entry["name"], entry["PART NUMBER"]))
-        else:
-            print(f"infinity: no identifier for {entry}")
-    for id_c, id_i in itertools.product(ids_conrad, ids_infinity):
-        if id_c[1] == id_i[1]:
-            matches.append((id_c, id_i))
-    return matches
-
-
-def load_pp_dump(pp_file: str) -> list:
-    """load data dumps w preprocessed data"""
-    with open(pp_file, "r") as pp_dump:
-        pp_data = json.load(pp_dump)
-    return pp_data
-
-
-def create_ontos(logger) -> None:
-    """create ontology files for conrad and infinity"""
-    # access data scraped
-    scraped_files = os.listdir("../data/")
-    with open("../data/"+sorted(sf for sf in scraped_files if "conrad.json" in sf)[-1], "r") as conrad_file:
-        conrad_data = json.load(conrad_file)
-    with open("../data/"+sorted(sf for sf in scraped_files if "infinity.json" in sf)[-1]) as infinity_file:
-        infinity_data = json.load(infinity_file)
-    # create ontologies
-    create_conrad_onto(conrad_data, logger)
-    create_infinity_onto(infinity_data, logger)
+    with open(os.path.join(directory, f"{prefix}_ids.csv"), "w", newline="") as ids_file:
+        writer = csv.writer(ids_file)
+        for c, record in enumerate(records):
+            identifier = product_identifier(prefix, record)
+            if identifier is not None:
+                writer.writerow([identifier, f"http://example.org/{prefix}.owl#{instance_name(prefix, c)}"])
+            yield record
+
+
+def load_identifiers(ids_file: str) -> list:
+    """[identifier, IRI] rows of an identifier map"""
+    with open(ids_file, newline="") as f:
+        return list(csv.reader(f))
+
+
+def join_identifiers(left: typing.Iterable[tuple], right: typing.Iterable[tuple]) -> list:
+    """ hash join of (identifier, value) pairs on the normalized identifiers
+
+    :return: (left value, right value) per pair of matching identifiers, in the order of left
+    """
+    index: dict = {}
+    for identifier, value in right:
+        index.setdefault(normalize_identifier(identifier), []).append(value)
+    return [(value, match) for identifier, value in left for match in index.get(normalize_identifier(identifier), [])]
+
+
+def latest_scraped_file(vendor: str, directory: str = "../data/") -> str:
+    """most recent output file for the vendor, file names start with the time of scraping"""
+    scraped_files = [sf for sf in os.listdir(directory) if record_stream.is_output_of(sf, vendor)]
+    return os.path.join(directory, sorted(scraped_files)[-1])
+
+
+def iter_scraped_data(vendor: str, directory: str = "../data/",
+                      catalog: typing.Optional[product_catalog.ProductCatalog] = None, run: typing.Optional[int] = None,
+                      latest_per_product: bool = False) -> typing.Iterator[dict]:
+    """ yield the products scraped for the vendor one at a time; from the catalog, the records of the given run, or of
+    the last one, or with latest_per_product the most recent record of every product scraped in any run; the data
+    scraped last in the directory if there is no catalog or it has no runs for the vendor
+    """
+    if catalog:
+        if latest_per_product:
+            yield from catalog.latest(vendor)
+            return
+        run = catalog.last_run(vendor) if run is None else run
+        if run is not None:
+            yield from catalog.snapshot(run)
+            return
+    yield from record_stream.read_records(latest_scraped_file(vendor, directory))
+
+
+def create_ontos(logger, runs: dict = None, latest_per_product: bool = False) -> None:
+    """ create ontology files for conrad and infinity from the catalog if there is one
+
+    :param runs: run of the catalog per vendor, the last one by default
+    :param latest_per_product: use the most recent record of every product across runs instead of a single run
+    """
+    runs = runs or {}
+    catalog = product_catalog.ProductCatalog() if os.path.exists(const.CATALOG_DB) else None
+    create_conrad_onto(iter_scraped_data("conrad", catalog=catalog, run=runs.get("conrad"),
+                                         latest_per_product=latest_per_product), logger)
+    create_infinity_onto(iter_scraped_data("infinity", catalog=catalog, run=runs.get("infinity"),
+                                           latest_per_product=latest_per_product), logger)
     save_reference_alignment_as_csv("../data/gold_standard.csv")
 
 
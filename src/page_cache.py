@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""persistent on-disk cache for scraped pages"""
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import typing
+import urllib.parse
+from src import constants as const
+
+
+class CacheMiss(Exception):
+    pass
+
+
+class PageCache:
+    """ compressed page bodies stored under the hash of their canonical url, with a time to live per host and least
+    recently used eviction once the cache exceeds max_bytes; in offline mode, pages are served regardless of their age
+    and misses raise CacheMiss instead of allowing the page to be downloaded
+    """
+
+    def __init__(self, directory: str = const.CACHE_DIR, ttls: dict = None, default_ttl: float = const.DEFAULT_CACHE_TTL,
+                 max_bytes: int = const.CACHE_MAX_BYTES, offline: bool = False) -> None:
+        self.directory = directory
+        self.ttls = const.CACHE_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "pages"), exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(directory, "index.sqlite"), check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS pages (key TEXT PRIMARY KEY, url TEXT, fetched REAL, accessed REAL, "
+                        "size INTEGER)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed)")
+        self.db.commit()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, "pages", key + ".gz")
+
+    def get(self, url: str) -> typing.Optional[str]:
+        """cached page body, None if the page is not cached or has expired"""
+        url = canonical_url(url)
+        key = url_key(url)
+        with self.lock:
+            if not self._is_fresh(url, key):
+                return None
+            try:
+                with gzip.open(self._path(key), "rt", encoding="utf-8") as f:
+                    body = f.read()
+            except FileNotFoundError:
+                self.db.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self.db.commit()
+                return None
+            self.db.execute("UPDATE pages SET accessed = ? WHERE key = ?", (time.time(), key))
+            self.db.commit()
+        return body
+
+    def contains(self, url: str) -> bool:
+        url = canonical_url(url)
+        with self.lock:
+            return self._is_fresh(url, url_key(url))
+
+    def _is_fresh(self, url: str, key: str) -> bool:
+        row = self.db.execute("SELECT fetched FROM pages WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return False
+        ttl = self.ttls.get(urllib.parse.urlsplit(url).netloc, self.default_ttl)
+        return self.offline or time.time() - row[0] <= ttl
+
+    def lookup(self, url: str) -> typing.Optional[str]:
+        """like get, but raises CacheMiss in offline mode rather than returning None"""
+        body = self.get(url)
+        if body is None and self.offline:
+            raise CacheMiss(f"{url} is not cached")
+        return body
+
+    def put(self, url: str, body: str) -> None:
+        url = canonical_url(url)
+        key = url_key(url)
+        data = gzip.compress(body.encode("utf-8"))
+        with self.lock:
+            with open(self._path(key), "wb") as f:
+                f.write(data)
+            now = time.time()
+            self.db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)", (key, url, now, now, len(data)))
+            self.db.commit()
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM pages ORDER BY accessed").fetchall():
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            self.db.execute("DELETE FROM pages WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+        self.db.commit()
+
+
+def canonical_url(url: str) -> str:
+    """lowercase scheme and host, drop default ports and fragments, sort query parameters"""
+    parts = urllib.parse.urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme, netloc.rsplit(":", 1)[-1]) in (("http", "80"), ("https", "443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parts.query, keep_blank_values=True)))
+    return urllib.parse.urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
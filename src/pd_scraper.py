@@ -5,9 +5,14 @@ main module for scraping data and creating ontologies
 
 import datetime
 import logging
-from src import conrad_scraper
-from src import infinity_scraper
+from src import adaptive_control
+from src import command_profiler
+from src import crawl_engine
+from src import fingerprint_index
 from src import onto_creator
+from src import page_cache
+from src import pipelines
+from src import product_catalog
 
 
 PDS_LOGFILE = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")+"_pd_scraper.log"
@@ -19,18 +24,104 @@ pds_logger.setLevel(logging.DEBUG)
 pds_logger.addHandler(pds_handler)
 
 
-def main(scrape_new: bool, search_terms: dict, pages: int) -> None:
-    if scrape_new:
-        cb = conrad_scraper.ConradBot(pds_logger)
-        cb.util_func(search_term=search_terms["conrad"], pages=pages)
-        ib = infinity_scraper.InfinityBot(pds_logger)
-        ib.util_func(search_term=search_terms["infinity"], pages=pages)
+def main(scrape_new: bool, search_terms: dict, pages: int, workers: dict = None, backends: dict = None,
+         crawl_async: bool = False, use_cache: bool = False, offline: bool = False, resume: bool = False,
+         profile: bool = False, vendors: list = None, stream: bool = False,
+         delta: bool = False, distributed: bool = False, catalog: bool = True) -> None:
+    """ scrape vendor data and create ontologies
+
+    :param search_terms: search term per vendor
+    :param workers: number of parallel browser sessions per vendor, e.g., {"conrad": 8}; defaults to one
+    :param backends: backend for fetching product pages per vendor, "chrome" (default) or "http"
+    :param crawl_async: fetch the product pages of all vendors at once via http, respecting each host's rate limit,
+        see crawl_all; cannot be combined with workers, backends, stream or distributed
+    :param use_cache: serve pages from the on-disk page cache while they are fresh and store newly fetched ones
+    :param offline: only use cached pages, regardless of their age
+    :param resume: continue the last crawl per vendor from its journal, only scraping pending and failed pages
+    :param profile: time every webdriver command and write a report on where the time went to the data directory, one
+        per vendor unless crawl_async is set
+    :param vendors: vendors to be scraped, each in a separate process unless crawl_async is set; defaults to the
+        vendors with a search term
+    :param stream: scrape product pages while the search pages are being collected; pages may be None then, so all
+        pages in the pagination are searched
+    :param delta: only scrape product pages that are new, whose search result tile changed or whose data is older than
+        FINGERPRINT_MAX_AGE; the data of the other products is carried forward
+    :param distributed: queue the product pages in QUEUE_DB for workers started via ```python -m src.work_queue```
+    :param catalog: also write the products of every run to CATALOG_DB, from which the ontologies are created
+    """
+    vendors = vendors or list(search_terms)
+    if scrape_new and crawl_async:
+        if workers or backends or stream or distributed:
+            raise ValueError("crawl_async fetches the product pages of all vendors via http in this process, it does "
+                             "not take workers, backends, stream or distributed")
+        crawl_all(vendors, search_terms, pages, use_cache=use_cache, offline=offline, resume=resume, profile=profile,
+                  delta=delta, catalog=catalog)
+    elif scrape_new:
+        summaries = pipelines.run_all(vendors, search_terms, pages, pds_logger, workers=workers or {},
+                                      backends=backends or {}, use_cache=use_cache, offline=offline, resume=resume,
+                                      profile=profile, stream=stream, delta=delta, distributed=distributed,
+                                      catalog=catalog)
+        summary = pipelines.format_summary(summaries)
+        pds_logger.info("pipeline summary:\n" + summary)
+        print(summary)
+        # the vendor ontologies have been created by the pipelines, an ontology left over from an earlier run would
+        # be aligned with a fresh one if a pipeline failed
+        failed = [s["vendor"] for s in summaries if s["error"]]
+        if failed:
+            pds_logger.info(f"reference alignment skipped, pipelines failed: {', '.join(failed)}")
+        elif {"conrad", "infinity"} <= set(vendors):
+            onto_creator.save_reference_alignment_as_csv("../data/gold_standard.csv")
+        return
     onto_creator.create_ontos(pds_logger)
 
 
+def crawl_all(vendors: list, search_terms: dict, pages: int, use_cache: bool = False, offline: bool = False,
+              resume: bool = False, profile: bool = False, delta: bool = False, catalog: bool = True) -> None:
+    """ scrape the vendors in this process, fetching the product pages of all of them at once via http while
+    respecting each host's rate limit; the bots are quit afterwards, also if scraping failed
+
+    :param profile: time the webdriver commands of the search pages and pages that need a browser, the report is
+        written to the data directory
+    """
+    limiter = crawl_engine.HostLimiter()
+    cache = page_cache.PageCache(offline=offline) if use_cache or offline else None
+    profiler = command_profiler.CommandProfiler() if profile else None
+    fingerprints = fingerprint_index.FingerprintIndex() if delta else None
+    controller = adaptive_control.AdaptiveController()
+    products = product_catalog.ProductCatalog() if catalog else None
+    bots = []
+    try:
+        for vendor in vendors:
+            bots.append(pipelines.VENDOR_BOTS[vendor](pds_logger, backend="http", limiter=limiter, cache=cache,
+                                                      profiler=profiler, fingerprints=fingerprints,
+                                                      controller=controller, catalog=products))
+        pending = [bot.collect_links(search_terms[bot.vendor], pages, resume) for bot in bots]
+        crawl_engine.crawl_products(bots, limiter, pending)
+        pds_logger.info(f"hosts (concurrency limit, successes, failures): {controller.report()}")
+        for bot in bots:
+            bot.filter_products()
+            bot.save_data()
+    finally:
+        for bot in bots:
+            bot.quit()
+    if profiler:
+        profile_file = "../data/" + datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S") + "-webdriver-profile.txt"
+        profiler.save_report(profile_file)
+        pds_logger.info(f"webdriver profile saved to {profile_file}")
+
+
 if __name__ == "__main__":
     search_terms = {
         "conrad": "microcontroller",
         "infinity": "Embedded-Microcontrollers",
+        "rscomponents": "microcontroller",
+    }
+    workers = {
+        "conrad": 4,
+        "infinity": 4,
+    }
+    backends = {
+        "conrad": "http",
+        "infinity": "http",
     }
-    main(scrape_new=True, search_terms=search_terms, pages=1)
+    main(scrape_new=True, search_terms=search_terms, pages=1, workers=workers, backends=backends)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""run the scrape-then-preprocess pipeline of each vendor in a separate process"""
+
+import concurrent.futures
+import datetime
+import logging
+import logging.handlers
+import multiprocessing
+import time
+from src import command_profiler
+from src import conrad_scraper
+from src import fingerprint_index
+from src import infinity_scraper
+from src import onto_creator
+from src import page_cache
+from src import product_catalog
+from src import record_stream
+from src import rscomp_scraper
+from src import work_queue
+
+VENDOR_BOTS = {bot.vendor: bot for bot in (conrad_scraper.ConradBot, infinity_scraper.InfinityBot,
+                                            rscomp_scraper.RsCompBot)}
+
+# vendors whose data is preprocessed and turned into an ontology right after scraping
+ONTO_CREATORS = {
+    "conrad": onto_creator.create_conrad_onto,
+    "infinity": onto_creator.create_infinity_onto,
+}
+
+
+def run_pipeline(vendor: str, search_term: str, pages: int, log_queue, workers: int = 1, backend: str = "chrome",
+                 use_cache: bool = False, offline: bool = False, resume: bool = False, profile: bool = False,
+                 stream: bool = False, delta: bool = False,
+                 distributed: bool = False, catalog: bool = True) -> dict:
+    """ scrape one vendor and create its ontology from the records scraped; runs in a worker process and logs to the
+    queue of the parent process
+
+    :return: summary of the run
+    """
+    logger = logging.getLogger(f"pd_scraper.{vendor}")
+    logger.setLevel(logging.DEBUG)
+    logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    logger.propagate = False
+    summary = {"vendor": vendor, "links": 0, "products": 0, "output": None, "ontology": False, "error": None}
+    start = time.perf_counter()
+    try:
+        cache = page_cache.PageCache(offline=offline) if use_cache or offline else None
+        profiler = command_profiler.CommandProfiler() if profile else None
+        fingerprints = fingerprint_index.FingerprintIndex() if delta else None
+        bot = VENDOR_BOTS[vendor](logger, backend=backend, cache=cache, profiler=profiler, fingerprints=fingerprints,
+                                  catalog=product_catalog.ProductCatalog() if catalog else None)
+        try:
+            bot.util_func(search_term=search_term, pages=pages, workers=workers, resume=resume, stream=stream,
+                          queue=work_queue.WorkQueue() if distributed else None)
+        finally:
+            bot.quit()
+        logger.info(f"hosts (concurrency limit, successes, failures): {bot.controller.report()}")
+        summary.update(links=len(bot.product_links), products=bot.output.count, output=bot.output.path)
+        if profiler:
+            profile_file = "../data/" + datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S") + \
+                           f"-{vendor}-webdriver-profile.txt"
+            profiler.save_report(profile_file)
+            logger.info(f"webdriver profile saved to {profile_file}")
+        if vendor in ONTO_CREATORS:
+            records = bot.catalog.snapshot(bot.run) if bot.catalog else record_stream.read_records(bot.output.path)
+            ONTO_CREATORS[vendor](records, logger)
+            summary["ontology"] = True
+    except Exception as e:
+        logger.exception(f"pipeline for {vendor} failed")
+        summary["error"] = repr(e)
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+
+def run_all(vendors: list, search_terms: dict, pages: int, logger: logging.Logger, workers: dict = None,
+            backends: dict = None, **settings) -> list:
+    """ run the pipelines of the vendors concurrently, one process per vendor; log records of the pipelines are
+    passed on to the handlers of the logger given
+
+    :param settings: further keyword arguments for run_pipeline, e.g., use_cache
+    :return: summaries of the runs in the order of the vendors
+    """
+    workers = workers or {}
+    backends = backends or {}
+    with multiprocessing.Manager() as manager:
+        log_queue = manager.Queue()
+        listener = logging.handlers.QueueListener(log_queue, *logger.handlers, respect_handler_level=True)
+        listener.start()
+        try:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=len(vendors)) as executor:
+                futures = [executor.submit(run_pipeline, v, search_terms[v], pages, log_queue,
+                                           workers=workers.get(v, 1), backend=backends.get(v, "chrome"), **settings)
+                           for v in vendors]
+                summaries = []
+                for v, future in zip(vendors, futures):
+                    try:
+                        summaries.append(future.result())
+                    except Exception as e:
+                        summaries.append({"vendor": v, "links": 0, "products": 0, "output": None, "ontology": False,
+                                          "error": repr(e), "seconds": 0.})
+        finally:
+            listener.stop()
+    return summaries
+
+
+def format_summary(summaries: list) -> str:
+    lines = [f"{'vendor':<14} {'links':>6} {'products':>8} {'seconds':>8}  result"]
+    for s in summaries:
+        result = f"failed: {s['error']}" if s["error"] else s["output"] + (" + ontology" if s["ontology"] else "")
+        lines.append(f"{s['vendor']:<14} {s['links']:>6} {s['products']:>8} {s['seconds']:>8.1f}  {result}")
+    return "\n".join(lines)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+product data of all crawls in one SQLite database, queryable by run, product, part number and time of scraping
+
+    python -m src.product_catalog import conrad infinity
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import pathlib
+import re
+import sqlite3
+import threading
+import time
+import typing
+from src import constants as const
+from src import record_stream
+
+# timestamp in the name of the files written by the bots, e.g., 2021-12-24-10-30-00-conrad.jsonl
+FILE_TIMESTAMP = re.compile(r"^(\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2})-")
+
+
+def part_number(vendor: str, record: dict) -> typing.Optional[str]:
+    return next((str(record[k]) for k in const.PART_NUMBER_KEYS.get(vendor, []) if record.get(k) is not None), None)
+
+
+class ProductCatalog:
+    """ records scraped per run in a database in WAL mode, so the bots can write while other processes read; each run
+    is a snapshot of a vendor's catalog, and a product's history consists of its records across runs; records are
+    buffered and upserted in batches, one transaction per batch
+    """
+
+    def __init__(self, path: str = const.CATALOG_DB, batch_size: int = const.CATALOG_BATCH) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.buffer: list = []
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY, vendor TEXT, started REAL, "
+                        "source TEXT)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS products (run INTEGER, vendor TEXT, url TEXT, part_number TEXT, "
+                        "scraped REAL, record TEXT, UNIQUE (run, url))")
+        self.db.execute("CREATE INDEX IF NOT EXISTS runs_vendor ON runs (vendor, started)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS products_url ON products (vendor, url, scraped)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS products_part_number ON products (vendor, part_number, scraped)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS products_scraped ON products (vendor, scraped)")
+
+    @contextlib.contextmanager
+    def _transaction(self) -> typing.Iterator[sqlite3.Connection]:
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.db
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+
+    def start_run(self, vendor: str, source: typing.Optional[str] = None, started: float = None) -> int:
+        """ start a snapshot of the vendor's catalog
+
+        :param source: file the run's records are also written to, if any
+        :return: id of the run
+        """
+        with self._transaction() as db:
+            return db.execute("INSERT INTO runs (vendor, started, source) VALUES (?, ?, ?)",
+                              (vendor, time.time() if started is None else started, source)).lastrowid
+
+    def add(self, run: int, vendor: str, record: dict, scraped: float = None) -> None:
+        """buffer a record of a run, the buffer is written once it holds batch_size records"""
+        row = (run, vendor, record.get("url"), part_number(vendor, record), time.time() if scraped is None else scraped,
+               json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        with self.lock:
+            self.buffer.append(row)
+            if len(self.buffer) < self.batch_size:
+                return
+            rows, self.buffer = self.buffer, []
+        self.upsert(rows)
+
+    def upsert(self, rows: typing.Iterable[tuple]) -> None:
+        """ insert rows (run, vendor, url, part number, scraped, record) in one transaction, a record for a url that
+        the run already has replaces it
+        """
+        with self._transaction() as db:
+            db.executemany("INSERT INTO products VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (run, url) DO UPDATE SET "
+                           "part_number = excluded.part_number, scraped = excluded.scraped, record = excluded.record",
+                           rows)
+
+    def flush(self) -> None:
+        with self.lock:
+            rows, self.buffer = self.buffer, []
+        if rows:
+            self.upsert(rows)
+
+    def close(self) -> None:
+        self.flush()
+        self.db.close()
+
+    def runs(self, vendor: str) -> list:
+        """(id, start, source, number of records) of the vendor's runs, oldest first"""
+        with self.lock:
+            return self.db.execute("SELECT r.id, r.started, r.source, (SELECT COUNT(*) FROM products WHERE run = r.id) "
+                                   "FROM runs r WHERE vendor = ? ORDER BY started, id", (vendor,)).fetchall()
+
+    def last_run(self, vendor: str) -> typing.Optional[int]:
+        """id of the vendor's most recent run with records"""
+        with self.lock:
+            row = self.db.execute("SELECT id FROM runs WHERE vendor = ? AND EXISTS (SELECT 1 FROM products WHERE "
+                                  "run = runs.id) ORDER BY started DESC, id DESC LIMIT 1", (vendor,)).fetchone()
+        return row[0] if row else None
+
+    def _records(self, query: str, parameters: tuple) -> typing.Iterator[dict]:
+        """ records of a query, streamed from a read-only connection of their own; the cursor of the shared connection
+        could not be used outside its lock, and WAL lets the reader go on while the bots write
+        """
+        reader = sqlite3.connect(pathlib.Path(self.path).resolve().as_uri() + "?mode=ro", uri=True, timeout=60)
+        try:
+            for (record,) in reader.execute(query, parameters):
+                yield json.loads(record)
+        finally:
+            reader.close()
+
+    def snapshot(self, run: int) -> typing.Iterator[dict]:
+        """records of a run in the order they were written"""
+        yield from self._records("SELECT record FROM products WHERE run = ? ORDER BY rowid", (run,))
+
+    def latest(self, vendor: str) -> typing.Iterator[dict]:
+        """ the most recent record of every product of the vendor across all runs; of records scraped at the same time,
+        e.g., imported from files dated by their name, the one added last wins
+        """
+        query = "SELECT record FROM (SELECT record, ROW_NUMBER() OVER (PARTITION BY url ORDER BY scraped DESC, " \
+                "rowid DESC) AS n FROM products WHERE vendor = ?) WHERE n = 1"
+        yield from self._records(query, (vendor,))
+
+    def history(self, vendor: str, url: str) -> list:
+        """(time of scraping, record) of a product page across runs, most recent first"""
+        with self.lock:
+            rows = self.db.execute("SELECT scraped, record FROM products WHERE vendor = ? AND url = ? "
+                                   "ORDER BY scraped DESC, rowid DESC", (vendor, url)).fetchall()
+        return [(scraped, json.loads(record)) for scraped, record in rows]
+
+    def by_part_number(self, vendor: str, part: str) -> list:
+        """records with the part number across runs, most recent first"""
+        return list(self._records("SELECT record FROM products WHERE vendor = ? AND part_number = ? "
+                                  "ORDER BY scraped DESC, rowid DESC", (vendor, part)))
+
+    def scraped_between(self, vendor: str, start: float, end: float) -> typing.Iterator[dict]:
+        """records scraped in the interval [start, end) in seconds since the epoch, oldest first"""
+        yield from self._records("SELECT record FROM products WHERE vendor = ? AND scraped >= ? AND scraped < ? "
+                                 "ORDER BY scraped", (vendor, start, end))
+
+    def import_file(self, vendor: str, path: str) -> int:
+        """ add a file written by the bots as a run, dated by the timestamp in its name; files already imported are
+        skipped
+
+        :return: number of records imported
+        """
+        with self.lock:
+            if self.db.execute("SELECT 1 FROM runs WHERE source = ?", (path,)).fetchone():
+                return 0
+        match = FILE_TIMESTAMP.match(os.path.basename(path))
+        started = datetime.datetime.strptime(match.group(1), "%Y-%m-%d-%H-%M-%S").timestamp() if match \
+            else os.path.getmtime(path)
+        run = self.start_run(vendor, path, started)
+        count = 0
+        for record in record_stream.read_records(path):
+            self.add(run, vendor, record, started)
+            count += 1
+        self.flush()
+        return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="product catalog of all crawls")
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import", help="import the files scraped so far as runs")
+    importer.add_argument("vendors", nargs="+", choices=sorted(const.PART_NUMBER_KEYS))
+    importer.add_argument("--directory", default="../data")
+    args = parser.parse_args()
+
+    catalog = ProductCatalog()
+    for vendor_name in args.vendors:
+        for filename in sorted(os.listdir(args.directory)):
+            if record_stream.is_output_of(filename, vendor_name):
+                imported = catalog.import_file(vendor_name, os.path.join(args.directory, filename))
+                print(f"{filename}: {imported} records")
+    catalog.close()
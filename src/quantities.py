@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""parse numbers with units in scraped catalog data a column at a time, driven by declarative rules per vendor"""
+
+import logging
+import re
+import typing
+import numpy as np
+
+# factors to the units used in the ontologies per dimension, e.g., memory in KB and clock rates in MHz; the empty unit
+# stands for bare numbers, which are taken as given if a rule allows them
+UNITS = {
+    "currency": {"€": 1., "$": 1., "£": 1.},
+    "frequency": {"Hz": 1e-6, "kHz": 1e-3, "MHz": 1., "GHz": 1e3},
+    "memory": {"B": 1e-3, "KB": 1., "kB": 1., "MB": 1e3},
+    "voltage": {"mV": 1e-3, "V": 1.},
+    "temperature": {"°C": 1.},
+    "bits": {"-Bit": 1., "Bit": 1., "bit": 1.},
+    "pieces": {"pcs": 1.},
+}
+
+# values of a column are joined with this separator and parsed with a single scan of the column, every value matches
+# the patterns exactly once as all of their groups are optional
+SEPARATOR = "\x00"
+UNIT = r"([^\s\d(~\x00]*)"
+
+
+def number_pattern(decimal: str) -> str:
+    """number with the given decimal mark and optional thousands separators"""
+    thousands = "," if decimal == "." else "."
+    return rf"([-+]?\d{{1,3}}(?:\{thousands}\d{{3}})+(?:\{decimal}\d+)?|[-+]?\d+(?:\{decimal}\d+)?)?"
+
+
+# per decimal mark, pattern for a quantity with an optional currency sign in front, e.g., "$1.23", "12,34 €", "48MHz",
+# "32-Bit" or "256KB (256K x 8)", and pattern for a range, e.g., "-40°C ~ 85°C (TA)"
+PATTERNS = {
+    decimal: (
+        re.compile(rf"\s*([$€£]?)\s*{number_pattern(decimal)}\s*{UNIT}[^\x00]*\x00"),
+        re.compile(rf"\s*{number_pattern(decimal)}\s*{UNIT}\s*(?:~\s*{number_pattern(decimal)}\s*{UNIT})?[^\x00]*\x00"),
+    )
+    for decimal in ".,"
+}
+
+
+def to_numbers(numbers: list, units: list, rule: dict) -> tuple:
+    """ convert the number and unit strings of a column
+
+    :return: values in the unit of the dimension as float array, mask of the values that could be converted
+    """
+    decimal = rule.get("decimal", ".")
+    numbers = np.array(numbers, dtype=str)
+    valid = numbers != ""
+    numbers = np.char.replace(numbers, "," if decimal == "." else ".", "")
+    if decimal == ",":
+        numbers = np.char.replace(numbers, ",", ".")
+    values = np.full(len(numbers), np.nan)
+    values[valid] = numbers[valid].astype(float)
+    table = dict(UNITS.get(rule.get("dimension"), {}))
+    if rule.get("bare", rule.get("dimension") is None):
+        table[""] = 1.
+    distinct, inverse = np.unique(np.array(units, dtype=str), return_inverse=True)
+    factors = np.array([table.get(u, np.nan) for u in distinct])[inverse.reshape(-1)]
+    values *= factors
+    valid &= ~np.isnan(values)
+    if rule.get("dtype") == "int":
+        valid &= values == np.round(values)
+    return values, valid
+
+
+def typed(values: np.ndarray, valid: np.ndarray, rule: dict) -> tuple:
+    if rule.get("dtype") == "int":
+        return np.where(valid, values, 0).astype(np.int64), valid
+    return values, valid
+
+
+def encode(raw: list) -> tuple:
+    """ dictionary encoding of a column, catalogs repeat the same few values, e.g., "48MHz", in most of their records
+
+    :return: distinct values, index of each value among them
+    """
+    distinct = list(dict.fromkeys(raw))
+    codes = dict(zip(distinct, range(len(distinct))))
+    return distinct, np.fromiter(map(codes.__getitem__, raw), dtype=np.intp, count=len(raw))
+
+
+def scan(distinct: list, pattern: re.Pattern) -> list:
+    """match all values of a column with a single scan, missing values are empty"""
+    return pattern.findall(SEPARATOR.join(["" if v is None else str(v) for v in distinct]) + SEPARATOR)
+
+
+def parse_column(raw: list, rule: dict) -> tuple:
+    """ parse a column of raw values, None for missing ones; each distinct value is only parsed once
+
+    :return: values with the dtype of the rule, mask of the values parsed
+    """
+    distinct, index = encode(raw)
+    matches = scan(distinct, PATTERNS[rule.get("decimal", ".")][0])
+    # a currency sign in front takes the place of the unit
+    values, valid = to_numbers([m[1] for m in matches], [m[0] or m[2] for m in matches], rule)
+    return typed(values[index], valid[index], rule)
+
+
+def parse_range_column(raw: list, rule: dict) -> tuple:
+    """ parse a column of ranges "min ~ max", a bound without unit takes the unit of the other bound
+
+    :return: lower and upper bounds as (values, valid) each
+    """
+    distinct, index = encode(raw)
+    matches = scan(distinct, PATTERNS[rule.get("decimal", ".")][1])
+    lower, lower_valid = to_numbers([m[0] for m in matches], [m[1] or m[3] for m in matches], rule)
+    upper, upper_valid = to_numbers([m[2] for m in matches], [m[3] or m[1] for m in matches], rule)
+    both = (lower_valid & upper_valid)[index]
+    return typed(lower[index], both, rule), typed(upper[index], both, rule)
+
+
+def normalize(records: list, vocab: dict, rules: dict) -> tuple:
+    """ parse the columns of a batch of records the rules apply to; entries [value, unit] are joined to "value unit"
+    for all attributes that are no lists in the vocab, so that their unit is parsed along with the number
+
+    :param rules: per vocab key, {"dimension": key of UNITS, "dtype": "int" or "float", "decimal": "." or ",",
+        "bare": whether numbers without unit are accepted} or {"split": separator} for lists; ranges are given by
+        {"source": scraped attribute, "range": [vocab key of min, vocab key of max], ...}
+    :return: typed columns as {scraped attribute: (values, valid)} and lists as {scraped attribute: lists}, rejects as
+        [(row, scraped attribute, raw value)]
+    """
+    scalars = {entry[0] for entry in vocab.values() if len(entry) == 2}
+    for r in records:
+        for attribute in r.keys() & scalars:
+            if type(r[attribute]) is list:
+                r[attribute] = " ".join(str(v) for v in r[attribute] if v)
+    columns: dict = {}
+    rejects: list = []
+    for key, rule in rules.items():
+        source = rule.get("source", vocab[key][0] if key in vocab else key)
+        raw = [r.get(source) for r in records]
+        if "split" in rule:
+            columns[source] = [v.split(rule["split"]) if isinstance(v, str) else v for v in raw]
+            continue
+        if "range" in rule:
+            targets = [vocab[k][0] for k in rule["range"]]
+            parsed = parse_range_column(raw, rule)
+        else:
+            targets = [source]
+            parsed = [parse_column(raw, rule)]
+        for target, column in zip(targets, parsed):
+            columns[target] = column
+        present = np.array([v is not None for v in raw], dtype=bool)
+        rejects.extend((int(row), source, raw[row]) for row in np.flatnonzero(present & ~parsed[0][1]))
+    return columns, rejects
+
+
+def apply(records: list, columns: dict, sources: typing.Iterable[str] = ()) -> None:
+    """ write typed columns back to the records as python values, attributes that could not be parsed are removed
+
+    :param sources: scraped attributes of ranges, they are kept as scraped
+    """
+    for attribute, column in columns.items():
+        if isinstance(column, list):
+            for r, v in zip(records, column):
+                if v is not None:
+                    r[attribute] = v
+            continue
+        values, valid = column
+        for r, v, ok in zip(records, values.tolist(), valid.tolist()):
+            if ok:
+                r[attribute] = v
+            elif attribute in r and attribute not in sources:
+                del r[attribute]
+
+
+def normalize_stream(records: typing.Iterable[dict], vocab: dict, rules: dict, logger: logging.Logger,
+                     batch_size: int = 10000) -> typing.Iterator[dict]:
+    """ normalize records in batches of columns and yield them one at a time; rejected values are logged per record,
+    missing ones per batch
+    """
+    name = vocab["product_name"][0]
+    sources = {rule["source"] for rule in rules.values() if "range" in rule}
+    batch: list = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield from normalize_batch(batch, vocab, rules, logger, name, sources)
+            batch = []
+    if batch:
+        yield from normalize_batch(batch, vocab, rules, logger, name, sources)
+
+
+def normalize_batch(batch: list, vocab: dict, rules: dict, logger: logging.Logger, name: str,
+                    sources: set) -> list:
+    columns, rejects = normalize(batch, vocab, rules)
+    for row, attribute, value in rejects:
+        logger.info(f"unexpected value {value!r} in {attribute} for {batch[row].get(name)}")
+    apply(batch, columns, sources)
+    for attribute, column in columns.items():
+        missing = len(batch) - (sum(v is not None for v in column) if isinstance(column, list) else
+                                int(column[1].sum()))
+        if missing:
+            logger.info(f"no {attribute} available for {missing} of {len(batch)} products")
+    return batch
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""write ontologies as N-Triples one individual at a time, without building them in an owlready2 world"""
+
+import decimal
+import logging
+import math
+import typing
+
+RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+RDFS = "http://www.w3.org/2000/01/rdf-schema#"
+OWL = "http://www.w3.org/2002/07/owl#"
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+# python type and xsd datatype per data property range of the vocab dicts, as owlready2 stores them
+DATATYPES = {
+    "string": (str, XSD + "string"),
+    "float": (float, XSD + "decimal"),
+    "integer": (int, XSD + "integer"),
+    "boolean": (bool, XSD + "boolean"),
+}
+
+ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r"})
+
+
+def literal(value: typing.Any, range_type: str) -> str:
+    """ N-Triples literal of a value converted to the python type of the range; floats are written as plain decimals,
+    as xsd:decimal has no exponent notation
+    """
+    python_type, datatype = DATATYPES[range_type]
+    value = python_type(value)
+    if python_type is float:
+        if not math.isfinite(value):
+            raise ValueError(f"{value} is no decimal")
+        lexical = format(decimal.Decimal(repr(value)), "f")
+    else:
+        lexical = str(value).lower() if python_type is bool else str(value)
+    return f'"{lexical.translate(ESCAPES)}"^^<{datatype}>'
+
+
+class NTriplesWriter:
+    """ stream an ontology to a N-Triples file, which is also valid Turtle; entity IRIs are the ontology IRI, "#" and
+    the names used with ontor, e.g., http://example.org/conrad.owl#conrad_0001 and ...#clock_rate, so the file can be
+    loaded in place of the one saved by owlready2
+    """
+
+    def __init__(self, path: str, iri: str, logger: logging.Logger) -> None:
+        self.path = path
+        self.iri = iri
+        self.base = iri + "#"
+        self.logger = logger
+        self.count = 0
+        self.file = open(path, "w", encoding="utf-8")
+        self.triple(f"<{iri}>", RDF + "type", f"<{OWL}Ontology>")
+
+    def __enter__(self) -> "NTriplesWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def triple(self, s: str, p: str, o: str) -> None:
+        self.file.write(f"{s} <{p}> {o} .\n")
+
+    def entity(self, name: str) -> str:
+        return f"<{self.base}{name}>"
+
+    def write_taxo(self, classes: list) -> None:
+        """:param classes: [class, parent] as for ontor's add_taxo, parent None for subclasses of owl:Thing"""
+        for name, parent in classes:
+            self.triple(self.entity(name), RDF + "type", f"<{OWL}Class>")
+            self.triple(self.entity(name), RDFS + "subClassOf", self.entity(parent) if parent else f"<{OWL}Thing>")
+
+    def write_dps(self, dps: list) -> None:
+        """:param dps: data property tuples as for ontor's add_dps, e.g., from onto_creator.dp_distinction"""
+        for dp in dps:
+            name, parent, functional, domain, range_type = dp[:5]
+            self.triple(self.entity(name), RDF + "type", f"<{OWL}DatatypeProperty>")
+            if functional:
+                self.triple(self.entity(name), RDF + "type", f"<{OWL}FunctionalProperty>")
+            if parent:
+                self.triple(self.entity(name), RDFS + "subPropertyOf", self.entity(parent))
+            if domain:
+                self.triple(self.entity(name), RDFS + "domain", self.entity(domain))
+            if range_type:
+                self.triple(self.entity(name), RDFS + "range", f"<{DATATYPES[range_type][1]}>")
+
+    def write_instances(self, ins_data: list) -> None:
+        """ write the individuals and data property assertions of one product
+
+        :param ins_data: tuples of the form [instance, class, property, value, range type] as for ontor's add_instances
+        """
+        written = set()
+        for inst in ins_data:
+            subject = self.entity(inst[0])
+            if inst[0] not in written:
+                written.add(inst[0])
+                self.count += 1
+                self.triple(subject, RDF + "type", f"<{OWL}NamedIndividual>")
+                self.triple(subject, RDF + "type", self.entity(inst[1]))
+            if not any(inst[2:]):
+                continue
+            if not (inst[2] and inst[3]):
+                # as in ontor and onto_creator.bulk_add_instances, assertions with a falsy value, e.g., a price of 0,
+                # are skipped
+                self.logger.warning(f"unexpected triple: {inst}")
+                continue
+            try:
+                self.triple(subject, self.base + inst[2], literal(inst[3], inst[4] or "string"))
+            except (KeyError, TypeError, ValueError):
+                self.logger.warning(f"unexpected data property value: {inst}")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""streaming json lines files for scraped product data, optionally gzip or zstd compressed"""
+
+import gzip
+import io
+import json
+import threading
+import typing
+
+SUFFIXES = {
+    None: ".jsonl",
+    "gzip": ".jsonl.gz",
+    "zstd": ".jsonl.zst",
+}
+
+
+def open_text(path: str, mode: str) -> typing.TextIO:
+    """open a json lines file in text mode, the compression is derived from the file extension"""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if path.endswith(".zst"):
+        import zstandard
+        if mode == "r":
+            stream = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        else:
+            stream = zstandard.ZstdCompressor().stream_writer(open(path, mode + "b"), closefd=True)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class RecordWriter:
+    """ append one compact json record per line as soon as it is written; records are flushed individually, so a
+    crawl that is interrupted loses at most the line being written
+    """
+
+    def __init__(self, path: str, append: bool = False) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.count = 0
+        self.file = open_text(path, "a" if append else "w")
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def write(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+            self.count += 1
+
+    def close(self) -> None:
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+
+def read_records(path: str) -> typing.Iterator[dict]:
+    """ yield the records of a json lines file one at a time; a legacy file with a single json list is loaded at once
+
+    :param path: file written by RecordWriter or by json.dump
+    """
+    if path.endswith(".json"):
+        with open(path, "r") as f:
+            yield from json.load(f)
+        return
+    with open_text(path, "r") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # last line may be incomplete after a crash
+                continue
+
+
+def output_path(directory: str, timestamp: str, vendor: str, compression: typing.Optional[str] = None) -> str:
+    if compression not in SUFFIXES:
+        raise ValueError(f"unknown compression {compression}, expected one of {list(SUFFIXES)}")
+    return f"{directory}/{timestamp}-{vendor}{SUFFIXES[compression]}"
+
+
+def is_output_of(filename: str, vendor: str) -> bool:
+    """whether a file in the data directory holds data scraped for the vendor, in the current or the legacy format"""
+    return any(filename.endswith(f"-{vendor}{suffix}") for suffix in [".json", *SUFFIXES.values()])
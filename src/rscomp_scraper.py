@@ -1,67 +1,73 @@
 #!/usr/bin/env python3
 """scraper for de.rs-online.com"""
 
-import os
 import datetime
-import json
 import logging
-import random
-import time
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+import typing
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException
 from src import constants as const
+from src import dom_extract
+from src import fast_html
+from src import http_backend
+from src import next_data
+from src import page_cache
+from src import vendor_bot
 
+PRODUCT_SPEC = {
+    "fields": {
+        "name": ['h1[data-testid="long-description"]'],
+        "code": ['xpath://*[@id="__next"]/div/main/div[1]/div[1]/div/div[1]/div/dl/dd[2]'],
+        "price": ['div[class="sc-chPdSV gyouPk inc-vat"] p'],
+    },
+    "required": ["name", "code"],
+    "rows": {"selector": 'table[data-testid="specification-attributes"] tbody tr', "key": "td:nth-of-type(1)",
+             "value": "td:nth-of-type(2)", "mode": "pairs"},
+    "text": "textContent",
+}
 
-class RsCompBot(webdriver.Chrome):
-    def __init__(self, logger: logging.Logger, wait: int = 60, headless: bool = const.HEADLESS, maximize: bool = False,
-                 driver_path: str = const.CHROME_DRIVER_PATH, teardown: bool = True) -> None:
-        self.logger = logger
-        self.maximize = maximize
-        self.teardown = teardown
-        self.optimized: list = []
-        self.product_links: list = []
-        self.product_data: list = []
-        os.environ['PATH'] += ":" + driver_path
-        options = Options()
-        if headless:
-            options.headless = True
-            options.add_argument("--window-size=1920,1080")
-            user_agent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) " \
-                         "Chrome/60.0.3112.50 Safari/537.36"
-            options.add_argument(f'user-agent={user_agent}')
-            options.add_experimental_option("prefs", {"profile.default_content_setting_values.notifications": 2})
-        super().__init__(options=options)
-        self.implicitly_wait(wait)
-        if self.maximize:
-            self.maximize_window()
-
-    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
-        if self.teardown:
-            self.quit()
+# product fields in the json payload of the Next.js pages, paths start at the root of the payload and are anchored to
+# the product of the page, as related and recommended products in the payload carry the same field names
+NEXT_DATA_PRODUCT = "props.pageProps.product"
+NEXT_DATA_SPEC = {
+    "fields": {
+        "name": [f"{NEXT_DATA_PRODUCT}.longDescription"],
+        "code": [f"{NEXT_DATA_PRODUCT}.stockNumber"],
+        "price": [f"{NEXT_DATA_PRODUCT}.priceBreaks.0.price", f"{NEXT_DATA_PRODUCT}.price.unitPrice"],
+    },
+    "required": ["name", "code"],
+    "attributes": {"list": [f"{NEXT_DATA_PRODUCT}.specificationAttributes", f"{NEXT_DATA_PRODUCT}.attributes"],
+                   "key": "name", "value": "value"},
+}
+
+
+class RsCompBot(vendor_bot.VendorBot):
+    vendor = "rscomponents"
+    product_spec = PRODUCT_SPEC
+
+    def search_url(self, keyword: str, page: int) -> str:
+        if page == 1:
+            return self.base_url+'/web/c/?searchTerm='+keyword
+        return self.base_url+'/web/c/?pn='+str(page)+'&searchTerm='+keyword
 
     def land_search_page(self, keyword: str, page: int) -> None:
+        super().land_search_page(keyword, page)
         if page == 1:
-            self.get('https://de.rs-online.com/web/c/?searchTerm='+keyword)
             try:
                 self.find_element(By.ID, 'ensCloseBanner').click()
             except NoSuchElementException:
                 pass
-        elif page > 1:
-            self.get('https://de.rs-online.com/web/c/?pn='+str(page)+'&searchTerm='+keyword)
 
     def get_product_pages(self, keyword: str, maxpages: int = None) -> None:
         for c in range(1, maxpages+1):
-            time.sleep(random.randint(1, 3))
-            self.land_search_page(keyword, c)
             try:
-                product_list = self.find_element(By.CSS_SELECTOR, 'div[class="wrapper_2zZyTprJ loading-overlay results-wrapper"]')
-                product_pages = product_list.find_elements(By.CSS_SELECTOR, 'div[data-qa="product-tile"]')
-                for p in product_pages:
-                    link = p.find_element(By.CSS_SELECTOR, 'a[class="link_3n-4Qpxf"]')
-                    self.product_links.append(link.get_attribute('href'))
+                links, html = self.listing_page(keyword, c)
+                self.product_links.extend(links)
+                if self.fingerprints:
+                    self.snippets.update(self.parse_search_snippets(html, self.search_url(keyword, c)))
+            except page_cache.CacheMiss:
+                self.logger.info(f"page {c} for {keyword} not cached - stopping search in offline mode")
+                break
             except NoSuchElementException:
                 self.logger.info(f"no data available for page {c} when searching for {keyword}")
                 if self.check_load_error():
@@ -69,47 +75,76 @@ class RsCompBot(webdriver.Chrome):
                     break
         self.product_links = list(dict.fromkeys(self.product_links))
 
+    def listing_links(self) -> list:
+        product_list = self.find_element(By.CSS_SELECTOR, 'div[class="wrapper_2zZyTprJ loading-overlay results-wrapper"]')
+        product_pages = product_list.find_elements(By.CSS_SELECTOR, 'div[data-qa="product-tile"]')
+        return [p.find_element(By.CSS_SELECTOR, 'a[class="link_3n-4Qpxf"]').get_attribute('href') for p in product_pages]
+
+    @staticmethod
+    def page_count(html: str) -> typing.Optional[int]:
+        """number of search result pages according to the pagination of a search page"""
+        return http_backend.max_page_number(html, r"[?&]pn=(\d+)")
+
+    @staticmethod
+    def parse_search_html(html: str, url: str) -> list:
+        soup = http_backend.make_soup(html)
+        return http_backend.links_of(soup.select('div[class="wrapper_2zZyTprJ loading-overlay results-wrapper"] '
+                                                 'div[data-qa="product-tile"] a[class="link_3n-4Qpxf"]'), url)
+
     def check_load_error(self) -> bool:
         load_error = False
         if self.find_element(By.ID, 'main-frame-error'):
             load_error = True
         return load_error
 
-    def get_product_data(self) -> None:
-        for pl in self.product_links:
-            # add some randomness to the bot
-            time.sleep(random.randint(0, 4))
-            data: dict = {"url": pl}
-            try:
-                self.get(pl)
-                data["name"] = self.find_element(By.CSS_SELECTOR, 'h1[data-testid="long-description"]').text
-                data["code"] = self.find_element(By.XPATH, '//*[@id="__next"]/div/main/div[1]/div[1]/div/div[1]/div/dl/dd[2]').text
-                rsc_html = self.execute_script("return document.getElementsByTagName('html')[0].innerHTML")
-                soup = BeautifulSoup(rsc_html, "html.parser")
-                for item in soup.find_all("div", class_="sc-chPdSV gyouPk inc-vat"):
-                    data["price"] = item.find_all("p")[0].text
-                table = soup.find('table', attrs={'data-testid': 'specification-attributes'})
-                body = table.find('tbody')
-                for row in body.find_all('tr'):
-                    attribute, value = row.find_all('td')
-                    data[attribute.text] = value.text
-                self.product_data.append(data)
-                self.logger.info(f"scraped {pl}")
-                print(f"scraped {pl}")
-            except Exception:
-                self.logger.info(f"skipped {pl}")
-                print(f"skipped {pl}")
-                pass
+    @staticmethod
+    def parse_search_snippets(html: str, url: str) -> dict:
+        return http_backend.tile_snippets(html, url, 'div[class="wrapper_2zZyTprJ loading-overlay results-wrapper"] '
+                                                     'div[data-qa="product-tile"]', 'a[class="link_3n-4Qpxf"]')
+
+    def load_product(self, pl: str) -> dict:
+        self.get(pl)
+        if const.PREFER_EMBEDDED_JSON:
+            data = next_data.extract(self.execute_script(next_data.PAYLOAD_SCRIPT), NEXT_DATA_SPEC)
+            if data:
+                return {"url": pl, **data}
+        return {"url": pl, **dom_extract.extract(self, PRODUCT_SPEC)}
 
-    def save_data(self) -> None:
-        filename = "../data/" + datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S") + "-rscomponents.json"
-        with open(filename, "w") as f:
-            json.dump(self.product_data, f, indent=4)
+    @staticmethod
+    def parse_product_html(html: str, pl: str) -> typing.Optional[dict]:
+        """ extract product data from server-rendered html, None if a required element is missing; the json payload of
+        the page is used if it has all required fields
+        """
+        if const.PREFER_EMBEDDED_JSON:
+            data = next_data.extract(next_data.payload_of(html), NEXT_DATA_SPEC)
+            if data:
+                return {"url": pl, **data}
+        return RsCompBot.parse_product_dom(html, pl)
 
-    def util_func(self, search_term: str, pages: int) -> None:
-        self.get_product_pages(search_term, pages)
-        self.get_product_data()
-        self.save_data()
+    @staticmethod
+    def parse_product_dom(html: str, pl: str) -> typing.Optional[dict]:
+        """ extract product data from the dom of server-rendered html with lxml, None if a required element is missing;
+        the specification table and the price are parsed on their own, and the page only up to the table for the
+        name and code in its header, so that the rest of the page, e.g., the json payload, is not parsed
+        """
+        start, table = next(fast_html.subtrees(html, "table", "data-testid", "specification-attributes"), (0, None))
+        if table is None:
+            return None
+        head = fast_html.parse(html[:start])
+        data: dict = {"url": pl}
+        name = fast_html.first(head, '//h1[@data-testid="long-description"]')
+        code = fast_html.first(head, '//*[@id="__next"]/div/main/div[1]/div[1]/div/div[1]/div/dl/dd[2]')
+        if name is None or code is None:
+            return None
+        data["name"] = fast_html.text_of(name)
+        data["code"] = fast_html.text_of(code)
+        for _, item in fast_html.subtrees(html, "div", "class", "sc-chPdSV gyouPk inc-vat"):
+            data["price"] = item.xpath('.//p')[0].text_content()
+        for row in table.xpath('.//tr'):
+            cells = row.xpath('.//td')
+            if len(cells) == 2:
+                data[cells[0].text_content()] = cells[1].text_content()
+        return data
 
 
 if __name__ == "__main__":
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""chrome bot with the crawl logic shared by the vendor scrapers, which only implement listing, parsing and filtering"""
+
+import os
+import datetime
+import logging
+import threading
+import typing
+from selenium import webdriver
+from src import adaptive_control
+from src import browser_pool
+from src import browser_profile
+from src import command_profiler
+from src import constants as const
+from src import crawl_engine
+from src import crawl_journal
+from src import dom_extract
+from src import fingerprint_index
+from src import http_backend
+from src import page_cache
+from src import product_catalog
+from src import record_stream
+from src import work_queue
+
+
+class VendorBot(webdriver.Chrome):
+    """ base class of the vendor bots; a subclass sets vendor and product_spec and implements the hooks
+
+    - listing: search_url and listing_links, land_search_page for vendors that need to click away banners, and the
+      static page_count, parse_search_html and parse_search_snippets for search pages that are cached or fetched via
+      http
+    - parsing: parse_product_html for server-rendered html, load_product only if a page loaded in chrome needs more
+      than its product_spec
+    - filtering: is_wanted, for records that are scraped but not kept
+
+    chrome is only started by the first webdriver command, so bots that get their pages via http or from the cache
+    never start it
+    """
+
+    vendor: str = ""
+    # dom_extract spec of the product pages loaded in chrome
+    product_spec: dict = {}
+
+    def __init__(self, logger: logging.Logger, wait: int = 60, headless: bool = const.HEADLESS, maximize: bool = False,
+                 driver_path: str = const.CHROME_DRIVER_PATH, teardown: bool = True,
+                 backend: str = "chrome", limiter: crawl_engine.HostLimiter = None,
+                 cache: page_cache.PageCache = None,
+                 compression: typing.Optional[str] = const.OUTPUT_COMPRESSION,
+                 profiler: command_profiler.CommandProfiler = None, lean: bool = const.LEAN_BROWSER,
+                 fingerprints: fingerprint_index.FingerprintIndex = None,
+                 controller: adaptive_control.AdaptiveController = None, base_url: str = None,
+                 catalog: product_catalog.ProductCatalog = None) -> None:
+        self.logger = logger
+        self.wait = wait
+        self.headless = headless
+        self.driver_path = driver_path
+        self.maximize = maximize
+        self.teardown = teardown
+        self.backend = backend
+        self.base_url = base_url or const.BASE_URLS[self.vendor]
+        self.limiter = limiter or crawl_engine.HostLimiter()
+        self.cache = cache
+        self.controller = controller or adaptive_control.AdaptiveController()
+        self.fetcher = http_backend.HttpFetcher(logger, cache=cache, controller=self.controller) \
+            if backend == "http" else None
+        self.compression = compression
+        self.profiler = profiler
+        self.lean = lean
+        self.fingerprints = fingerprints
+        self.catalog = catalog
+        self.run: typing.Optional[int] = None
+        self.snippets: dict = {}
+        self.journal: typing.Optional[crawl_journal.CrawlJournal] = None
+        self.output: typing.Optional[record_stream.RecordWriter] = None
+        self.optimized: list = []
+        self.product_links: list = []
+        self.product_data: list = []
+        self.session_id = None
+        self.browser_started = False
+        # reentrant, as starting the session issues webdriver commands itself
+        self.browser_lock = threading.RLock()
+
+    def start_browser(self) -> None:
+        """start chrome unless it is running already"""
+        with self.browser_lock:
+            if self.browser_started:
+                return
+            self.browser_started = True
+            try:
+                os.environ['PATH'] += ":" + self.driver_path
+                super().__init__(options=browser_profile.chrome_options(self.headless, self.lean))
+            except Exception:
+                self.browser_started = False
+                raise
+            if self.profiler:
+                self.profiler.attach(self)
+            if self.lean:
+                browser_profile.block_urls(self)
+            self.implicitly_wait(self.wait)
+            if self.maximize:
+                self.maximize_window()
+
+    def execute(self, driver_command: str, params: dict = None) -> dict:
+        self.start_browser()
+        return super().execute(driver_command, params)
+
+    def quit(self) -> None:
+        if self.browser_started:
+            super().quit()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self.teardown:
+            self.quit()
+
+    def spawn_worker(self) -> "VendorBot":
+        """create a headless bot with a separate browser session for the browser pool"""
+        worker = type(self)(self.logger, wait=self.wait, headless=True, driver_path=self.driver_path,
+                            backend=self.backend, limiter=self.limiter, cache=self.cache, profiler=self.profiler,
+                            lean=self.lean, controller=self.controller,
+                            base_url=self.base_url)
+        worker.journal = self.journal
+        worker.output = self.output
+        worker.fingerprints = self.fingerprints
+        worker.catalog = self.catalog
+        worker.run = self.run
+        worker.snippets = self.snippets
+        return worker
+
+    def search_url(self, keyword: str, page: int) -> str:
+        raise NotImplementedError
+
+    def land_search_page(self, keyword: str, page: int) -> None:
+        url = self.search_url(keyword, page)
+        self.limiter.acquire(url)
+        self.get(url)
+
+    def listing_links(self) -> list:
+        """product links on the search page loaded in chrome"""
+        raise NotImplementedError
+
+    @staticmethod
+    def page_count(html: str) -> typing.Optional[int]:
+        """number of search result pages according to the pagination of a search page"""
+        raise NotImplementedError
+
+    @staticmethod
+    def parse_search_html(html: str, url: str) -> list:
+        raise NotImplementedError
+
+    def is_wanted(self, data: dict) -> bool:
+        """whether a scraped record is kept, all of them unless the vendor's search returns other products too"""
+        return True
+
+    def get_product_pages(self, keyword: str, maxpages: int = None) -> None:
+        for c in range(1, maxpages+1):
+            try:
+                links, html = self.listing_page(keyword, c)
+                self.product_links.extend(links)
+                if self.fingerprints:
+                    self.snippets.update(self.parse_search_snippets(html, self.search_url(keyword, c)))
+            except page_cache.CacheMiss:
+                self.logger.info(f"page {c} for {keyword} not cached - stopping search in offline mode")
+                break
+        self.product_links = list(dict.fromkeys(self.product_links))
+
+    def listing_page(self, keyword: str, page: int) -> tuple:
+        """ product links on a search page, taken from the cache or loaded in chrome
+
+        :return: links, html of the search page
+        """
+        url = self.search_url(keyword, page)
+        html = self.cache.lookup(url) if self.cache else None
+        if html:
+            return self.parse_search_html(html, url), html
+        self.land_search_page(keyword, page)
+        links = self.listing_links()
+        html = self.page_source
+        if self.cache:
+            self.cache.put(url, html)
+        return links, html
+
+    def scrape_product(self, pl: str) -> typing.Optional[dict]:
+        try:
+            data = self.cached_product(pl)
+            if not data and self.cache and self.cache.offline:
+                # the page must not be loaded live in offline mode, even if its cached copy has no product data
+                raise page_cache.CacheMiss(f"no product data in the cached page {pl}")
+            if not data:
+                self.limiter.acquire(pl)
+                data = self.fetcher.fetch_and_parse(pl, self.parse_product_html) if self.fetcher else None
+            if not data:
+                data = self.controller.call(pl, self.load_product, self.logger)
+                if self.cache:
+                    self.cache.put(pl, self.page_source)
+            self.logger.info(f"scraped {pl}")
+            print(f"scraped {pl}")
+            self.record_scraped(pl, data)
+            return data
+        except Exception as e:
+            self.logger.info(f"skipped {pl} ({adaptive_control.classify(e)})")
+            print(f"skipped {pl}")
+            if self.journal:
+                self.journal.record_failed(pl)
+            return None
+
+    def record_scraped(self, pl: str, data: dict) -> None:
+        """journal and stream the data of a product page once it has been scraped, and update its fingerprint"""
+        if self.journal:
+            self.journal.record_done(pl, data)
+        self.stream_product(data)
+        if self.fingerprints:
+            self.fingerprints.record(pl, self.snippets.get(pl), data)
+
+    def carry_forward(self, carried: dict) -> None:
+        """take over the records of products whose search result tiles have not changed since they were scraped"""
+        for pl, data in carried.items():
+            self.product_data.append(data)
+            if self.journal:
+                self.journal.record_done(pl, data)
+            self.stream_product(data)
+        if carried:
+            self.logger.info(f"carried forward {len(carried)} unchanged products")
+
+    def cached_product(self, pl: str) -> typing.Optional[dict]:
+        html = self.cache.lookup(pl) if self.cache else None
+        return self.parse_product_html(html, pl) if html else None
+
+    def load_product(self, pl: str) -> dict:
+        self.get(pl)
+        return {"url": pl, **dom_extract.extract(self, self.product_spec)}
+
+    @staticmethod
+    def parse_search_snippets(html: str, url: str) -> dict:
+        raise NotImplementedError
+
+    @staticmethod
+    def parse_product_html(html: str, pl: str) -> typing.Optional[dict]:
+        """extract product data from server-rendered html, None if a required element is missing"""
+        raise NotImplementedError
+
+    def get_product_data(self, workers: int = 1, links: list = None) -> None:
+        links = self.product_links if links is None else links
+        if workers > 1:
+            scraped = browser_pool.scrape_pooled(self, links, workers)
+        else:
+            scraped = [self.scrape_product(pl) for pl in links]
+        self.product_data.extend(data for data in scraped if data)
+        order = {pl: c for c, pl in enumerate(self.product_links)}
+        self.product_data.sort(key=lambda d: order.get(d["url"], len(order)))
+
+    def collect_links(self, search_term: str, pages: int, resume: bool = False) -> list:
+        """ collect the product links and set up the crawl journal and the output file; when resuming, the links and
+        the data for completed product pages are taken from the journal
+
+        :return: links of the product pages still to be scraped
+        """
+        self.journal = crawl_journal.CrawlJournal(f"../data/{self.vendor}-{search_term}-journal.jsonl")
+        links, done, failed = self.journal.load() if resume else ([], {}, set())
+        if links:
+            self.logger.info(f"resuming crawl: {len(done)} done, {len(failed)} failed, "
+                             f"{len(links) - len(done) - len(failed)} pending")
+            self.product_links = links
+            self.product_data = [done[pl] for pl in links if pl in done]
+            self.open_output()
+            for data in self.product_data:
+                self.stream_product(data)
+        else:
+            self.journal.reset()
+            self.open_output()
+            self.get_product_pages(search_term, pages)
+            self.journal.record_links(self.product_links)
+        pending = [pl for pl in self.product_links if pl not in done]
+        if self.fingerprints:
+            pending, carried = self.fingerprints.partition(pending, self.snippets)
+            self.carry_forward(carried)
+        return pending
+
+    def collect_streamed(self, search_term: str, pages: typing.Optional[int], workers: int = 1) -> None:
+        """ scrape product pages while the search pages are still being collected, see browser_pool.scrape_streamed
+
+        :param pages: maximum number of search pages, all pages in the pagination if None
+        """
+        self.journal = crawl_journal.CrawlJournal(f"../data/{self.vendor}-{search_term}-journal.jsonl")
+        self.journal.reset()
+        self.open_output()
+        self.product_links, scraped = browser_pool.scrape_streamed(self, search_term, pages, workers)
+        self.product_data = [data for data in scraped if data]
+
+    def filter_products(self) -> None:
+        self.product_data = [pd for pd in self.product_data if self.is_wanted(pd)]
+
+    def open_output(self) -> None:
+        """ start a json lines file in the data directory to which product data is appended as it is scraped, and a
+        run in the catalog if there is one
+        """
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
+        self.output = record_stream.RecordWriter(record_stream.output_path("../data", timestamp, self.vendor,
+                                                                           self.compression))
+        if self.catalog:
+            self.run = self.catalog.start_run(self.vendor, self.output.path)
+
+    def stream_product(self, data: dict) -> None:
+        if self.output and self.is_wanted(data):
+            self.output.write(data)
+            if self.catalog:
+                self.catalog.add(self.run, self.vendor, data)
+
+    def save_data(self) -> None:
+        """finish the output file and write the rest of the catalog batch, the data has been written while scraping"""
+        if self.output:
+            self.output.close()
+            self.logger.info(f"saved {self.output.count} products to {self.output.path}")
+        if self.catalog:
+            self.catalog.flush()
+            self.logger.info(f"saved run {self.run} to the catalog {self.catalog.path}")
+
+    def util_func(self, search_term: str, pages: typing.Optional[int], workers: int = 1, resume: bool = False,
+                  stream: bool = False, queue: work_queue.WorkQueue = None) -> None:
+        """ scrape the products found for the search term and save their data
+
+        :param queue: leave the product pages to worker processes polling the queue, see work_queue
+        """
+        if queue:
+            work_queue.coordinate(self, queue, search_term, pages, resume)
+        elif stream and not resume:
+            self.collect_streamed(search_term, pages, workers)
+        else:
+            pending = self.collect_links(search_term, pages, resume)
+            self.get_product_data(workers, pending)
+        self.filter_products()
+        self.save_data()
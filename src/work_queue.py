@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""durable queue of product pages for scraping with worker processes on several machines"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import typing
+from src import constants as const
+
+
+class WorkQueue:
+    """ product page tasks in a SQLite database shared by the coordinator and the workers, e.g., on a network drive;
+    workers claim tasks with a lease that they renew while scraping, and tasks whose lease expired, e.g., because
+    their worker died, are handed out again; the data scraped is stored with the task
+
+    the database uses the rollback journal, as WAL needs shared memory that processes on different hosts do not have;
+    writers are serialized by SQLite's byte-range locks on the database file, so the file system has to implement
+    them, e.g., SMB or NFS with a running lock manager (nfslock/lockd, or NFSv4); file systems mounted with nolock, or
+    synchronized folders such as Dropbox, corrupt the queue
+    """
+
+    def __init__(self, path: str = const.QUEUE_DB, max_attempts: int = 3) -> None:
+        self.path = path
+        self.max_attempts = max_attempts
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.db.execute("PRAGMA journal_mode=DELETE")
+        self.db.execute("CREATE TABLE IF NOT EXISTS tasks (id INTEGER PRIMARY KEY, vendor TEXT, url TEXT, "
+                        "position INTEGER, state TEXT, worker TEXT, lease_until REAL, attempts INTEGER, result TEXT, "
+                        "UNIQUE (vendor, url))")
+        self.db.execute("CREATE INDEX IF NOT EXISTS tasks_state ON tasks (vendor, state, lease_until)")
+
+    @contextlib.contextmanager
+    def _transaction(self) -> typing.Iterator[sqlite3.Connection]:
+        """write transaction that holds the database lock from the start, so concurrent claims cannot interleave"""
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.db
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+
+    def _expire(self, db: sqlite3.Connection, now: float) -> None:
+        """tasks whose lease expired on their last attempt failed, their workers most likely crashed on them"""
+        db.execute("UPDATE tasks SET state = 'failed' WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+                   (now, self.max_attempts))
+
+    def push(self, vendor: str, links: list) -> None:
+        """add product links as pending tasks, links already queued for the vendor are kept as they are"""
+        with self._transaction() as db:
+            db.executemany("INSERT OR IGNORE INTO tasks (vendor, url, position, state, attempts) "
+                           "VALUES (?, ?, ?, 'pending', 0)", [(vendor, pl, c) for c, pl in enumerate(links)])
+
+    def claim(self, vendor: str, worker: str, lease: float) -> typing.Optional[tuple]:
+        """ lease the next pending task, or a task whose lease expired
+
+        :return: task id and url, None if there is no task to be claimed
+        """
+        now = time.time()
+        with self._transaction() as db:
+            self._expire(db, now)
+            row = db.execute("SELECT id, url FROM tasks WHERE vendor = ? AND (state = 'pending' OR "
+                             "(state = 'leased' AND lease_until < ?)) ORDER BY position LIMIT 1",
+                             (vendor, now)).fetchone()
+            if row:
+                db.execute("UPDATE tasks SET state = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                           "WHERE id = ?", (worker, now + lease, row[0]))
+        return row
+
+    def renew(self, task_id: int, worker: str, lease: float) -> bool:
+        """extend the lease of a task, False if the task has been handed to another worker in the meantime"""
+        with self.lock:
+            cursor = self.db.execute("UPDATE tasks SET lease_until = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                                     (time.time() + lease, task_id, worker))
+        return cursor.rowcount == 1
+
+    def complete(self, task_id: int, worker: str, data: dict) -> None:
+        with self.lock:
+            self.db.execute("UPDATE tasks SET state = 'done', result = ? WHERE id = ? AND worker = ?",
+                            (json.dumps(data), task_id, worker))
+
+    def fail(self, task_id: int, worker: str) -> None:
+        """give a task back for another attempt, or mark it as failed once it has been attempted max_attempts times"""
+        with self.lock:
+            self.db.execute("UPDATE tasks SET state = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END, "
+                            "worker = NULL WHERE id = ? AND worker = ?", (self.max_attempts, task_id, worker))
+
+    def counts(self, vendor: str) -> dict:
+        """ number of tasks per state, expired leases count as pending, or as failed on their last attempt; a plain read,
+        the expired tasks are only updated by the next claim
+        """
+        with self.lock:
+            rows = self.db.execute("SELECT CASE WHEN state != 'leased' OR lease_until >= ? THEN state "
+                                   "WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, COUNT(*) FROM tasks "
+                                   "WHERE vendor = ? GROUP BY 1", (time.time(), self.max_attempts, vendor)).fetchall()
+        return dict(rows)
+
+    def results(self, vendor: str) -> typing.Iterator[tuple]:
+        """url and data of the completed tasks of a vendor, in the order the links were pushed"""
+        with self.lock:
+            rows = self.db.execute("SELECT url, result FROM tasks WHERE vendor = ? AND state = 'done' ORDER BY position",
+                                   (vendor,)).fetchall()
+        for url, result in rows:
+            yield url, json.loads(result)
+
+    def clear(self, vendor: str) -> None:
+        with self.lock:
+            self.db.execute("DELETE FROM tasks WHERE vendor = ?", (vendor,))
+
+
+def coordinate(bot, queue: WorkQueue, search_term: str, pages: int, resume: bool = False,
+               poll: float = 10., stall_timeout: typing.Optional[float] = const.QUEUE_STALL_TIMEOUT) -> None:
+    """ collect the product links of a bot, push them to the queue and wait until the workers have processed them;
+    the data scraped is then added to the bot's product data, journal and output file
+
+    :param resume: keep the tasks queued by a previous run, e.g., after the coordinator was interrupted
+    :param stall_timeout: seconds without any task changing its state after which the coordinator gives up, e.g.,
+        because no worker is running; None waits indefinitely
+    :raises TimeoutError: if the queue stalled, its tasks are kept for a coordinator resuming the run
+    """
+    if not resume:
+        queue.clear(bot.vendor)
+    queue.push(bot.vendor, bot.collect_links(search_term, pages, resume))
+    last_counts, progress = None, time.monotonic()
+    while True:
+        counts = queue.counts(bot.vendor)
+        if not counts.get("pending") and not counts.get("leased"):
+            break
+        if counts != last_counts:
+            last_counts, progress = counts, time.monotonic()
+        elif stall_timeout is not None and time.monotonic() - progress > stall_timeout:
+            raise TimeoutError(f"queue for {bot.vendor} made no progress for {stall_timeout:.0f} s: {counts}")
+        bot.logger.info(f"queue for {bot.vendor}: {counts}")
+        time.sleep(poll)
+    known = {data["url"] for data in bot.product_data}
+    for pl, data in queue.results(bot.vendor):
+        if pl in known:
+            continue
+        bot.product_data.append(data)
+        bot.record_scraped(pl, data)
+    failed = queue.counts(bot.vendor).get("failed", 0)
+    if failed:
+        bot.logger.info(f"{failed} product pages of {bot.vendor} failed on all attempts")
+    order = {pl: c for c, pl in enumerate(bot.product_links)}
+    bot.product_data.sort(key=lambda d: order.get(d["url"], len(order)))
+
+
+def work(bot, queue: WorkQueue, lease: float = 300., idle_exit: typing.Optional[float] = 60., poll: float = 5.) -> int:
+    """ claim tasks of the bot's vendor and scrape them with the bot until no task has been available for idle_exit
+    seconds; the lease is renewed in the background while a page is being scraped
+
+    :return: number of tasks processed
+    """
+    worker = f"{socket.gethostname()}-{os.getpid()}-{id(bot)}"
+    processed = 0
+    idle_since = time.monotonic()
+    while True:
+        task = queue.claim(bot.vendor, worker, lease)
+        if not task:
+            if idle_exit is not None and time.monotonic() - idle_since > idle_exit:
+                return processed
+            time.sleep(poll)
+            continue
+        task_id, pl = task
+        scraping = threading.Event()
+        renewer = threading.Thread(target=renew_lease, args=(queue, task_id, worker, lease, scraping), daemon=True)
+        renewer.start()
+        try:
+            data = bot.scrape_product(pl)
+        finally:
+            scraping.set()
+            renewer.join()
+        if data:
+            queue.complete(task_id, worker, data)
+        else:
+            queue.fail(task_id, worker)
+        processed += 1
+        idle_since = time.monotonic()
+
+
+def renew_lease(queue: WorkQueue, task_id: int, worker: str, lease: float, done: threading.Event) -> None:
+    while not done.wait(lease / 3):
+        if not queue.renew(task_id, worker, lease):
+            break
+
+
+if __name__ == "__main__":
+    from src import pipelines
+
+    parser = argparse.ArgumentParser(description="scrape product pages queued by a coordinator")
+    parser.add_argument("vendor", choices=sorted(pipelines.VENDOR_BOTS))
+    parser.add_argument("--queue", default=const.QUEUE_DB, help="path of the shared queue database")
+    parser.add_argument("--backend", default="chrome", choices=["chrome", "http"])
+    parser.add_argument("--lease", type=float, default=300., help="seconds a claimed task is reserved for a worker")
+    parser.add_argument("--idle-exit", type=float, default=60., help="stop after this many seconds without tasks")
+    args = parser.parse_args()
+
+    worker_logfile = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S") + f"_{args.vendor}_worker.log"
+    worker_handler = logging.FileHandler(worker_logfile)
+    worker_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    worker_logger = logging.getLogger(worker_logfile.split(".")[0])
+    worker_logger.setLevel(logging.DEBUG)
+    worker_logger.addHandler(worker_handler)
+
+    worker_bot = pipelines.VENDOR_BOTS[args.vendor](worker_logger, backend=args.backend)
+    try:
+        count = work(worker_bot, WorkQueue(args.queue), lease=args.lease, idle_exit=args.idle_exit)
+    finally:
+        worker_bot.quit()
+    print(f"processed {count} product pages")
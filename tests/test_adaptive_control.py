@@ -0,0 +1,82 @@
+import socket
+import pytest
+from src import adaptive_control
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, retry_after: float = None) -> None:
+        super().__init__(status)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class NoSuchElementException(Exception):
+    pass
+
+
+def test_classify():
+    assert adaptive_control.classify(HttpError(429)) == adaptive_control.THROTTLED
+    assert adaptive_control.classify(HttpError(403)) == adaptive_control.BLOCKED
+    assert adaptive_control.classify(HttpError(503)) == adaptive_control.SERVER_ERROR
+    assert adaptive_control.classify(socket.timeout()) == adaptive_control.TIMEOUT
+    assert adaptive_control.classify(NoSuchElementException()) == adaptive_control.MISSING_SELECTOR
+    assert adaptive_control.classify(ValueError()) == adaptive_control.OTHER
+    try:
+        try:
+            raise TimeoutError()
+        except TimeoutError as e:
+            raise RuntimeError("max retries") from e
+    except RuntimeError as wrapped:
+        assert adaptive_control.classify(wrapped) == adaptive_control.TIMEOUT
+
+
+def test_limit_grows_additively_and_halves_on_pushback():
+    host = adaptive_control.HostController(initial=2, minimum=1, maximum=4, slow_latency=10)
+    for _ in range(2):
+        host.acquire()
+        host.release(.1, None)
+    assert host.limit == pytest.approx(2 + 1 / 2 + 1 / 2.5)
+    host.acquire()
+    host.release(.1, adaptive_control.THROTTLED)
+    assert host.limit == pytest.approx((2 + 1 / 2 + 1 / 2.5) / 2)
+    # slow responses count as congestion, the limit stays within its bounds
+    for _ in range(5):
+        host.acquire()
+        host.decreased = 0.
+        host.release(20, None)
+    assert host.limit == 1
+    assert (host.successes, host.failures) == (7, 1)
+
+
+def test_call_retries_retryable_failures_only():
+    controller = adaptive_control.AdaptiveController(retries=2, base_delay=0, max_delay=0)
+    attempts = []
+
+    def throttled_once(url: str) -> str:
+        attempts.append(url)
+        if len(attempts) == 1:
+            raise HttpError(429, retry_after=0.)
+        return "page"
+
+    assert controller.call("https://example.org/p", throttled_once) == "page"
+    assert len(attempts) == 2
+
+    def missing(url: str) -> str:
+        attempts.append(url)
+        raise NoSuchElementException()
+
+    with pytest.raises(NoSuchElementException):
+        controller.call("https://example.org/p", missing)
+    assert len(attempts) == 3
+    assert controller.report()["example.org"][1:] == (1, 2)
+
+
+def test_call_gives_up_after_the_retries():
+    controller = adaptive_control.AdaptiveController(retries=1, base_delay=0, max_delay=0)
+
+    def unavailable(url: str) -> str:
+        raise HttpError(503)
+
+    with pytest.raises(HttpError):
+        controller.call("https://example.org/p", unavailable)
+    assert controller.report()["example.org"][2] == 2
@@ -0,0 +1,15 @@
+import queue
+from tools import benchmark_rs_parsing
+
+
+def test_failed_parser_puts_an_error_record():
+    results: queue.Queue = queue.Queue()
+    benchmark_rs_parsing.run("lxml", [("pl", None)], 1, results)
+    parser, seconds, error = results.get_nowait()
+    assert (parser, seconds) == ("lxml", None) and error.startswith("TypeError")
+
+
+def test_benchmark_measures_both_parsers(tmp_path):
+    (tmp_path / "page.html").write_text("<html><h1 data-testid='long-description'>x</h1></html>")
+    measured = benchmark_rs_parsing.benchmark(str(tmp_path), rounds=1)
+    assert sorted(measured) == ["lxml", "soup"]
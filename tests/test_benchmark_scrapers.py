@@ -0,0 +1,31 @@
+import multiprocessing
+import os
+import queue
+from tools import benchmark_scrapers
+
+
+def test_failed_run_puts_an_error_record(tmp_path):
+    results: queue.Queue = queue.Queue()
+    benchmark_scrapers.run("conrad", "http", str(tmp_path / "missing.sqlite"), results)
+    record = results.get_nowait()
+    assert record["vendor"] == "conrad" and record["backend"] == "http" and record["error"]
+    assert "failed: " in benchmark_scrapers.format_results([record])
+
+
+def exit_without_result(results) -> None:
+    os._exit(3)
+
+
+def test_process_exiting_without_result_does_not_hang():
+    results: multiprocessing.Queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=exit_without_result, args=(results,))
+    process.start()
+    assert benchmark_scrapers.result_of(process, results, poll=.1) is None
+    process.join()
+    assert process.exitcode == 3
+
+
+def test_percentile_is_nearest_rank():
+    assert benchmark_scrapers.percentile([.3, .1, .2, .4], 50) == .2
+    assert benchmark_scrapers.percentile([.3, .1, .2, .4], 99) == .4
+    assert benchmark_scrapers.percentile([], 50) != benchmark_scrapers.percentile([], 50)
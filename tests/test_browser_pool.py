@@ -0,0 +1,69 @@
+import logging
+import threading
+from src import browser_pool
+from src import conrad_scraper
+from src import infinity_scraper
+from src import rscomp_scraper
+
+
+class ListingBot:
+    """bot without browser, its search pages hold the given links and its workers record what they scraped"""
+
+    def __init__(self, pages: list) -> None:
+        self.pages = pages
+        self.logger = logging.getLogger(__name__)
+        self.journal = None
+        self.fingerprints = None
+        self.scraped: list = []
+        self.lock = threading.Lock()
+
+    def listing_page(self, keyword: str, page: int) -> tuple:
+        return (self.pages[page - 1] if page <= len(self.pages) else []), "<html></html>"
+
+    @staticmethod
+    def page_count(html: str) -> None:
+        return None
+
+    def spawn_worker(self) -> "ListingBot":
+        return self
+
+    def scrape_product(self, pl: str) -> dict:
+        with self.lock:
+            self.scraped.append(pl)
+        return None if pl.endswith("skip") else {"url": pl}
+
+    def quit(self) -> None:
+        pass
+
+
+def test_streamed_scraping_without_pagination_stops_at_empty_page():
+    bot = ListingBot([["/a", "/b"], ["/b", "/c", "/skip"], [], ["/never"]])
+    links, scraped = browser_pool.scrape_streamed(bot, "mcu", None, workers=3, queue_size=2)
+    assert links == ["/a", "/b", "/c", "/skip"]
+    assert scraped == [{"url": "/a"}, {"url": "/b"}, {"url": "/c"}, None]
+    assert sorted(bot.scraped) == sorted(links)
+
+
+def test_streamed_scraping_respects_maxpages():
+    bot = ListingBot([["/a"], ["/b"], ["/c"]])
+    links, _ = browser_pool.scrape_streamed(bot, "mcu", 2, workers=1)
+    assert links == ["/a", "/b"]
+
+
+def test_pooled_results_keep_link_order():
+    bot = ListingBot([])
+    links = [f"/{c}" for c in range(10)] + ["/skip"]
+    assert browser_pool.scrape_pooled(bot, links, 4) == [{"url": pl} for pl in links[:-1]] + [None]
+
+
+def pagination(*hrefs: str) -> str:
+    return "<nav>" + "".join(f'<a href="{href}">{c}</a>' for c, href in enumerate(hrefs)) + "</nav>"
+
+
+def test_page_count_from_pagination_links():
+    assert conrad_scraper.ConradBot.page_count(pagination("/de/search.html?search=mcu&page=2",
+                                                          "/de/search.html?search=mcu&page=12", "/de/kontakt")) == 12
+    assert infinity_scraper.InfinityBot.page_count(pagination("/ICs/MCU_page2.aspx", "/ICs/MCU_page7.aspx")) == 7
+    assert rscomp_scraper.RsCompBot.page_count(pagination("/web/c/?pn=3&searchTerm=mcu",
+                                                          "/web/c/?searchTerm=mcu&pn=25")) == 25
+    assert conrad_scraper.ConradBot.page_count(pagination("/de/kontakt")) is None
@@ -0,0 +1,37 @@
+from src import browser_profile
+from src import constants as const
+
+
+def test_lean_profile_loads_eagerly_without_images():
+    options = browser_profile.chrome_options(headless=True, lean=True)
+    assert options.page_load_strategy == "eager"
+    assert "--blink-settings=imagesEnabled=false" in options.arguments
+    assert f"user-agent={const.USER_AGENT}" in options.arguments
+    prefs = options.experimental_options["prefs"]
+    assert prefs["profile.managed_default_content_settings.images"] == 2
+    assert prefs["profile.default_content_setting_values.notifications"] == 2
+
+
+def test_default_profile_loads_everything():
+    options = browser_profile.chrome_options(headless=False, lean=False)
+    assert options.page_load_strategy == "normal"
+    assert options.arguments == []
+    assert "prefs" not in options.experimental_options
+
+
+class CdpRecorder:
+    def __init__(self) -> None:
+        self.commands: list = []
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict) -> dict:
+        self.commands.append((cmd, cmd_args))
+        return {}
+
+
+def test_blocked_urls_are_set_for_the_session():
+    driver = CdpRecorder()
+    browser_profile.block_urls(driver)
+    assert driver.commands == [("Network.enable", {}), ("Network.setBlockedURLs", {"urls": const.BLOCKED_URLS})]
+    driver = CdpRecorder()
+    browser_profile.block_urls(driver, ["*.woff2"])
+    assert driver.commands[-1] == ("Network.setBlockedURLs", {"urls": ["*.woff2"]})
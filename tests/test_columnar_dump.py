@@ -0,0 +1,36 @@
+import pyarrow as pa
+from src import columnar_dump
+
+
+RECORDS = [
+    {"name": "A", "pins": 28, "clock": 16.0, "interfaces": ["I2C", "SPI"]},
+    {"name": "B", "pins": 48, "clock": 48, "interfaces": ["UART"], "note": "5V"},
+    {"name": "C", "pins": "n/a", "clock": 72.5},
+]
+
+
+def test_columnar_path() -> None:
+    assert columnar_dump.columnar_path("../data/conrad_data_dump.json") == "../data/conrad_data_dump.arrow"
+
+
+def test_round_trip_across_batches(tmp_path) -> None:
+    path = str(tmp_path / "dump.arrow")
+    with columnar_dump.ColumnarWriter(path, batch_size=2) as writer:
+        for record in RECORDS:
+            writer.write(record)
+    assert writer.count == 3
+    table = columnar_dump.read_table(path)
+    assert table.column_names == ["name", "pins", "clock", "interfaces", "note"]
+    assert pa.types.is_dictionary(table.schema.field("name").type)
+    assert table.column("name").to_pylist() == ["A", "B", "C"]
+    # a column with numbers and strings in different batches is stored as strings, ints and floats as floats
+    assert table.column("pins").to_pylist() == ["28", "48", "n/a"]
+    assert table.column("clock").to_pylist() == [16.0, 48.0, 72.5]
+    assert table.column("interfaces").to_pylist() == [["I2C", "SPI"], ["UART"], None]
+    assert table.column("note").to_pylist() == [None, "5V", None]
+
+
+def test_mixed_values_within_a_batch_become_strings() -> None:
+    table = columnar_dump.records_table([{"a": 1, "b": [1]}, {"a": "x", "b": "y"}])
+    assert table.column("a").to_pylist() == ["1", "x"]
+    assert table.column("b").to_pylist() == ["[1]", "y"]
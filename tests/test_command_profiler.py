@@ -0,0 +1,56 @@
+import time
+import pytest
+from src import command_profiler
+
+
+class Session:
+    """stands in for a webdriver session, commands take the given seconds and fail if named in failing"""
+
+    def __init__(self, seconds: dict, failing: set = frozenset()) -> None:
+        self.seconds = seconds
+        self.failing = failing
+
+    def execute(self, driver_command: str, params: dict = None) -> dict:
+        time.sleep(self.seconds.get(driver_command, 0.))
+        if driver_command in self.failing:
+            raise RuntimeError(driver_command)
+        return {"value": driver_command}
+
+
+def test_every_command_is_timed():
+    session = Session({"get": 0.02})
+    profiler = command_profiler.CommandProfiler()
+    profiler.attach(session)
+    assert session.execute("get", {"url": "https://example.org"}) == {"value": "get"}
+    session.execute("get", {"url": "https://example.org/2"})
+    session.execute("executeScript", {"script": "return 1", "args": []})
+    rows = {row["command"]: row for row in profiler.summary()}
+    assert rows["get"]["calls"] == 2 and rows["get"]["total"] >= 0.04
+    assert rows["executeScript"]["calls"] == 1
+    assert profiler.summary()[0]["command"] == "get"
+
+
+def test_lookups_waiting_for_the_implicit_wait_are_flagged():
+    session = Session({"findElement": 0.05, "findElements": 0.})
+    profiler = command_profiler.CommandProfiler()
+    profiler.attach(session)
+    session.execute("setTimeouts", {"implicit": 50})
+    session.execute("findElement", {"using": "css selector", "value": "#missing"})
+    session.execute("findElements", {"using": "xpath", "value": "//tr"})
+    rows = {row["selector"]: row for row in profiler.summary()}
+    assert rows["css selector=#missing"]["ceiling_hits"] == 1
+    assert rows["xpath=//tr"]["ceiling_hits"] == 0
+    report = profiler.report()
+    assert "1 lookups hit the implicit wait" in report and "1x css selector=#missing" in report
+
+
+def test_errors_are_recorded_and_raised(tmp_path):
+    session = Session({}, failing={"findElement"})
+    profiler = command_profiler.CommandProfiler()
+    profiler.attach(session)
+    with pytest.raises(RuntimeError):
+        session.execute("findElement", {"using": "id", "value": "ProductTitle"})
+    assert profiler.summary()[0]["errors"] == 1
+    path = tmp_path / "profile.txt"
+    profiler.save_report(str(path))
+    assert path.read_text().startswith("1 webdriver commands")
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import threading
+import time
+from src import crawl_engine
+
+
+def test_token_bucket_paces_requests_after_burst():
+    bucket = crawl_engine.TokenBucket(rate=10., burst=2)
+    assert bucket.reserve() == 0.
+    assert bucket.reserve() == 0.
+    assert 0.09 < bucket.reserve() <= 0.1
+    assert 0.19 < bucket.reserve() <= 0.2
+
+
+def test_token_bucket_refills_up_to_burst():
+    bucket = crawl_engine.TokenBucket(rate=10., burst=2)
+    bucket.reserve()
+    bucket.reserve()
+    bucket.updated -= 10.
+    assert bucket.reserve() == 0.
+    assert bucket.reserve() == 0.
+    assert bucket.reserve() > 0.
+
+
+def test_jitter_is_added_to_delays():
+    bucket = crawl_engine.TokenBucket(rate=1000., burst=100, jitter=0.5)
+    delays = [bucket.reserve() for _ in range(50)]
+    assert all(0. <= d <= 0.5 for d in delays)
+    assert max(delays) > 0.
+
+
+def test_host_limiter_has_one_bucket_per_host():
+    limiter = crawl_engine.HostLimiter(limits={"a.example": (5., 1, 0.)}, default=(1., 3, 0.))
+    bucket = limiter.bucket("https://a.example/p1")
+    assert bucket is limiter.bucket("https://a.example/p2?x=1")
+    assert (bucket.rate, bucket.burst) == (5., 1)
+    other = limiter.bucket("https://b.example/p")
+    assert other is not bucket and (other.rate, other.burst) == (1., 3)
+
+
+def test_host_limiter_paces_concurrent_threads():
+    limiter = crawl_engine.HostLimiter(limits={"a.example": (20., 1, 0.)})
+    start = time.monotonic()
+    threads = [threading.Thread(target=limiter.acquire, args=("https://a.example/p",)) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # the first token is available at once, the other four are handed out 50 ms apart
+    assert time.monotonic() - start >= 0.19
+
+
+def test_scheduler_limits_requests_in_flight_per_host():
+    limiter = crawl_engine.HostLimiter(limits={}, default=(1000., 100, 0.))
+    scheduler = crawl_engine.CrawlScheduler(limiter, logging.getLogger(__name__), max_in_flight=8, max_per_host=2)
+    lock = threading.Lock()
+    in_flight = {"now": 0, "max": 0}
+
+    def fetch(url: str) -> str:
+        with lock:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        time.sleep(0.02)
+        with lock:
+            in_flight["now"] -= 1
+        if url.endswith("/3"):
+            raise ValueError(url)
+        return url
+
+    urls = [f"https://a.example/{c}" for c in range(6)]
+    assert scheduler.crawl([(url, fetch) for url in urls]) == urls[:3] + [None] + urls[4:]
+    assert in_flight["max"] == 2
+
+
+def test_acquire_async_waits_for_token():
+    limiter = crawl_engine.HostLimiter(limits={"a.example": (20., 1, 0.)})
+
+    async def acquire_three() -> float:
+        start = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire_async("https://a.example/p")
+        return time.monotonic() - start
+
+    assert asyncio.run(acquire_three()) >= 0.09
@@ -0,0 +1,31 @@
+from src import crawl_journal
+
+
+def test_load_replays_links_done_and_failed(tmp_path):
+    journal = crawl_journal.CrawlJournal(str(tmp_path / "journal.jsonl"))
+    journal.reset()
+    journal.record_links(["a", "b", "c"])
+    journal.record_links(["c", "d"])
+    journal.record_failed("a")
+    journal.record_done("a", {"url": "a"})
+    journal.record_done("b", {"url": "b"})
+    journal.record_failed("b")
+    journal.record_failed("c")
+    links, done, failed = journal.load()
+    assert links == ["a", "b", "c", "d"]
+    assert done == {"a": {"url": "a"}, "b": {"url": "b"}}
+    assert failed == {"c"}
+
+
+def test_incomplete_last_line_is_ignored(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = crawl_journal.CrawlJournal(str(path))
+    journal.record_links(["a"])
+    journal.record_done("a", {"url": "a"})
+    with open(path, "a") as f:
+        f.write('{"event": "done", "url": "b", "da')
+    assert journal.load() == (["a"], {"a": {"url": "a"}}, set())
+
+
+def test_missing_journal_is_empty(tmp_path):
+    assert crawl_journal.CrawlJournal(str(tmp_path / "none.jsonl")).load() == ([], {}, set())
@@ -0,0 +1,96 @@
+import json
+import random
+import numpy as np
+import pytest
+from rapidfuzz import process
+from rapidfuzz.distance import Indel
+from src import columnar_dump
+from tools import data_exploration
+
+
+RECORDS = [
+    {"name": "A", "cpu": "AVR", "core": "AVR", "pins": 28, "interfaces": ["I2C", "SPI"], "bus": ["I2C", "SPI"]},
+    {"name": "B", "cpu": "ARM", "core": "ARM", "pins": 48, "interfaces": ["UART"], "bus": ["UART"]},
+    {"name": "C", "cpu": "ARM", "core": "ARM", "pins": 64, "interfaces": ["CAN"], "bus": ["USB"]},
+    {"name": "D", "cpu": "RISC-V", "pins": 32},
+]
+
+
+def test_attribute_columns_share_codes_across_attributes() -> None:
+    attributes, columns = data_exploration.attribute_columns(columnar_dump.records_table(RECORDS))
+    assert attributes == ["name", "cpu", "core", "pins", "interfaces", "bus"]
+    assert columns.shape == (6, 4)
+    cpu, core = columns[1], columns[2]
+    assert list(cpu[:3]) == list(core[:3]) and core[3] == -1 and cpu[3] >= 0
+    assert np.array_equal(columns[4][:2], columns[5][:2])
+
+
+def test_identical_and_near_duplicate_columns(tmp_path) -> None:
+    records = RECORDS[:3] + [{"name": "D", "cpu": "RISC-V", "core": "RISC-V", "pins": 32}]
+    dump = tmp_path / "dump.json"
+    dump.write_text(json.dumps(records))
+    identical, near = data_exploration.check_duplicate_attributes(str(dump), min_share=.6)
+    assert identical == [("cpu", "core")]
+    assert near == [("interfaces", "bus", .6667)]
+
+
+def test_missing_values_keep_columns_apart() -> None:
+    attributes, columns = data_exploration.attribute_columns(columnar_dump.records_table(RECORDS))
+    assert data_exploration.identical_columns(attributes, columns) == []
+    assert ("cpu", "core", .75) in data_exploration.near_duplicate_columns(attributes, columns, .7)
+
+
+def test_columnar_copy_is_preferred_while_fresh(tmp_path) -> None:
+    dump = tmp_path / "dump.json"
+    dump.write_text(json.dumps(RECORDS))
+    with columnar_dump.ColumnarWriter(columnar_dump.columnar_path(str(dump))) as writer:
+        for record in RECORDS[:2]:
+            writer.write(record)
+    assert data_exploration.load_columns(str(dump)).num_rows == 2
+    assert data_exploration.find_possible_classes(str(dump))["cpu"] == (2, 2)
+
+
+def brute_force(left: list, right: list, threshold: float, top_k: int) -> dict:
+    right = list(dict.fromkeys(right))
+    scores = process.cdist(left, right, scorer=Indel.normalized_similarity)
+    matches = {}
+    for identifier, row in zip(left, scores):
+        found = sorted(((right[c], float(row[c])) for c in np.flatnonzero(row > threshold)), key=lambda m: -m[1])
+        if found:
+            matches[identifier] = found[:top_k]
+    return matches
+
+
+def identifiers(rng: random.Random, count: int, lengths: tuple) -> list:
+    return ["".join(rng.choice("ABCDFH0123468-") for _ in range(rng.randint(*lengths))) for _ in range(count)]
+
+
+def mutated(rng: random.Random, identifier: str) -> str:
+    i = rng.randrange(len(identifier))
+    return rng.choice([identifier[:i] + identifier[i + 1:], identifier[:i] + rng.choice("XY9") + identifier[i:],
+                       identifier[:i] + rng.choice("XY9") + identifier[i + 1:]]) or identifier
+
+
+@pytest.mark.parametrize("lengths", [(1, 4), (3, 9), (6, 20)])
+@pytest.mark.parametrize("threshold", [.6, .8])
+def test_fuzzy_matches_equal_brute_force(lengths: tuple, threshold: float) -> None:
+    rng = random.Random(sum(lengths) + threshold)
+    right = identifiers(rng, 400, lengths)
+    left = list(dict.fromkeys([mutated(rng, rng.choice(right)) for _ in range(150)] + identifiers(rng, 150, lengths)))
+    expected = brute_force(left, right, threshold, top_k=1000)
+    assert expected
+    matched = data_exploration.fuzzy_matches(left, right, threshold, top_k=1000, workers=1)
+    assert {k: {m[0] for m in v} for k, v in matched.items()} == {k: {m[0] for m in v} for k, v in expected.items()}
+
+
+def test_fuzzy_matches_short_and_gapped_identifiers() -> None:
+    matched = data_exploration.fuzzy_matches(["ab", "R86FFH4D"], ["ab", "R8FF4D", "XYZ"], top_k=5, workers=1)
+    assert matched["ab"] == [("ab", 1.)]
+    assert [m[0] for m in matched["R86FFH4D"]] == ["R8FF4D"]
+
+
+def test_fuzzy_matches_top_k_most_similar_first() -> None:
+    matched = data_exploration.fuzzy_matches(["ATMEGA328P-PU"], ["ATMEGA328P-PU", "ATMEGA328-PU", "ATMEGA328P-PN",
+                                                                 "ATMEGA32P-PU"], top_k=2, workers=1)
+    scores = [m[1] for m in matched["ATMEGA328P-PU"]]
+    assert len(scores) == 2 and scores[0] == 1. and scores == sorted(scores, reverse=True)
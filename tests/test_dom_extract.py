@@ -0,0 +1,51 @@
+import pytest
+from src import conrad_scraper
+from src import dom_extract
+from src import infinity_scraper
+from src import rscomp_scraper
+
+
+class ScriptedDriver:
+    """stands in for a webdriver, execute_script returns the given results of the extraction script in turn"""
+
+    current_url = "https://example.org/p"
+
+    def __init__(self, results: list) -> None:
+        self.results = results
+        self.calls: list = []
+
+    def execute_script(self, script: str, *args):
+        self.calls.append((script, args))
+        return self.results[min(len(self.calls), len(self.results)) - 1]
+
+
+def test_one_script_call_per_complete_page():
+    data = {"name": "Pico", "price": None, "Kerne": "2"}
+    driver = ScriptedDriver([{"data": data, "missing": []}])
+    spec = conrad_scraper.PRODUCT_SPEC
+    assert dom_extract.extract(driver, spec) == data
+    assert driver.calls == [(dom_extract.EXTRACT_SCRIPT, (spec,))]
+
+
+def test_script_is_rerun_until_required_elements_are_present():
+    driver = ScriptedDriver([{"data": {"name": None}, "missing": ["name", "rows"]},
+                             {"data": {"name": None}, "missing": ["rows"]},
+                             {"data": {"name": "Pico"}, "missing": []}])
+    assert dom_extract.extract(driver, infinity_scraper.PRODUCT_SPEC, timeout=5.) == {"name": "Pico"}
+    assert len(driver.calls) == 3
+
+
+def test_incomplete_page_names_missing_elements():
+    driver = ScriptedDriver([{"data": {"name": "Pico", "code": None}, "missing": ["code"]}])
+    with pytest.raises(dom_extract.IncompletePage, match=r"\['code'\] on https://example.org/p"):
+        dom_extract.extract(driver, rscomp_scraper.PRODUCT_SPEC, timeout=0.6)
+    assert len(driver.calls) > 1
+
+
+@pytest.mark.parametrize("spec", [conrad_scraper.PRODUCT_SPEC, infinity_scraper.PRODUCT_SPEC,
+                                  rscomp_scraper.PRODUCT_SPEC])
+def test_vendor_specs_are_well_formed(spec):
+    assert set(spec["required"]) <= set(spec["fields"])
+    assert all(isinstance(selectors, list) and selectors for selectors in spec["fields"].values())
+    assert spec["rows"]["mode"] in ("grouped", "pairs")
+    assert spec.get("text", "innerText") in ("innerText", "textContent")
@@ -0,0 +1,50 @@
+import json
+from src import fast_html
+from src import rscomp_scraper
+from tools import benchmark_rs_parsing
+
+
+HEADER = ('<div id="__next"><div><main><div><div><div><div><div><dl><dt>RS Best.-Nr.:</dt><dd>123-4567</dd>'
+          '<dt>Herst. Teile-Nr.:</dt><dd> ATMEGA328P-PU </dd></dl></div></div></div></div></div>')
+PRICE = '<div class="sc-chPdSV gyouPk inc-vat"><div><p>€ 2,34</p></div><p>Stück</p></div>'
+TABLE = ('<table data-testid="specification-attributes" class="specs"><tbody>'
+         '<tr><td>Kerngröße</td><td>8bit</td></tr><tr><td>Taktfrequenz</td><td>20MHz</td></tr></tbody></table>')
+PAYLOAD = json.dumps({"props": {"pageProps": {"product": {"longDescription": "x" * 100000}}}})
+
+
+def page(header: str = HEADER, table: str = TABLE) -> str:
+    return (f'<html><head><title>ATmega328P</title></head><body><h1 data-testid="long-description">Microchip '
+            f'ATmega328P\n 8bit</h1>{header}{PRICE}<section>{table}</section></main></div></div>'
+            f'<script id="__NEXT_DATA__" type="application/json">{PAYLOAD}</script></body></html>')
+
+
+def test_subtrees_follow_nested_elements_of_the_same_tag():
+    html = '<div><div class="a"><div>1</div><div class="a">2</div></div><div data-x="a">3</div><div class="a">4</div>'
+    found = list(fast_html.subtrees(html, "div", "class", "a"))
+    assert [html[s:s + 15] for s, _ in found] == ['<div class="a">'] * 2
+    assert [fast_html.text_of(e) for _, e in found] == ["12", "4"]
+    assert list(fast_html.subtrees(html, "table", "class", "a")) == []
+
+
+def test_subtrees_match_the_attribute_anywhere_in_the_start_tag():
+    html = "<table id='t' data-testid='specs'><tr><td>a</td></tr></table><table data-class='specs'></table>"
+    [(start, table)] = fast_html.subtrees(html, "table", "data-testid", "specs")
+    assert start == 0 and table.tag == "table" and fast_html.text_of(table) == "a"
+    assert list(fast_html.subtrees(html, "table", "class", "specs")) == []
+
+
+def test_rs_dom_only_parses_the_page_up_to_the_specification_table(monkeypatch):
+    parsed = []
+    parse = fast_html.parse
+    monkeypatch.setattr(fast_html, "parse", lambda html: parsed.append(html) or parse(html))
+    data = rscomp_scraper.RsCompBot.parse_product_dom(page(), "https://de.rs-online.com/p/123")
+    assert data == {"url": "https://de.rs-online.com/p/123", "name": "Microchip ATmega328P 8bit",
+                    "code": "ATMEGA328P-PU", "price": "€ 2,34", "Kerngröße": "8bit", "Taktfrequenz": "20MHz"}
+    assert len(parsed) == 1 and "specification-attributes" not in parsed[0] and PAYLOAD not in parsed[0]
+
+
+def test_rs_dom_agrees_with_the_previous_soup_path():
+    for html in page(), page(header=HEADER.replace("<dl>", "<ul>")), page(table=""):
+        expected = benchmark_rs_parsing.parse_with_soup(html, "pl")
+        assert rscomp_scraper.RsCompBot.parse_product_dom(html, "pl") == expected
+    assert benchmark_rs_parsing.parse_with_soup(page(table=""), "pl") is None
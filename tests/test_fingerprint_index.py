@@ -0,0 +1,49 @@
+from src import conrad_scraper
+from src import fingerprint_index
+
+SEARCH_PAGE = """
+<div id="scroller">
+  <div class="tile"><a class="product__title" href="/de/p/pico-1">Raspberry Pi Pico</a> <span>4,20 €</span></div>
+  <div class="tile"><a class="product__title" href="/de/p/uno-2">Arduino Uno</a> <span>24,90 €</span></div>
+</div>
+"""
+
+
+def test_unchanged_tiles_are_carried_forward(tmp_path):
+    index = fingerprint_index.FingerprintIndex(str(tmp_path / "fingerprints.db"), max_age=3600.)
+    snippets = {"/a": "Pico  4,20 €", "/b": "Uno 24,90 €"}
+    assert index.partition(["/a", "/b"], snippets) == (["/a", "/b"], {})
+    index.record("/a", snippets["/a"], {"url": "/a", "name": "Pico"})
+    index.record("/b", snippets["/b"], {"url": "/b", "name": "Uno"})
+    # whitespace changes do not count as changes
+    assert index.partition(["/a", "/b"], {"/a": "Pico 4,20 €", "/b": "Uno 24,90 €"}) == \
+        ([], {"/a": {"url": "/a", "name": "Pico"}, "/b": {"url": "/b", "name": "Uno"}})
+
+
+def test_changed_new_and_untiled_products_are_due(tmp_path):
+    index = fingerprint_index.FingerprintIndex(str(tmp_path / "fingerprints.db"), max_age=3600.)
+    index.record("/a", "Pico 4,20 €", {"url": "/a"})
+    index.record("/b", "Uno 24,90 €", {"url": "/b"})
+    due, carried = index.partition(["/a", "/b", "/c"], {"/a": "Pico 3,90 €", "/c": "Nano 19,90 €"})
+    assert due == ["/a", "/b", "/c"] and carried == {}
+
+
+def test_old_records_are_due(tmp_path):
+    index = fingerprint_index.FingerprintIndex(str(tmp_path / "fingerprints.db"), max_age=3600.)
+    index.record("/a", "Pico 4,20 €", {"url": "/a"})
+    index.db.execute("UPDATE products SET scraped = scraped - 7200")
+    assert index.partition(["/a"], {"/a": "Pico 4,20 €"}) == (["/a"], {})
+
+
+def test_snippets_of_search_tiles_feed_the_index(tmp_path):
+    url = "https://www.conrad.de/de/search.html?search=mcu"
+    snippets = conrad_scraper.ConradBot.parse_search_snippets(SEARCH_PAGE, url)
+    assert snippets == {"https://www.conrad.de/de/p/pico-1": "Raspberry Pi Pico 4,20 €",
+                        "https://www.conrad.de/de/p/uno-2": "Arduino Uno 24,90 €"}
+    index = fingerprint_index.FingerprintIndex(str(tmp_path / "fingerprints.db"))
+    for pl, snippet in snippets.items():
+        index.record(pl, snippet, {"url": pl})
+    changed = SEARCH_PAGE.replace("24,90", "22,90")
+    due, carried = index.partition(list(snippets), conrad_scraper.ConradBot.parse_search_snippets(changed, url))
+    assert due == ["https://www.conrad.de/de/p/uno-2"]
+    assert list(carried) == ["https://www.conrad.de/de/p/pico-1"]
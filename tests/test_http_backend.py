@@ -0,0 +1,130 @@
+import http.server
+import logging
+import threading
+import pytest
+from selenium import webdriver
+from selenium.webdriver.remote.webdriver import WebDriver
+from src import adaptive_control
+from src import crawl_engine
+from src import http_backend
+from src import vendor_bot
+
+
+PAGES = {
+    "/product": (200, {"Content-Type": "text/html; charset=iso-8859-1"},
+                 "<html><h1 class='name'>Größe 10 µm</h1></html>".encode("iso-8859-1")),
+    "/no-name": (200, {"Content-Type": "text/html"}, b"<html><p>rendered by javascript</p></html>"),
+    "/challenge": (200, {"Content-Type": "text/html"}, b"<html><head><title>Just a moment...</title></head></html>"),
+    "/throttled": (429, {"Retry-After": "7"}, b"slow down"),
+    "/overloaded": (503, {"Retry-After": "0"}, b"try again"),
+}
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        status, headers, body = PAGES.get(self.path, (404, {}, b"not found"))
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def fetcher():
+    return http_backend.HttpFetcher(logging.getLogger(), timeout=5.)
+
+
+def parse_name(html: str, pl: str) -> dict:
+    start = html.find("<h1 class='name'>")
+    return {"url": pl, "name": html[start + 17:html.index("</h1>")]} if start >= 0 else None
+
+
+def test_download_decodes_the_declared_charset(server, fetcher):
+    assert fetcher.fetch_and_parse(server + "/product", parse_name) == {"url": server + "/product",
+                                                                        "name": "Größe 10 µm"}
+
+
+@pytest.mark.parametrize("path, status, retry_after", [("/missing", 404, None), ("/throttled", 429, 7.),
+                                                       ("/overloaded", 503, 0.)])
+def test_error_statuses_raise_fetch_error(server, fetcher, path, status, retry_after):
+    with pytest.raises(http_backend.FetchError) as raised:
+        fetcher.download(server + path)
+    assert (raised.value.status, raised.value.retry_after) == (status, retry_after)
+    assert fetcher.fetch_and_parse(server + path, parse_name) is None
+
+
+def test_challenge_page_is_reported_as_blocked(server, fetcher):
+    with pytest.raises(http_backend.BlockedPage) as raised:
+        fetcher.download(server + "/challenge")
+    assert adaptive_control.classify(raised.value) == adaptive_control.BLOCKED
+    assert fetcher.fetch_and_parse(server + "/challenge", parse_name) is None
+
+
+class PageBot(vendor_bot.VendorBot):
+    vendor = "test"
+
+    @staticmethod
+    def parse_product_html(html: str, pl: str) -> dict:
+        return parse_name(html, pl)
+
+    def load_product(self, pl: str) -> dict:
+        self.get(pl)
+        return {"url": pl, "name": "loaded in chrome"}
+
+
+@pytest.fixture
+def driver(monkeypatch):
+    """record the sessions started and the webdriver commands sent instead of running chrome"""
+    calls: list = []
+
+    def start(self, options=None, **kwargs) -> None:
+        calls.append(("start", None))
+
+    def execute(self, driver_command: str, params: dict = None) -> dict:
+        calls.append((driver_command, params))
+        return {"value": None}
+
+    monkeypatch.setattr(webdriver.Chrome, "__init__", start)
+    monkeypatch.setattr(webdriver.Chrome, "quit", lambda self: calls.append(("quit", None)))
+    monkeypatch.setattr(WebDriver, "execute", execute)
+    return calls
+
+
+def bot(server: str) -> PageBot:
+    return PageBot(logging.getLogger(), backend="http", base_url=server,
+                   limiter=crawl_engine.HostLimiter(default=(1000., 10, 0.)),
+                   controller=adaptive_control.AdaptiveController(retries=0, base_delay=0.))
+
+
+def test_http_pages_do_not_start_chrome(server, driver):
+    product = bot(server)
+    assert product.scrape_product(server + "/product")["name"] == "Größe 10 µm"
+    product.quit()
+    assert driver == [] and not product.browser_started
+
+
+@pytest.mark.parametrize("path", ["/no-name", "/challenge", "/missing"])
+def test_chrome_is_started_for_pages_that_fall_back(server, driver, path):
+    product = bot(server)
+    assert product.scrape_product(server + path) == {"url": server + path, "name": "loaded in chrome"}
+    assert [c for c, _ in driver] == ["start", "setTimeouts", "get"]
+    assert driver[2][1] == {"url": server + path}
+    product.scrape_product(server + path)
+    assert [c for c, _ in driver].count("start") == 1
+    product.quit()
+    assert driver[-1] == ("quit", None)
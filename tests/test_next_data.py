@@ -0,0 +1,53 @@
+import copy
+import json
+import os
+import pytest
+from src import constants as const
+from src import next_data
+from src import rscomp_scraper
+
+
+URL = "https://de.rs-online.com/web/p/mikrocontroller/7380432"
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "rscomponents_product.html")
+
+
+@pytest.fixture(scope="module")
+def html():
+    with open(FIXTURE, encoding="utf-8") as page:
+        return page.read()
+
+
+def test_payload_is_read_from_the_page(html):
+    payload = next_data.payload_of(html)
+    assert payload["page"] == "/product/[...slug]"
+    assert next_data.payload_of(html.replace("__NEXT_DATA__", "other")) is None
+
+
+def test_fields_are_read_from_the_product_of_the_page(html):
+    data = next_data.extract(next_data.payload_of(html), rscomp_scraper.NEXT_DATA_SPEC)
+    assert data["name"].startswith("Microchip ATMEGA328P-PU,")
+    assert (data["code"], data["price"], data["Gehäusegröße"]) == ("738-0432", "2.34", "PDIP")
+    assert data["Schnittstellen"] == "I2C, SPI, UART" and data["Pinanzahl"] == "28"
+
+
+def test_related_products_do_not_stand_in_for_missing_fields(html):
+    payload = copy.deepcopy(next_data.payload_of(html))
+    del payload["props"]["pageProps"]["product"]["stockNumber"]
+    assert payload["props"]["pageProps"]["relatedProducts"][0]["stockNumber"]
+    assert next_data.extract(payload, rscomp_scraper.NEXT_DATA_SPEC) is None
+
+
+def test_payload_and_dom_give_the_same_record_apart_from_the_price_format(html):
+    from_json = {"url": URL, **next_data.extract(next_data.payload_of(html), rscomp_scraper.NEXT_DATA_SPEC)}
+    from_dom = rscomp_scraper.RsCompBot.parse_product_dom(html, URL)
+    assert (from_json.pop("price"), from_dom.pop("price")) == ("2.34", "€ 2,34")
+    assert from_json == from_dom
+
+
+def test_product_html_prefers_the_payload(html, monkeypatch):
+    assert const.PREFER_EMBEDDED_JSON
+    assert rscomp_scraper.RsCompBot.parse_product_html(html, URL)["price"] == "2.34"
+    broken = html.replace(json.dumps("738-0432"), "null")
+    assert rscomp_scraper.RsCompBot.parse_product_html(broken, URL)["price"] == "€ 2,34"
+    monkeypatch.setattr(const, "PREFER_EMBEDDED_JSON", False)
+    assert rscomp_scraper.RsCompBot.parse_product_html(html, URL)["price"] == "€ 2,34"
@@ -0,0 +1,63 @@
+import csv
+import logging
+import ontor
+from src import onto_creator
+
+
+def test_normalize_identifier_strips_whitespace_case_and_packaging():
+    assert onto_creator.normalize_identifier("ATtiny85-20PU -TR") == "attiny85-20pu"
+    assert onto_creator.normalize_identifier("STM32F103C8T6TR") == "stm32f103c8t6tr"
+    assert onto_creator.normalize_identifier("LM358DR-ND/CT-ND") == "lm358dr"
+    assert onto_creator.normalize_identifier(" PIC16F84A-04/P ") == "pic16f84a-04/p"
+    assert onto_creator.normalize_identifier("ATMEGA328P-AU#PbF") == "atmega328p-au"
+
+
+def test_join_identifiers_matches_packaging_variants():
+    conrad = [("ATtiny85-20PU", "c1"), ("Raspberry Pi 4 B", "c2"), ("STM32F103C8T6", "c3")]
+    infinity = [("ATTINY85-20PU-TR", "i1"), ("attiny85-20pu", "i2"), ("STM32F103C8T6/Tray", "i3"),
+                ("STM32F103C8", "i4")]
+    assert onto_creator.join_identifiers(conrad, infinity) == [("c1", "i1"), ("c1", "i2"), ("c3", "i3")]
+    assert onto_creator.join_identifiers(conrad, []) == []
+
+
+def test_identifier_maps_give_the_reference_alignment(tmp_path):
+    conrad = [{"Typ": "ATtiny85-20PU"}, {"Produkt-Art": "Single-Board-Computer", "Modell": "Pi 4"},
+              {"Typ": "PIC16F84A-04/P"}]
+    infinity = [{"PART NUMBER": "PIC16F84A-04/P-TR"}, {"name": "no part number"}, {"PART NUMBER": "ATTINY85-20PU"}]
+    for prefix, records in ("conrad", conrad), ("infinity", infinity):
+        assert list(onto_creator.dump_identifiers(prefix, records, str(tmp_path))) == records
+    with open(tmp_path / "conrad_ids.csv", newline="") as f:
+        assert list(csv.reader(f))[1] == ["Pi 4", "http://example.org/conrad.owl#conrad_0001"]
+    alignment = onto_creator.create_reference_alignment(str(tmp_path / "conrad_ids.csv"),
+                                                        str(tmp_path / "infinity_ids.csv"))
+    assert alignment == [
+        ["http://example.org/conrad.owl#conrad_0000", "http://example.org/infinity.owl#infinity_0002", "equivalence"],
+        ["http://example.org/conrad.owl#conrad_0002", "http://example.org/infinity.owl#infinity_0000", "equivalence"],
+    ]
+
+
+def editor(tmp_path, name: str) -> ontor.OntoEditor:
+    pd_ontor = ontor.OntoEditor(f"http://example.org/{name}.owl", str(tmp_path / f"{name}.owl"))
+    pd_ontor.add_taxo([["microcontroller", None]])
+    pd_ontor.add_dps([["price", None, True, "microcontroller", "float", None, None, None, None, None],
+                      ["part_number", None, True, "microcontroller", "string", None, None, None, None, None]])
+    return pd_ontor
+
+
+def assertions(pd_ontor: ontor.OntoEditor) -> dict:
+    return {(i.name, p.name): tuple(p[i]) for i in pd_ontor.onto.individuals() for p in pd_ontor.onto.data_properties()
+            if p[i]}
+
+
+def test_bulk_add_instances_skips_falsy_values_like_ontor(tmp_path):
+    instances = [["mc_1", "microcontroller", "price", 0, "float"],
+                 ["mc_1", "microcontroller", "part_number", "", "string"],
+                 ["mc_2", "microcontroller", "price", 2.5, "float"],
+                 ["mc_2", "microcontroller", "part_number", "STM32", "string"]]
+    reference = editor(tmp_path, "reference")
+    reference.add_instances(instances)
+    bulk = editor(tmp_path, "bulk")
+    assert onto_creator.bulk_add_instances(bulk, instances, logging.getLogger()) == 2
+    expected = {("mc_2", "price"): (2.5,), ("mc_2", "part_number"): ("STM32",)}
+    assert assertions(bulk) == assertions(reference) == expected
+    assert {i.name for i in bulk.onto.individuals()} == {"mc_1", "mc_2"}
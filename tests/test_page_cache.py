@@ -0,0 +1,61 @@
+import logging
+import os
+import time
+import pytest
+from src import page_cache
+from src import vendor_bot
+
+
+def test_put_and_get_by_canonical_url(tmp_path):
+    cache = page_cache.PageCache(str(tmp_path), ttls={})
+    cache.put("HTTPS://Example.org:443/p?b=2&a=1#top", "<html>ä</html>")
+    assert cache.get("https://example.org/p?a=1&b=2") == "<html>ä</html>"
+    assert cache.contains("https://example.org/p?a=1&b=2")
+    assert cache.get("https://example.org/other") is None
+
+
+def test_expired_pages_are_only_served_offline(tmp_path):
+    cache = page_cache.PageCache(str(tmp_path), ttls={"example.org": 60})
+    cache.put("https://example.org/p", "body")
+    cache.db.execute("UPDATE pages SET fetched = ?", (time.time() - 120,))
+    cache.db.commit()
+    assert cache.get("https://example.org/p") is None
+    offline = page_cache.PageCache(str(tmp_path), offline=True)
+    assert offline.lookup("https://example.org/p") == "body"
+    with pytest.raises(page_cache.CacheMiss):
+        offline.lookup("https://example.org/missing")
+
+
+def test_least_recently_used_pages_are_evicted(tmp_path):
+    cache = page_cache.PageCache(str(tmp_path), ttls={}, max_bytes=10 ** 9)
+    for c in range(3):
+        cache.put(f"https://example.org/{c}", os.urandom(500).hex())
+        cache.db.execute("UPDATE pages SET accessed = ? WHERE url = ?", (c, f"https://example.org/{c}"))
+    cache.get("https://example.org/0")
+    cache.max_bytes = cache.db.execute("SELECT SUM(size) FROM pages").fetchone()[0] - 1
+    cache.put("https://example.org/0", cache.get("https://example.org/0"))
+    assert not cache.contains("https://example.org/1")
+    assert cache.contains("https://example.org/0") and cache.contains("https://example.org/2")
+
+
+class CachedBot(vendor_bot.VendorBot):
+    vendor = "test"
+
+    @staticmethod
+    def parse_product_html(html: str, pl: str) -> dict:
+        return {"url": pl, "name": html[4:-5]} if html.startswith("<h1>") else None
+
+    def load_product(self, pl: str) -> dict:
+        self.loaded.append(pl)
+        return {"url": pl, "name": "loaded live"}
+
+
+def test_offline_bot_never_loads_pages_live(tmp_path):
+    cache = page_cache.PageCache(str(tmp_path), offline=True)
+    cache.put("https://example.org/a", "<h1>Arduino</h1>")
+    cache.put("https://example.org/b", "<div>rendered by javascript</div>")
+    bot = CachedBot(logging.getLogger(), cache=cache, base_url="https://example.org")
+    bot.loaded = []
+    scraped = [bot.scrape_product(f"https://example.org/{p}") for p in "abc"]
+    assert scraped == [{"url": "https://example.org/a", "name": "Arduino"}, None, None]
+    assert bot.loaded == [] and not bot.browser_started
@@ -0,0 +1,24 @@
+from src import pipelines
+
+
+def test_vendor_registry_is_keyed_by_bot_vendor():
+    assert set(pipelines.VENDOR_BOTS) == {"conrad", "infinity", "rscomponents"}
+    assert all(bot.vendor == vendor for vendor, bot in pipelines.VENDOR_BOTS.items())
+    assert set(pipelines.ONTO_CREATORS) <= set(pipelines.VENDOR_BOTS)
+
+
+def test_format_summary():
+    summaries = [
+        {"vendor": "conrad", "links": 120, "products": 87, "output": "../data/ts-conrad.jsonl", "ontology": True,
+         "error": None, "seconds": 312.25},
+        {"vendor": "rscomponents", "links": 60, "products": 60, "output": "../data/ts-rscomponents.jsonl",
+         "ontology": False, "error": None, "seconds": 95.},
+        {"vendor": "infinity", "links": 0, "products": 0, "output": None, "ontology": False,
+         "error": "WebDriverException('chrome not reachable')", "seconds": 0.},
+    ]
+    assert pipelines.format_summary(summaries).splitlines() == [
+        "vendor          links products  seconds  result",
+        "conrad            120       87    312.2  ../data/ts-conrad.jsonl + ontology",
+        "rscomponents       60       60     95.0  ../data/ts-rscomponents.jsonl",
+        "infinity            0        0      0.0  failed: WebDriverException('chrome not reachable')",
+    ]
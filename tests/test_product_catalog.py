@@ -0,0 +1,77 @@
+import datetime
+import json
+import pytest
+from src import product_catalog
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = product_catalog.ProductCatalog(str(tmp_path / "catalog.sqlite"), batch_size=2)
+    yield catalog
+    catalog.close()
+
+
+def test_part_number_is_the_first_key_present():
+    assert product_catalog.part_number("conrad", {"Modell": "Pi 4", "Typ": None}) == "Pi 4"
+    assert product_catalog.part_number("conrad", {"Typ": "STM32", "Modell": "x"}) == "STM32"
+    assert product_catalog.part_number("unknown", {"Typ": "STM32"}) is None
+
+
+def test_runs_snapshot_and_upsert(catalog):
+    run = catalog.start_run("conrad", started=1.)
+    catalog.add(run, "conrad", {"url": "a", "Typ": "X", "price": 1}, 1.)
+    catalog.add(run, "conrad", {"url": "b", "Typ": "Y"}, 1.)
+    catalog.add(run, "conrad", {"url": "a", "Typ": "X", "price": 2}, 2.)
+    catalog.flush()
+    assert list(catalog.snapshot(run)) == [{"url": "a", "Typ": "X", "price": 2}, {"url": "b", "Typ": "Y"}]
+    assert catalog.runs("conrad") == [(run, 1., None, 2)]
+    assert catalog.last_run("conrad") == run
+    assert catalog.last_run("infinity") is None
+
+
+def test_latest_record_per_product_and_lookups(catalog):
+    first, second = catalog.start_run("conrad", started=1.), catalog.start_run("conrad", started=2.)
+    catalog.upsert([(first, "conrad", "a", "X", 10., json.dumps({"url": "a", "v": 1})),
+                    (second, "conrad", "a", "X", 15., json.dumps({"url": "a", "v": 2})),
+                    (first, "conrad", "b", "Y", 20., json.dumps({"url": "b", "v": 3})),
+                    (second, "conrad", "b", "Y", 5., json.dumps({"url": "b", "v": 4}))])
+    assert sorted(catalog.latest("conrad"), key=lambda r: r["url"]) == [{"url": "a", "v": 2}, {"url": "b", "v": 3}]
+    assert [r for _, r in catalog.history("conrad", "a")] == [{"url": "a", "v": 2}, {"url": "a", "v": 1}]
+    assert catalog.by_part_number("conrad", "Y") == [{"url": "b", "v": 3}, {"url": "b", "v": 4}]
+    assert sorted(r["v"] for r in catalog.scraped_between("conrad", 5., 15.)) == [1, 4]
+
+
+def test_latest_breaks_ties_by_the_record_added_last(catalog):
+    first, second = catalog.start_run("conrad", started=1.), catalog.start_run("conrad", started=2.)
+    catalog.upsert([(first, "conrad", "a", "X", 10., json.dumps({"url": "a", "v": 1})),
+                    (second, "conrad", "a", "X", 10., json.dumps({"url": "a", "v": 2})),
+                    (first, "conrad", "b", "Y", 20., json.dumps({"url": "b", "v": 3})),
+                    (second, "conrad", "b", "Y", 5., json.dumps({"url": "b", "v": 4}))])
+    assert sorted(catalog.latest("conrad"), key=lambda r: r["url"]) == [{"url": "a", "v": 2}, {"url": "b", "v": 3}]
+    assert [r for _, r in catalog.history("conrad", "a")] == [{"url": "a", "v": 2}, {"url": "a", "v": 1}]
+    assert catalog.by_part_number("conrad", "Y") == [{"url": "b", "v": 3}, {"url": "b", "v": 4}]
+    scraped = [r["v"] for r in catalog.scraped_between("conrad", 5., 20.)]
+    assert scraped[0] == 4 and sorted(scraped) == [1, 2, 4]
+
+
+def test_import_file_is_dated_by_its_name_and_imported_once(catalog, tmp_path):
+    path = tmp_path / "2021-12-24-10-30-00-infinity.jsonl"
+    path.write_text("\n".join(json.dumps({"url": u, "PART NUMBER": u.upper()}) for u in "abc") + "\n")
+    assert catalog.import_file("infinity", str(path)) == 3
+    assert catalog.import_file("infinity", str(path)) == 0
+    [(run, started, source, count)] = catalog.runs("infinity")
+    assert (source, count) == (str(path), 3)
+    assert catalog.by_part_number("infinity", "B") == [{"url": "b", "PART NUMBER": "B"}]
+    assert started == datetime.datetime(2021, 12, 24, 10, 30).timestamp()
+
+
+def test_records_are_streamed_while_the_catalog_is_written(catalog):
+    run = catalog.start_run("conrad", started=1.)
+    catalog.upsert([(run, "conrad", str(c), None, 1., json.dumps({"url": str(c)})) for c in range(5)])
+    records = catalog.snapshot(run)
+    assert next(records) == {"url": "0"}
+    catalog.upsert([(run, "conrad", "new", None, 2., json.dumps({"url": "new"}))])
+    assert catalog.last_run("conrad") == run
+    # the reader keeps the snapshot it started with
+    assert [r["url"] for r in records] == ["1", "2", "3", "4"]
+    assert len(list(catalog.snapshot(run))) == 6
@@ -0,0 +1,59 @@
+import numpy as np
+from src import quantities
+
+
+def test_currency_with_thousands_separator_and_decimal_comma():
+    values, valid = quantities.parse_column(["1.234,50 €", "12,99 €", None, "n/a"],
+                                            {"dimension": "currency", "decimal": ","})
+    np.testing.assert_allclose(values[:2], [1234.5, 12.99])
+    assert valid.tolist() == [True, True, False, False]
+
+
+def test_currency_sign_in_front():
+    values, valid = quantities.parse_column(["$1,234.50", "£3"], {"dimension": "currency"})
+    np.testing.assert_allclose(values, [1234.5, 3.])
+    assert valid.all()
+
+
+def test_voltage_with_and_without_space():
+    values, valid = quantities.parse_column(["3.6V", "5 V", "1800mV"], {"dimension": "voltage"})
+    np.testing.assert_allclose(values, [3.6, 5., 1.8])
+    assert valid.all()
+
+
+def test_frequencies_are_converted_to_mhz():
+    values, valid = quantities.parse_column(["32kHz", "1.2GHz", "48MHz", "48"], {"dimension": "frequency"})
+    np.testing.assert_allclose(values[:3], [.032, 1200., 48.])
+    # bare numbers are only accepted if the rule allows them
+    assert valid.tolist() == [True, True, True, False]
+
+
+def test_int_dtype_rejects_fractions():
+    values, valid = quantities.parse_column(["32-Bit", "8", "1.5"], {"dimension": "bits", "dtype": "int", "bare": True})
+    assert values.dtype == np.int64
+    assert values[valid].tolist() == [32, 8]
+    assert valid.tolist() == [True, True, False]
+
+
+def test_range_takes_the_unit_of_the_other_bound():
+    (lower, lower_valid), (upper, upper_valid) = quantities.parse_range_column(
+        ["1.8V ~ 3.6V", "2.7 ~ 5.5V", "-40°C ~ 85°C (TA)"], {"dimension": "voltage"})
+    np.testing.assert_allclose(lower[:2], [1.8, 2.7])
+    np.testing.assert_allclose(upper[:2], [3.6, 5.5])
+    assert lower_valid.tolist() == upper_valid.tolist() == [True, True, False]
+
+
+def test_value_unit_pairs_are_parsed_with_their_unit():
+    vocab = {"product_name": ["name", "string"], "program_memory_size_kb": ["Programmspeichergröße", "float"],
+             "clock_rate": ["Takt-Frequenz", "float"], "connectivity": ["Konnektivität", "string", "list"]}
+    rules = {"program_memory_size_kb": {"dimension": "memory"},
+             "clock_rate": {"dimension": "frequency", "dtype": "int", "bare": True}}
+    records = [{"name": "a", "Programmspeichergröße": ["32", "KB"], "Takt-Frequenz": ["20", "MHz"],
+                "Konnektivität": ["I²C", "SPI"]},
+               {"name": "b", "Programmspeichergröße": ["512", "B"], "Takt-Frequenz": ["16", None]},
+               {"name": "c", "Programmspeichergröße": "2 MB", "Takt-Frequenz": "8"}]
+    columns, rejects = quantities.normalize(records, vocab, rules)
+    np.testing.assert_allclose(columns["Programmspeichergröße"][0], [32., .512, 2000.])
+    assert columns["Takt-Frequenz"][0].tolist() == [20, 16, 8]
+    assert rejects == []
+    assert records[0]["Konnektivität"] == ["I²C", "SPI"]
@@ -0,0 +1,80 @@
+import logging
+import owlready2
+from src import rdf_stream
+
+IRI = "http://example.org/conrad.owl"
+
+
+def write(path, instances: list) -> rdf_stream.NTriplesWriter:
+    with rdf_stream.NTriplesWriter(str(path), IRI, logging.getLogger(__name__)) as writer:
+        writer.write_taxo([["microcontroller", None], ["single_core", "microcontroller"]])
+        writer.write_dps([["clock_rate", None, True, "microcontroller", "float"],
+                          ["cores", None, True, "microcontroller", "integer"],
+                          ["name", None, False, "microcontroller", "string"]])
+        writer.write_instances(instances)
+    return writer
+
+
+def test_literals():
+    assert rdf_stream.literal("120", "float") == f'"120.0"^^<{rdf_stream.XSD}decimal>'
+    assert rdf_stream.literal(1e-06, "float") == f'"0.000001"^^<{rdf_stream.XSD}decimal>'
+    assert rdf_stream.literal(2.5e20, "float") == f'"250000000000000000000"^^<{rdf_stream.XSD}decimal>'
+    assert rdf_stream.literal(0.1, "float") == f'"0.1"^^<{rdf_stream.XSD}decimal>'
+    assert rdf_stream.literal(2.0, "integer") == f'"2"^^<{rdf_stream.XSD}integer>'
+    assert rdf_stream.literal(True, "boolean") == f'"true"^^<{rdf_stream.XSD}boolean>'
+    assert rdf_stream.literal('Board "Pico"\n\\ rev 2', "string") == \
+        f'"Board \\"Pico\\"\\n\\\\ rev 2"^^<{rdf_stream.XSD}string>'
+
+
+def test_n_triples_output(tmp_path):
+    path = tmp_path / "conrad.nt"
+    writer = write(path, [["conrad_0001", "single_core", "clock_rate", 133., "float"],
+                          ["conrad_0001", "single_core", "cores", 2, "integer"],
+                          ["conrad_0001", "single_core", "name", "Pico", "string"]])
+    assert writer.count == 1
+    lines = path.read_text(encoding="utf-8").splitlines()
+    base = IRI + "#"
+    assert lines[0] == f"<{IRI}> <{rdf_stream.RDF}type> <{rdf_stream.OWL}Ontology> ."
+    assert f"<{base}single_core> <{rdf_stream.RDFS}subClassOf> <{base}microcontroller> ." in lines
+    assert f"<{base}microcontroller> <{rdf_stream.RDFS}subClassOf> <{rdf_stream.OWL}Thing> ." in lines
+    assert f"<{base}clock_rate> <{rdf_stream.RDF}type> <{rdf_stream.OWL}FunctionalProperty> ." in lines
+    assert f"<{base}name> <{rdf_stream.RDF}type> <{rdf_stream.OWL}FunctionalProperty> ." not in lines
+    assert f"<{base}cores> <{rdf_stream.RDFS}range> <{rdf_stream.XSD}integer> ." in lines
+    assert f"<{base}conrad_0001> <{rdf_stream.RDF}type> <{base}single_core> ." in lines
+    assert f'<{base}conrad_0001> <{base}clock_rate> "133.0"^^<{rdf_stream.XSD}decimal> .' in lines
+    assert all(line.endswith(" .") for line in lines)
+
+
+def test_unexpected_values_are_skipped(tmp_path):
+    path = tmp_path / "conrad.nt"
+    write(path, [["conrad_0001", "single_core", "cores", "two", "integer"],
+                 ["conrad_0001", "single_core", "clock_rate", 133., "float"]])
+    text = path.read_text(encoding="utf-8")
+    assert "two" not in text and "133.0" in text
+
+
+def test_falsy_values_are_skipped_like_ontor(tmp_path):
+    path = tmp_path / "conrad.nt"
+    writer = write(path, [["conrad_0001", "single_core", "clock_rate", 0., "float"],
+                          ["conrad_0001", "single_core", "name", "", "string"],
+                          ["conrad_0001", "single_core", "cores", 2, "integer"],
+                          ["conrad_0002", "single_core", "clock_rate", float("inf"), "float"]])
+    assert writer.count == 2
+    lines = path.read_text(encoding="utf-8").splitlines()
+    base = IRI + "#"
+    assert [line for line in lines if line.startswith(f"<{base}conrad_000") and "#type>" not in line] == \
+        [f'<{base}conrad_0001> <{base}cores> "2"^^<{rdf_stream.XSD}integer> .']
+
+
+def test_file_loads_in_owlready2(tmp_path):
+    path = tmp_path / "conrad.nt"
+    write(path, [["conrad_0001", "single_core", "clock_rate", 133., "float"],
+                 ["conrad_0002", "microcontroller", "name", "Pico", "string"],
+                 ["conrad_0002", "microcontroller", "clock_rate", 3.2e-05, "float"]])
+    world = owlready2.World()
+    with open(path, "rb") as nt_file:
+        onto = world.get_ontology(IRI).load(fileobj=nt_file)
+    assert {i.name for i in onto.individuals()} == {"conrad_0001", "conrad_0002"}
+    assert onto.conrad_0001.clock_rate == 133.
+    assert float(onto.conrad_0002.clock_rate) == 3.2e-05
+    assert onto.single_core in onto.conrad_0001.is_a
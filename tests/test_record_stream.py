@@ -0,0 +1,51 @@
+import gzip
+import json
+import pytest
+from src import record_stream
+
+RECORDS = [{"name": "STM32F4 Discovery", "price": "19,99 €"}, {"name": "Raspberry Pi 4", "Taktfrequenz": ["1.5", "GHz"]}]
+
+
+@pytest.mark.parametrize("compression", [None, "gzip", "zstd"])
+def test_records_round_trip(tmp_path, compression):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    path = record_stream.output_path(str(tmp_path), "2026-01-01-00-00-00", "conrad", compression)
+    with record_stream.RecordWriter(path) as writer:
+        for record in RECORDS:
+            writer.write(record)
+    assert writer.count == 2
+    assert list(record_stream.read_records(path)) == RECORDS
+
+
+def test_gzip_output_is_compressed_json_lines(tmp_path):
+    path = record_stream.output_path(str(tmp_path), "ts", "conrad", "gzip")
+    assert path.endswith("ts-conrad.jsonl.gz")
+    with record_stream.RecordWriter(path) as writer:
+        writer.write(RECORDS[0])
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert f.read() == '{"name":"STM32F4 Discovery","price":"19,99 €"}\n'
+
+
+def test_appended_records_and_torn_last_line(tmp_path):
+    path = str(tmp_path / "ts-conrad.jsonl")
+    with record_stream.RecordWriter(path) as writer:
+        writer.write(RECORDS[0])
+    with record_stream.RecordWriter(path, append=True) as writer:
+        writer.write(RECORDS[1])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"name": "incompl')
+    assert list(record_stream.read_records(path)) == RECORDS
+
+
+def test_legacy_json_dump_is_read(tmp_path):
+    path = tmp_path / "ts-infinity.json"
+    path.write_text(json.dumps(RECORDS, indent=4))
+    assert list(record_stream.read_records(str(path))) == RECORDS
+    assert record_stream.is_output_of(path.name, "infinity")
+    assert not record_stream.is_output_of(path.name, "conrad")
+
+
+def test_unknown_compression_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        record_stream.output_path(str(tmp_path), "ts", "conrad", "bz2")
@@ -0,0 +1,88 @@
+import logging
+import pytest
+from src import work_queue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return work_queue.WorkQueue(str(tmp_path / "queue.sqlite"), max_attempts=2)
+
+
+class Bot:
+    vendor = "conrad"
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, links: list) -> None:
+        self.links = links
+        self.product_links: list = []
+        self.product_data: list = []
+        self.recorded: list = []
+
+    def collect_links(self, search_term: str, pages: int, resume: bool = False) -> list:
+        self.product_links = self.links
+        return self.links
+
+    def record_scraped(self, pl: str, data: dict) -> None:
+        self.recorded.append(pl)
+
+    def scrape_product(self, pl: str) -> dict:
+        return {"url": pl} if pl != "bad" else None
+
+
+def test_claims_follow_the_order_of_the_links(queue):
+    queue.push("conrad", ["a", "b"])
+    queue.push("conrad", ["b", "c"])
+    claimed = [queue.claim("conrad", "w", 60)[1] for _ in range(3)]
+    assert claimed == ["a", "b", "c"]
+    assert queue.claim("conrad", "w", 60) is None
+    assert queue.counts("conrad") == {"leased": 3}
+
+
+def test_expired_leases_are_handed_out_again_until_max_attempts(queue):
+    queue.push("conrad", ["a"])
+    first, _ = queue.claim("conrad", "w1", -1)
+    assert queue.counts("conrad") == {"pending": 1}
+    second, _ = queue.claim("conrad", "w2", -1)
+    assert first == second
+    # the first worker lost its lease
+    assert not queue.renew(first, "w1", 60)
+    assert queue.counts("conrad") == {"failed": 1}
+    assert queue.claim("conrad", "w3", 60) is None
+
+
+def test_counts_does_not_write(queue):
+    queue.push("conrad", ["a"])
+    queue.claim("conrad", "w", -1)
+    queue.db.execute("BEGIN IMMEDIATE")
+    try:
+        reader = work_queue.WorkQueue(queue.path)
+        reader.db.execute("PRAGMA busy_timeout = 0")
+        assert reader.counts("conrad") == {"pending": 1}
+    finally:
+        queue.db.execute("ROLLBACK")
+
+
+def test_failed_tasks_are_retried(queue):
+    queue.push("conrad", ["a"])
+    task, _ = queue.claim("conrad", "w", 60)
+    queue.fail(task, "w")
+    assert queue.counts("conrad") == {"pending": 1}
+    task, _ = queue.claim("conrad", "w", 60)
+    queue.fail(task, "w")
+    assert queue.counts("conrad") == {"failed": 1}
+
+
+def test_work_and_coordinate(queue):
+    bot = Bot(["a", "bad", "c"])
+    queue.push("conrad", bot.links)
+    assert work_queue.work(bot, queue, idle_exit=0, poll=0) == 4
+    work_queue.coordinate(bot, queue, "microcontroller", 1, resume=True, poll=0)
+    assert [d["url"] for d in bot.product_data] == ["a", "c"]
+    assert bot.recorded == ["a", "c"]
+    assert queue.counts("conrad") == {"done": 2, "failed": 1}
+
+
+def test_coordinate_gives_up_on_a_stalled_queue(queue):
+    with pytest.raises(TimeoutError):
+        work_queue.coordinate(Bot(["a"]), queue, "microcontroller", 1, poll=0, stall_timeout=0)
+    assert queue.counts("conrad") == {"pending": 1}
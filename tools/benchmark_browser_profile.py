@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+benchmark the lean browser profile against the standard one on recorded pages
+
+the fixture directory holds product pages saved completely, i.e., including images, fonts and scripts, e.g., via
+"save page as" in chrome; the pages are served from a local http server, which counts the bytes transferred
+"""
+
+import functools
+import http.server
+import os
+import threading
+import time
+from selenium import webdriver
+from src import browser_profile
+
+
+class CountingHandler(http.server.SimpleHTTPRequestHandler):
+    served = 0
+    lock = threading.Lock()
+
+    def copyfile(self, source, outputfile) -> None:
+        body = source.read()
+        outputfile.write(body)
+        with CountingHandler.lock:
+            CountingHandler.served += len(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def serve(fixture_dir: str) -> http.server.ThreadingHTTPServer:
+    handler = functools.partial(CountingHandler, directory=fixture_dir)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def load_pages(urls: list, lean: bool, rounds: int) -> tuple:
+    """ load the pages in a fresh headless session, the browser cache is disabled so every round transfers the pages
+
+    :return: seconds and bytes served in total
+    """
+    driver = webdriver.Chrome(options=browser_profile.chrome_options(headless=True, lean=lean))
+    try:
+        driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+        if lean:
+            browser_profile.block_urls(driver)
+        served = CountingHandler.served
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for url in urls:
+                driver.get(url)
+        return time.perf_counter() - start, CountingHandler.served - served
+    finally:
+        driver.quit()
+
+
+def benchmark(fixture_dir: str, rounds: int = 3) -> dict:
+    """ compare pages per minute and bytes per page for the standard and the lean profile
+
+    :return: dict with [pages per minute, kilobytes per page] per profile
+    """
+    pages = sorted(f for f in os.listdir(fixture_dir) if f.endswith((".html", ".htm")))
+    server = serve(fixture_dir)
+    urls = [f"http://127.0.0.1:{server.server_address[1]}/{p}" for p in pages]
+    results = {}
+    try:
+        for name, lean in ("standard", False), ("lean", True):
+            seconds, served = load_pages(urls, lean, rounds)
+            loaded = len(urls) * rounds
+            results[name] = [60 * loaded / seconds, served / loaded / 1024]
+    finally:
+        server.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    fixtures = "../data/fixtures"
+    for profile, (pages_per_min, kb_per_page) in benchmark(fixtures).items():
+        print(f"{profile:>8}: {pages_per_min:8.1f} pages/min {kb_per_page:10.1f} KB/page")
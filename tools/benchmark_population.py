@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+benchmark for populating the conrad ontology with synthetic preprocessed products: the previous population with one
+ontor add_instances call per product against the bulk population of onto_creator.populate_with_scraped_data, reporting
+the cost per product for growing catalogs
+"""
+
+import itertools
+import logging
+import os
+import tempfile
+import time
+import ontor
+from src import onto_creator
+
+
+def synthetic_products(count: int) -> list:
+    """preprocessed conrad records with every attribute of the vocab"""
+    products = []
+    for c in range(count):
+        products.append({
+            "name": f"Mikrocontroller {c}", "code": f"{c:06d}", "price": 1. + c % 50, "Typ": f"MC{c:05d}",
+            "Hersteller": "Microchip", "Herst.-Abk.": "MCHP", "Gehäuse": "DIP-28", "Takt-Frequenz": 8 + c % 150,
+            "Serie": "AVR", "Kerngröße": 8, "Kern-Prozessor": "AVR", "Oszillator-Typ": "Intern",
+            "Peripheriegeräte": ["POR", "PWM", "WDT"], "Anzahl I/O": 23, "Programmspeichertyp": "FLASH",
+            "Versorgungsspannung max.": 5.5, "Versorgungsspannung min.": 1.8, "Betriebstemperatur (max.)": 85,
+            "Betriebstemperatur (min.)": -40, "Datenwandler (Embedded Mikrocontroller)": "A/D 6x10b",
+            "EEPROM Größe": "1 KB", "Konnektivität": ["I²C", "SPI", "UART/USART"], "Programmspeichergröße": 32.,
+            "RAM-Größe": "2 KB",
+        })
+    return products
+
+
+def new_onto(directory: str, name: str) -> ontor.OntoEditor:
+    editor = ontor.OntoEditor(f"http://example.org/{name}.owl", os.path.join(directory, f"{name}.owl"))
+    onto_creator.create_taxo(editor)
+    editor.add_dps(onto_creator.dp_distinction(onto_creator.CONRAD_DICT, "microcontroller"))
+    return editor
+
+
+def populate_per_product(editor: ontor.OntoEditor, products: list, logger: logging.Logger) -> None:
+    """previous implementation, each add_instances call creates the individual and saves the ontology"""
+    for c, prod in enumerate(products):
+        editor.add_instances(onto_creator.instance_tuples("conrad", c, prod, logger, onto_creator.CONRAD_DICT))
+
+
+def populate_bulk(editor: ontor.OntoEditor, products: list, logger: logging.Logger) -> None:
+    onto_creator.populate_with_scraped_data("conrad", editor, products, logger, onto_creator.CONRAD_DICT)
+
+
+POPULATORS = {
+    "per product": populate_per_product,
+    "bulk": populate_bulk,
+}
+
+
+def benchmark(sizes: tuple = (100, 500, 2000), max_per_product: int = 500) -> dict:
+    """ populate fresh ontologies with catalogs of the given sizes, the per product path is only run up to
+    max_per_product products as its cost grows with the size of the ontology saved after each product
+
+    :return: dict with milliseconds per product per populator and catalog size
+    """
+    logger = logging.getLogger("benchmark_population")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    measured: dict = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for (name, populate), size in itertools.product(POPULATORS.items(), sizes):
+            if name == "per product" and size > max_per_product:
+                continue
+            products = synthetic_products(size)
+            editor = new_onto(directory, f"{name.replace(' ', '_')}_{size}")
+            start = time.perf_counter()
+            populate(editor, products, logger)
+            measured.setdefault(name, {})[size] = 1000 * (time.perf_counter() - start) / size
+            individuals = len(list(editor.onto.individuals()))
+            if individuals != size:
+                print(f"{name}: expected {size} individuals, got {individuals}")
+    return measured
+
+
+if __name__ == "__main__":
+    for populator, per_size in benchmark().items():
+        for catalog_size, ms_per_product in per_size.items():
+            print(f"{populator:>11}: {catalog_size:6d} products {ms_per_product:8.2f} ms/product")
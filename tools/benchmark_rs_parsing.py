@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+micro-benchmark for parsing saved RS Components product pages: the previous BeautifulSoup path with html.parser
+against the lxml path of RsCompBot.parse_product_dom, comparing parse time and peak memory
+"""
+
+import multiprocessing
+import os
+import queue
+import resource
+import time
+import typing
+from bs4 import BeautifulSoup
+from src import rscomp_scraper
+
+
+def parse_with_soup(html: str, pl: str) -> typing.Optional[dict]:
+    """ previous implementation of RsCompBot.get_product_data: the innerHTML of the page, which execute_script returned,
+    is parsed into a BeautifulSoup tree with html.parser; name and code were read via selenium and are taken from the
+    same tree here, None where the page was skipped
+    """
+    data: dict = {"url": pl}
+    try:
+        soup = BeautifulSoup(html, "html.parser")
+        name = soup.select_one('h1[data-testid="long-description"]')
+        code = soup.select_one('div[id="__next"] > div > main > div:nth-of-type(1) > div:nth-of-type(1) > div > '
+                               'div:nth-of-type(1) > div > dl > dd:nth-of-type(2)')
+        data["name"] = " ".join(name.get_text(" ").split())
+        data["code"] = " ".join(code.get_text(" ").split())
+        for item in soup.find_all("div", class_="sc-chPdSV gyouPk inc-vat"):
+            data["price"] = item.find_all("p")[0].text
+        table = soup.find('table', attrs={'data-testid': 'specification-attributes'})
+        body = table.find('tbody')
+        for row in body.find_all('tr'):
+            attribute, value = row.find_all('td')
+            data[attribute.text] = value.text
+    except Exception:
+        return None
+    return data
+
+
+PARSERS = {
+    "soup": parse_with_soup,
+    "lxml": rscomp_scraper.RsCompBot.parse_product_dom,
+}
+
+
+def run(parser: str, pages: list, rounds: int, results) -> None:
+    """ parse all pages in a fresh process, so the peak resident memory can be attributed to the parser; the error is
+    put into the results queue instead of the measurements if parsing failed
+    """
+    try:
+        results.put(measure(parser, pages, rounds))
+    except Exception as e:
+        results.put((parser, None, f"{type(e).__name__}: {e}"))
+
+
+def measure(parser: str, pages: list, rounds: int) -> tuple:
+    """:return: parser, seconds per page, peak memory increase in KB"""
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for pl, html in pages:
+            PARSERS[parser](html, pl)
+    seconds = time.perf_counter() - start
+    return parser, seconds / (rounds * len(pages)), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+
+
+def result_of(process: multiprocessing.Process, results, poll: float = 1.) -> typing.Optional[tuple]:
+    """wait for the result of a benchmark process, None if it exited without one, e.g., when it was killed"""
+    while True:
+        try:
+            return results.get(timeout=poll)
+        except queue.Empty:
+            if process.exitcode is not None:
+                # the result may have arrived right before the process exited
+                try:
+                    return results.get(timeout=poll)
+                except queue.Empty:
+                    return None
+
+
+def benchmark(fixture_dir: str, rounds: int = 10) -> dict:
+    """ check that both parsers agree on the saved pages and measure them
+
+    :return: dict with [milliseconds per page, peak memory increase in KB] per parser, parsers that failed are left
+        out
+    """
+    pages = []
+    for f in sorted(os.listdir(fixture_dir)):
+        if f.endswith((".html", ".htm")):
+            with open(os.path.join(fixture_dir, f), encoding="utf-8", errors="replace") as page:
+                pages.append((f, page.read()))
+    for pl, html in pages:
+        if parse_with_soup(html, pl) != rscomp_scraper.RsCompBot.parse_product_dom(html, pl):
+            print(f"parsers disagree on {pl}")
+    results: multiprocessing.Queue = multiprocessing.Queue()
+    measured = {}
+    for parser in PARSERS:
+        process = multiprocessing.Process(target=run, args=(parser, pages, rounds, results))
+        process.start()
+        result = result_of(process, results)
+        process.join()
+        if result is None:
+            print(f"{parser} exited with code {process.exitcode}")
+        elif result[1] is None:
+            print(f"{parser} failed: {result[2]}")
+        else:
+            measured[parser] = [1000 * result[1], result[2]]
+    return measured
+
+
+if __name__ == "__main__":
+    fixtures = "../data/fixtures/rscomponents"
+    for parser, (ms_per_page, peak_kb) in benchmark(fixtures).items():
+        print(f"{parser:>5}: {ms_per_page:8.2f} ms/page {peak_kb:10d} KB peak increase")
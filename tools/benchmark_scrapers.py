@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+throughput benchmark of the bots on archives recorded with tools/replay_archive.py: every bot and backend crawls the
+search term of its recording from a local replay server in a fresh process, and the suite reports pages/s, latency
+percentiles of the search and product page stages and the peak resident memory of python and of the browser
+
+    python -m tools.benchmark_scrapers --vendors conrad infinity --backends chrome http
+"""
+
+import argparse
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import resource
+import time
+import typing
+from src import crawl_engine
+from src import pipelines
+from tools import replay_archive
+
+STAGES = ("search", "product")
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(values: list, p: float) -> float:
+    """nearest-rank percentile, nan for no values"""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def run(vendor: str, backend: str, path: str, results) -> None:
+    """ crawl the recording with the vendor's bot and put the measurements into the results queue, or a record with
+    the error if the run failed
+    """
+    try:
+        results.put(measure(vendor, backend, path))
+    except Exception as e:
+        results.put({"vendor": vendor, "backend": backend, "error": f"{type(e).__name__}: {e}"})
+
+
+def measure(vendor: str, backend: str, path: str) -> dict:
+    """crawl the recording with the vendor's bot from a replay server started in this process"""
+    logger = logging.getLogger(f"benchmark_{vendor}_{backend}")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    archive = replay_archive.Archive(path)
+    meta = archive.meta()
+    latencies: dict = {stage: [] for stage in STAGES}
+    scraped = 0
+    with replay_archive.ReplayServer(archive) as server:
+        # no politeness delays towards the local server
+        limiter = crawl_engine.HostLimiter(limits={}, default=(1000., 1000, 0.))
+        bot = pipelines.VENDOR_BOTS[vendor](logger, headless=True, backend=backend, limiter=limiter,
+                                            base_url=server.url)
+        try:
+            start = time.perf_counter()
+            links: list = []
+            for page in range(1, int(meta["pages"]) + 1):
+                stage_start = time.perf_counter()
+                page_links, _ = bot.listing_page(meta["search_term"], page)
+                latencies["search"].append(time.perf_counter() - stage_start)
+                links.extend(page_links)
+            for pl in links:
+                if not server.is_recorded(pl):
+                    # product pages beyond the number recorded
+                    continue
+                stage_start = time.perf_counter()
+                scraped += bot.scrape_product(pl) is not None
+                latencies["product"].append(time.perf_counter() - stage_start)
+            seconds = time.perf_counter() - start
+        finally:
+            bot.quit()
+        stats = server.stats()
+    loaded = sum(len(v) for v in latencies.values())
+    return {
+        "vendor": vendor, "backend": backend, "pages": loaded, "scraped": scraped, "pages/s": loaded / seconds,
+        "latency": {stage: [percentile(v, p) for p in PERCENTILES] for stage, v in latencies.items()},
+        # peak resident memory in KB; for the browser, the largest process of the session once it has exited
+        "python rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "browser rss": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        "missed": stats["missed"],
+    }
+
+
+def result_of(process: multiprocessing.Process, results, poll: float = 1.) -> typing.Optional[typing.Any]:
+    """wait for the result of a benchmark process, None if it exited without one, e.g., when it was killed"""
+    while True:
+        try:
+            return results.get(timeout=poll)
+        except queue.Empty:
+            if process.exitcode is not None:
+                # the result may have arrived right before the process exited
+                try:
+                    return results.get(timeout=poll)
+                except queue.Empty:
+                    return None
+
+
+def benchmark(vendors: list, backends: list, directory: str = replay_archive.ARCHIVE_DIR) -> list:
+    """ run every recorded vendor with every backend in a process of its own
+
+    :return: measurements per run
+    """
+    measured = []
+    for vendor in vendors:
+        path = replay_archive.archive_path(vendor, directory)
+        if not os.path.exists(path):
+            print(f"no recording for {vendor} in {directory}, see tools/replay_archive.py")
+            continue
+        for backend in backends:
+            results: multiprocessing.Queue = multiprocessing.Queue()
+            process = multiprocessing.Process(target=run, args=(vendor, backend, path, results))
+            process.start()
+            result = result_of(process, results)
+            process.join()
+            measured.append(result or {"vendor": vendor, "backend": backend,
+                                       "error": f"process exited with code {process.exitcode}"})
+    return measured
+
+
+def format_results(measured: list) -> str:
+    header = f"{'vendor':<12} {'backend':<7} {'pages':>5} {'pages/s':>8} " + \
+             " ".join(f"{s + ' p' + str(p):>11}" for s in STAGES for p in PERCENTILES) + \
+             f" {'python MB':>9} {'browser MB':>10} {'missed':>6}"
+    lines = [header]
+    for m in measured:
+        if "error" in m:
+            lines.append(f"{m['vendor']:<12} {m['backend']:<7} failed: {m['error']}")
+            continue
+        lines.append(f"{m['vendor']:<12} {m['backend']:<7} {m['pages']:>5} {m['pages/s']:>8.2f} " +
+                     " ".join(f"{1000 * m['latency'][s][c]:>9.0f}ms" for s in STAGES for c in range(len(PERCENTILES))) +
+                     f" {m['python rss'] / 1024:>9.0f} {m['browser rss'] / 1024:>10.0f} {m['missed']:>6}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="benchmark the bots on recorded archives")
+    parser.add_argument("--vendors", nargs="+", default=sorted(pipelines.VENDOR_BOTS))
+    parser.add_argument("--backends", nargs="+", default=["chrome", "http"], choices=["chrome", "http"])
+    args = parser.parse_args()
+    print(format_results(benchmark(args.vendors, args.backends)))
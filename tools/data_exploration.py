@@ -4,10 +4,18 @@ helper functions for data exploration
 """
 
 import csv
+import functools
 import itertools
 import json
+import os
+import typing
 import matplotlib.pyplot as plt
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from rapidfuzz import process
 from rapidfuzz.distance import Indel
+from src import columnar_dump
 
 
 def load_pp_dump(pp_file: str) -> list:
@@ -17,60 +25,242 @@ def load_pp_dump(pp_file: str) -> list:
     return pp_data
 
 
-def check_duplicate_attributes(pp_file: str) -> set:
-    data = load_pp_dump(pp_file)
-    same_val = set()
-    for entry in data:
-        for a1, a2 in itertools.combinations(entry, 2):
-            if entry[a1] == entry[a2]:
-                same_val.add((a1, a2))
-            if entry[a1] != entry[a2] and (a1, a2) in same_val:
-                same_val.remove((a1, a2))
-    return same_val
+@functools.lru_cache(maxsize=None)
+def load_columns(pp_file: str) -> pa.Table:
+    """ columns of a data dump, memory-mapped from its columnar copy (onto_creator.COLUMNAR_DUMPS) unless the json is
+    more recent, converted from the json otherwise; each dump is only loaded once
+    """
+    path = columnar_dump.columnar_path(pp_file)
+    if os.path.exists(path) and (not os.path.exists(pp_file) or os.path.getmtime(path) >= os.path.getmtime(pp_file)):
+        return columnar_dump.read_table(path)
+    return columnar_dump.records_table(load_pp_dump(pp_file))
+
+
+# placeholder for missing values
+MISSING = object()
+
+
+def hashable(value: typing.Any) -> typing.Hashable:
+    """lists and dicts of the dumps as tuples, so that values can be compared by hashing"""
+    if isinstance(value, list):
+        return tuple(hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, hashable(v)) for k, v in value.items()))
+    return value
+
 
+def attribute_columns(table: pa.Table) -> tuple:
+    """ encode the value column of every attribute with codes shared by all columns, so that equal values have equal
+    codes across attributes; missing values are -1
 
-def find_matches(pp_file_conrad: str, pp_file_infinity: str) -> tuple:
-    """ find matches between products, relevant keys are Typ (Modell for raspis) and PART NUMBER for conrad and
-    infinity, respectively
+    :return: attributes, codes as array of shape (attributes, records)
     """
-    exact_matches: list = []
-    sim_matches: list = []
-    ids_conrad: list = []
-    for entry in load_pp_dump(pp_file_conrad):
-        if "Typ" in entry:
-            # print((entry["name"], entry["Typ"]))
-            ids_conrad.append((entry["name"], entry["Typ"]))
-        elif "Modell" in entry:
-            ids_conrad.append((entry["name"], entry["Modell"]))
-        else:
+    codes: dict = {MISSING: -1}
+    columns = np.empty((table.num_columns, table.num_rows), dtype=np.int64)
+    for c, column in enumerate(table.itercolumns()):
+        if pa.types.is_nested(column.type):
+            raw = [MISSING if v is None else hashable(v) for v in column.to_pylist()]
+            for value in dict.fromkeys(raw):
+                codes.setdefault(value, len(codes) - 1)
+            columns[c] = np.fromiter(map(codes.__getitem__, raw), dtype=np.int64, count=len(raw))
+            continue
+        # only the distinct values of a column are looked up in the shared codes
+        encoded = column.combine_chunks()
+        if not pa.types.is_dictionary(encoded.type):
+            encoded = encoded.dictionary_encode()
+        mapping = np.array([codes.setdefault(v, len(codes) - 1) for v in encoded.dictionary.to_pylist()] + [-1],
+                           dtype=np.int64)
+        columns[c] = mapping[pc.fill_null(encoded.indices, -1).to_numpy()]
+    return table.column_names, columns
+
+
+def identical_columns(attributes: list, columns: np.ndarray) -> list:
+    """groups of attributes with the same value in every record, missing values included"""
+    groups: dict = {}
+    for attribute, column in zip(attributes, columns):
+        groups.setdefault(column.tobytes(), []).append(attribute)
+    return [tuple(g) for g in groups.values() if len(g) > 1]
+
+
+def near_duplicate_columns(attributes: list, columns: np.ndarray, min_share: float) -> list:
+    """ pairs of attributes that are not identical but have the same value in at least min_share of the records in
+    which either of them has a value
+
+    :return: (attribute, attribute, share) per pair
+    """
+    present = columns >= 0
+    counts = present.sum(axis=1)
+    pairs = []
+    for i, j in itertools.combinations(range(len(attributes)), 2):
+        # the share cannot be reached if one attribute is present in too few records
+        if min(counts[i], counts[j]) < min_share * max(counts[i], counts[j]):
+            continue
+        either = np.count_nonzero(present[i] | present[j])
+        share = np.count_nonzero((columns[i] == columns[j]) & present[i]) / either
+        if min_share <= share and not np.array_equal(columns[i], columns[j]):
+            pairs.append((attributes[i], attributes[j], round(float(share), 4)))
+    return pairs
+
+
+def check_duplicate_attributes(pp_file: str, min_share: float = .95) -> tuple:
+    """ find redundant attributes by comparing their value columns
+
+    :return: groups of identical attributes, near-duplicates as (attribute, attribute, share of equal values)
+    """
+    attributes, columns = attribute_columns(load_columns(pp_file))
+    return identical_columns(attributes, columns), near_duplicate_columns(attributes, columns, min_share)
+
+
+def product_identifiers(pp_data: list, keys: tuple, aliases: str = None) -> list:
+    """(name, identifier) per product for the first of the keys it has and per alias listed under the aliases key"""
+    ids = []
+    for entry in pp_data:
+        key = next((k for k in keys if k in entry), None)
+        if key is None:
             print(f"no identifier for {entry}")
-    ids_i1 = [(e["name"], e["PART NUMBER"]) for e in load_pp_dump(pp_file_infinity)]
-    ids_i2 = []
-    for e in load_pp_dump(pp_file_infinity):
-        if "OTHER NAMES" in e:
-            ids_i2.extend([(e["name"], on) for on in e["OTHER NAMES"]])
-    ids_infinity = ids_i1 + ids_i2
-    for id_c, id_i in itertools.product(ids_conrad, ids_infinity):
-        if id_c[1] == id_i[1]:
-            exact_matches.append((id_c, id_i))
-        if Indel.normalized_similarity(id_c[1], id_i[1]) > .8:
-            sim_matches.append((id_c, id_i))
+        else:
+            ids.append((entry["name"], str(entry[key])))
+        if aliases in entry:
+            ids.extend((entry["name"], str(a)) for a in entry[aliases])
+    return ids
+
+
+def min_shared_ngrams(len_a: np.ndarray, len_b: np.ndarray, threshold: float, n: int) -> np.ndarray:
+    """ number of n-grams two strings of the given lengths share at least if their normalized Indel similarity is
+    above the threshold, inf if the lengths alone rule it out; the longest common subsequence of such strings is split
+    into at most (deletions + insertions + 1) runs, each of which contributes all of its n-grams; zero or less if such
+    strings may have no n-gram in common, e.g., if one of them is shorter than n
+    """
+    total = len_a + len_b
+    # a similarity equal to the threshold is let through, as it is computed in floating point
+    lcs = np.ceil(threshold * total / 2 - 1e-9)
+    bound = lcs - (total - 2 * lcs + 1) * (n - 1)
+    return np.where(lcs <= np.minimum(len_a, len_b), bound, np.inf)
+
+
+class NgramIndex:
+    """ inverted index from the character n-grams of identifiers to their positions in the list indexed; repeated
+    n-grams are indexed per occurrence, so that shared n-grams are counted as for multisets
+    """
+
+    def __init__(self, identifiers: list, n: int = 3) -> None:
+        self.n = n
+        self.tokens: dict = {}
+        pairs = [(t, j) for j, identifier in enumerate(identifiers) for t in self.tokenize(identifier, grow=True)]
+        pairs = np.array(pairs, dtype=np.intp).reshape(-1, 2)
+        self.postings = pairs[np.argsort(pairs[:, 0], kind="stable"), 1]
+        self.indptr = np.zeros(len(self.tokens) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(pairs[:, 0], minlength=len(self.tokens)), out=self.indptr[1:])
+        self.lengths = np.array([len(i) for i in identifiers], dtype=np.intp)
+        positions: dict = {}
+        for j, length in enumerate(self.lengths.tolist()):
+            positions.setdefault(length, []).append(j)
+        self.by_length = {length: np.array(p, dtype=np.intp) for length, p in positions.items()}
+
+    def tokenize(self, identifier: str, grow: bool = False) -> list:
+        """ids of the (n-gram, occurrence) tokens of an identifier, unknown ones are added if grow is set and skipped
+        otherwise"""
+        seen: dict = {}
+        tokens = []
+        for i in range(len(identifier) - self.n + 1):
+            gram = identifier[i:i + self.n]
+            token = gram, seen.get(gram, 0)
+            seen[gram] = token[1] + 1
+            if token not in self.tokens:
+                if not grow:
+                    continue
+                self.tokens[token] = len(self.tokens)
+            tokens.append(self.tokens[token])
+        return tokens
+
+    def candidates(self, identifiers: list, threshold: float) -> np.ndarray:
+        """positions of the identifiers indexed that may be more similar than the threshold to any of the given
+        identifiers, as they share enough n-grams with it or their lengths do not call for any shared n-gram"""
+        rows, tokens = [], []
+        for r, identifier in enumerate(identifiers):
+            t = self.tokenize(identifier)
+            tokens.extend(t)
+            rows.extend([r] * len(t))
+        tokens = np.array(tokens, dtype=np.intp)
+        starts = self.indptr[tokens]
+        counts = self.indptr[tokens + 1] - starts
+        # the postings of all tokens, each run starting at its token's offset
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        pairs, shared = np.unique(np.repeat(np.array(rows, dtype=np.intp), counts) * len(self.lengths) +
+                                  self.postings[offsets], return_counts=True)
+        r, c = np.divmod(pairs, len(self.lengths))
+        left_lengths = np.array([len(i) for i in identifiers], dtype=np.intp)
+        found = [c[shared >= min_shared_ngrams(left_lengths[r], self.lengths[c], threshold, self.n)]]
+        # identifiers of lengths for which no shared n-gram is required are candidates without a look at the index
+        lengths = np.array(list(self.by_length), dtype=np.intp)
+        for length in np.unique(left_lengths):
+            required = min_shared_ngrams(length, lengths, threshold, self.n)
+            found.extend(self.by_length[other] for other in lengths[required <= 0].tolist())
+        return np.unique(np.concatenate(found))
+
+
+def fuzzy_matches(left: list, right: list, threshold: float = .8, top_k: int = 5, n: int = 3, prefix: int = 4,
+                  block_size: int = 256, workers: int = -1) -> dict:
+    """ most similar right identifiers per left identifier by normalized Indel similarity; left identifiers are
+    blocked by their prefix, so that the rows of a block share most of their candidates, the candidates of a block
+    are the right identifiers that may be above the threshold for any of its rows by the n-grams they share and their
+    lengths, and each block is scored as one matrix with rapidfuzz on all cores (workers=-1); the matches are the
+    same as when scoring all pairs
+
+    :return: {left identifier: [(right identifier, similarity)]}, at most top_k per left identifier with a similarity
+        above the threshold, most similar first
+    """
+    right = list(dict.fromkeys(right))
+    index = NgramIndex(right, n)
+    blocks: dict = {}
+    for identifier in dict.fromkeys(left):
+        blocks.setdefault(identifier[:prefix], []).append(identifier)
+    matches = {}
+    for group in blocks.values():
+        for start in range(0, len(group), block_size):
+            block = group[start:start + block_size]
+            columns = index.candidates(block, threshold)
+            if not len(columns):
+                continue
+            scores = process.cdist(block, [right[c] for c in columns], scorer=Indel.normalized_similarity,
+                                   score_cutoff=threshold, workers=workers)
+            for identifier, row, best in zip(block, scores, np.argsort(-scores, axis=1, kind="stable")[:, :top_k]):
+                found = [(right[columns[c]], float(row[c])) for c in best if row[c] > threshold]
+                if found:
+                    matches[identifier] = found
+    return matches
+
+
+def find_matches(pp_file_conrad: str, pp_file_infinity: str, threshold: float = .8, top_k: int = 5) -> tuple:
+    """ find matches between products, relevant keys are Typ (Modell for raspis) and PART NUMBER as well as OTHER
+    NAMES for conrad and infinity, respectively
+
+    :return: exact matches as (conrad id, infinity id) and up to top_k similar matches per conrad product as
+        (conrad id, infinity id, similarity), ids being (name, identifier)
+    """
+    ids_conrad = product_identifiers(load_pp_dump(pp_file_conrad), ("Typ", "Modell"))
+    ids_infinity: dict = {}
+    for id_i in product_identifiers(load_pp_dump(pp_file_infinity), ("PART NUMBER",), "OTHER NAMES"):
+        ids_infinity.setdefault(id_i[1], []).append(id_i)
+    exact_matches = [(id_c, id_i) for id_c in ids_conrad for id_i in ids_infinity.get(id_c[1], [])]
+    similar = fuzzy_matches([id_c[1] for id_c in ids_conrad], list(ids_infinity), threshold, top_k)
+    sim_matches: list = []
+    for id_c in ids_conrad:
+        found = [(id_c, id_i, score) for identifier, score in similar.get(id_c[1], [])
+                 for id_i in ids_infinity[identifier]]
+        sim_matches.extend(found[:top_k])
     return exact_matches, sim_matches
 
 
 def find_possible_classes(pp_file: str) -> dict:
     """ check which attributes may be suitable as subclasses for structuring individuals
+
+    :return: number of distinct values and number of values per attribute
     """
-    data = load_pp_dump(pp_file)
-    entries_per_key = {k: [] for k in data[0].keys()}
-    for e in data:
-        for k in entries_per_key:
-            if k in e:
-                # only consider functional attributes to avoid multiple inheritance
-                if not isinstance(e[k], list):
-                    entries_per_key[k].append(e[k])
-    entries_per_key = {k: (len(set(entries_per_key[k])), len(entries_per_key[k])) for k in entries_per_key}
-    return entries_per_key
+    table = load_columns(pp_file)
+    # only consider functional attributes to avoid multiple inheritance
+    return {name: (len(pc.unique(column.drop_null())), len(column) - column.null_count)
+            for name, column in zip(table.column_names, table.itercolumns()) if not pa.types.is_nested(column.type)}
 
 
 def attribute_overlap(manual_comparison: str) -> dict:
@@ -97,15 +287,14 @@ def clock_rate_ranges(pp_file: str) -> dict:
         "../data/conrad_data_dump.json": "Takt-Frequenz",
         "../data/infinity_data_dump.json": "SPEED",
     }
-    data = load_pp_dump(pp_file)
-    for e in data:
-        if speed_keys[pp_file] in e:
-            if e[speed_keys[pp_file]] in occurrences:
-                occurrences[e[speed_keys[pp_file]]] += 1
-            else:
-                occurrences[e[speed_keys[pp_file]]] = 1
-        else:
-            occurrences[0] += 1
+    table = load_columns(pp_file)
+    if speed_keys[pp_file] not in table.column_names:
+        return {0: table.num_rows}
+    column = table.column(speed_keys[pp_file])
+    occurrences[0] += column.null_count
+    counts = pc.value_counts(column.drop_null())
+    for value, count in zip(counts.field("values").to_pylist(), counts.field("counts").to_pylist()):
+        occurrences[value] = occurrences.get(value, 0) + count
     return dict(sorted(occurrences.items()))
 
 
@@ -120,10 +309,12 @@ if __name__ == "__main__":
     data_dumps = "../data/conrad_data_dump.json", "../data/infinity_data_dump.json"
     print("product catalog size:")
     for data_dump in data_dumps:
-        print(data_dump, ":", len(load_pp_dump(data_dump)))
+        print(data_dump, ":", load_columns(data_dump).num_rows)
     print("\nredundant attributes:")
     for data_dump in data_dumps:
-        print(data_dump, ":", check_duplicate_attributes(data_dump))
+        identical, near_duplicates = check_duplicate_attributes(data_dump)
+        print(data_dump, ":", identical)
+        print(*near_duplicates, sep="\n")
     print("\noccurrences of attributes:")
     for data_dump in data_dumps:
         print(data_dump, ":", find_possible_classes(data_dump))
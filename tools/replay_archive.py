@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+record the search and product pages of a vendor, including the subresources chrome loads for them, into an archive and
+replay the archive from a local http server, so the bots can be measured and regression-tested offline
+
+    python -m tools.replay_archive record conrad mikrocontroller --pages 2 --products 20
+    python -m tools.replay_archive serve conrad
+
+bots are pointed at the replay server via their base_url, e.g., ConradBot(logger, base_url=server.url); absolute urls
+of recorded hosts in replayed bodies are rewritten to the server, hosts other than the vendor's own are served below
+/_/<host>/
+"""
+
+import argparse
+import functools
+import gzip
+import http.server
+import logging
+import os
+import sqlite3
+import threading
+import typing
+import urllib.parse
+import urllib3
+from src import constants as const
+
+ARCHIVE_DIR = "../data/replay"
+
+# urls of the document and all subresources loaded for it, including xhr and fetch requests
+RESOURCES_SCRIPT = """
+return [location.href].concat(performance.getEntriesByType("resource").map(e => e.name));
+"""
+
+# bodies that may contain absolute urls of recorded hosts
+TEXT_TYPES = ("text/", "application/javascript", "application/json", "application/x-javascript", "image/svg+xml")
+
+
+class Archive:
+    """responses stored under their url with status, content type and compressed body, and the settings of the recording"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, status INTEGER, "
+                        "content_type TEXT, body BLOB)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.db.commit()
+
+    def put(self, url: str, status: int, content_type: str, body: bytes) -> None:
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                            (url, status, content_type, gzip.compress(body)))
+            self.db.commit()
+
+    def get(self, url: str) -> typing.Optional[tuple]:
+        """status, content type and body of a recorded response, None if the url has not been recorded"""
+        with self.lock:
+            row = self.db.execute("SELECT status, content_type, body FROM responses WHERE url = ?", (url,)).fetchone()
+        return (row[0], row[1], gzip.decompress(row[2])) if row else None
+
+    def __contains__(self, url: str) -> bool:
+        with self.lock:
+            return self.db.execute("SELECT 1 FROM responses WHERE url = ?", (url,)).fetchone() is not None
+
+    def origins(self) -> list:
+        """scheme and host of all recorded urls"""
+        with self.lock:
+            urls = [row[0] for row in self.db.execute("SELECT url FROM responses")]
+        return sorted({"{0.scheme}://{0.netloc}".format(urllib.parse.urlsplit(u)) for u in urls})
+
+    def set_meta(self, **values: typing.Any) -> None:
+        with self.lock:
+            self.db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [(k, str(v)) for k, v in values.items()])
+            self.db.commit()
+
+    def meta(self) -> dict:
+        with self.lock:
+            return dict(self.db.execute("SELECT key, value FROM meta"))
+
+
+def archive_path(vendor: str, directory: str = ARCHIVE_DIR) -> str:
+    return os.path.join(directory, f"{vendor}.sqlite")
+
+
+def capture(bot, pool: urllib3.PoolManager, archive: Archive, logger: logging.Logger) -> int:
+    """ store the page loaded in the bot's browser and its subresources, downloading them once more with the bot's
+    cookies; urls already in the archive are skipped
+
+    :return: number of responses stored
+    """
+    cookies = "; ".join(f"{c['name']}={c['value']}" for c in bot.get_cookies())
+    stored = 0
+    for url in dict.fromkeys(bot.execute_script(RESOURCES_SCRIPT)):
+        if not url.startswith(("http://", "https://")) or url in archive:
+            continue
+        try:
+            response = pool.request("GET", url, headers={"Cookie": cookies} if cookies else None)
+        except urllib3.exceptions.HTTPError as e:
+            logger.info(f"could not record {url}: {e!r}")
+            continue
+        archive.put(url, response.status, response.headers.get("Content-Type", ""), response.data)
+        stored += 1
+    return stored
+
+
+def record(vendor: str, search_term: str, pages: int, products: int, path: str, logger: logging.Logger) -> None:
+    """ load search and product pages with the vendor's bot in chrome and store everything they loaded
+
+    :param products: number of product pages recorded at most
+    """
+    from src import pipelines
+
+    archive = Archive(path)
+    archive.set_meta(vendor=vendor, origin=const.BASE_URLS[vendor], search_term=search_term, pages=pages)
+    pool = urllib3.PoolManager(headers={"User-Agent": const.USER_AGENT}, retries=urllib3.Retry(2))
+    bot = pipelines.VENDOR_BOTS[vendor](logger, headless=True)
+    try:
+        links: list = []
+        for page in range(1, pages + 1):
+            page_links, _ = bot.listing_page(search_term, page)
+            links.extend(page_links)
+            logger.info(f"recorded search page {page}: {capture(bot, pool, archive, logger)} responses")
+        for pl in links[:products]:
+            try:
+                bot.load_product(pl)
+            except Exception as e:
+                logger.info(f"product page {pl} incomplete: {e!r}")
+            logger.info(f"recorded {pl}: {capture(bot, pool, archive, logger)} responses")
+    finally:
+        bot.quit()
+
+
+def recorded_url(state: dict, path: str) -> str:
+    """the url a request path was recorded under, the vendor's origin unless the path starts with /_/<host>/"""
+    if path.startswith("/_/"):
+        host, _, rest = path[3:].partition("/")
+        return state["origins"].get(host, "https://" + host) + "/" + rest
+    return state["origin"] + path
+
+
+class ReplayHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def __init__(self, *args, server_state: dict, **kwargs) -> None:
+        self.state = server_state
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self) -> None:
+        url = recorded_url(self.state, self.path)
+        response = self.state["archive"].get(url)
+        with self.state["lock"]:
+            self.state["served" if response else "missed"] += 1
+        if not response:
+            self.send_error(404, f"not recorded: {url}")
+            return
+        status, content_type, body = response
+        if content_type.startswith(TEXT_TYPES):
+            body = self.rewrite(body)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def rewrite(self, body: bytes) -> bytes:
+        for recorded, replayed in self.state["rewrites"]:
+            body = body.replace(recorded, replayed)
+        return body
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class ReplayServer:
+    """serve an archive on a free local port until stopped"""
+
+    def __init__(self, archive: Archive) -> None:
+        meta = archive.meta()
+        self.archive = archive
+        self.state = {"archive": archive, "origin": meta["origin"], "served": 0, "missed": 0, "lock": threading.Lock()}
+        handler = functools.partial(ReplayHandler, server_state=self.state)
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        origins = archive.origins()
+        self.state["origins"] = {urllib.parse.urlsplit(o).netloc: o for o in origins}
+        vendor_host = urllib.parse.urlsplit(meta["origin"]).netloc
+        targets = {host: self.url if host == vendor_host else f"{self.url}/_/{host}" for host in self.state["origins"]}
+        # full urls first, protocol-relative ones of the remaining references afterwards
+        self.state["rewrites"] = [(o.encode(), targets[urllib.parse.urlsplit(o).netloc].encode()) for o in origins] + \
+                                 [(f"//{h}".encode(), t.split(":", 1)[1].encode()) for h, t in targets.items()]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def is_recorded(self, url: str) -> bool:
+        """whether a url of the replay server is served from the archive"""
+        return url.startswith(self.url) and recorded_url(self.state, url[len(self.url):]) in self.archive
+
+    def stats(self) -> dict:
+        """number of requests served from the archive and of requests for urls that were not recorded"""
+        with self.state["lock"]:
+            return {"served": self.state["served"], "missed": self.state["missed"]}
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "ReplayServer":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="record vendor pages into an archive or replay an archive")
+    commands = parser.add_subparsers(dest="command", required=True)
+    recorder = commands.add_parser("record")
+    recorder.add_argument("vendor", choices=sorted(const.BASE_URLS))
+    recorder.add_argument("search_term")
+    recorder.add_argument("--pages", type=int, default=1, help="number of search pages")
+    recorder.add_argument("--products", type=int, default=20, help="number of product pages at most")
+    replayer = commands.add_parser("serve")
+    replayer.add_argument("vendor", choices=sorted(const.BASE_URLS))
+    args = parser.parse_args()
+
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    replay_logger = logging.getLogger("replay_archive")
+    replay_logger.setLevel(logging.INFO)
+    replay_logger.addHandler(logging.StreamHandler())
+    if args.command == "record":
+        record(args.vendor, args.search_term, args.pages, args.products, archive_path(args.vendor), replay_logger)
+    else:
+        with ReplayServer(Archive(archive_path(args.vendor))) as replay:
+            print(f"replaying {args.vendor} at {replay.url}, press ctrl+c to stop")
+            try:
+                replay.thread.join()
+            except KeyboardInterrupt:
+                pass